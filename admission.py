@@ -0,0 +1,134 @@
+# admission.py - 채팅 API 동시 처리 제한(대기열) 및 클라이언트별 요청 속도 제한
+import threading
+import time
+from collections import OrderedDict
+
+
+class AdmissionController:
+    """동시 처리 수 제한과 짧은 대기열
+
+    처리 중인 요청이 max_inflight개면 새 요청은 최대 max_queue개까지
+    queue_timeout초 동안 기다리고, 대기열이 가득 찼거나 시간이 지나면 바로 거절한다.
+    """
+
+    def __init__(self, max_inflight=4, max_queue=8, queue_timeout=2.0):
+        self.max_inflight = max(1, int(max_inflight))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = max(0.0, float(queue_timeout))
+
+        self._condition = threading.Condition()
+        self.inflight = 0
+        self.waiting = 0
+        self.stats = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected_queue_full': 0,
+            'rejected_timeout': 0,
+            'max_waiting': 0
+        }
+
+    def acquire(self):
+        """처리 슬롯 획득
+
+        Returns:
+            (획득 여부, 거절 사유 또는 None)
+        """
+        with self._condition:
+            if self.inflight < self.max_inflight and self.waiting == 0:
+                self.inflight += 1
+                self.stats['admitted'] += 1
+                return True, None
+
+            if self.waiting >= self.max_queue:
+                self.stats['rejected_queue_full'] += 1
+                return False, 'queue_full'
+
+            self.waiting += 1
+            self.stats['queued'] += 1
+            self.stats['max_waiting'] = max(self.stats['max_waiting'], self.waiting)
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.inflight >= self.max_inflight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['rejected_timeout'] += 1
+                        return False, 'timeout'
+                    self._condition.wait(remaining)
+
+                self.inflight += 1
+                self.stats['admitted'] += 1
+                return True, None
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        """처리 슬롯 반환"""
+        with self._condition:
+            self.inflight = max(0, self.inflight - 1)
+            self._condition.notify()
+
+    def get_stats(self):
+        """현재 처리/대기 수와 누적 통계"""
+        with self._condition:
+            stats = dict(self.stats)
+            stats.update({
+                'inflight': self.inflight,
+                'waiting': self.waiting,
+                'max_inflight': self.max_inflight,
+                'max_queue': self.max_queue,
+                'queue_timeout_ms': round(self.queue_timeout * 1000)
+            })
+            return stats
+
+
+class RateLimiter:
+    """클라이언트별 토큰 버킷 속도 제한
+
+    클라이언트마다 초당 rate개의 토큰이 최대 burst개까지 쌓이고, 요청마다 토큰
+    하나를 사용한다. 추적하는 클라이언트 수는 max_clients개로 제한(오래된 순으로 제거).
+    """
+
+    def __init__(self, rate, burst=10, max_clients=10000):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.max_clients = max_clients
+
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self.stats = {'allowed': 0, 'rejected': 0}
+
+    def allow(self, client_id):
+        """요청 허용 여부
+
+        Returns:
+            (허용 여부, 다시 시도할 때까지 기다릴 초)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(client_id, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+            if tokens >= 1.0:
+                self._buckets[client_id] = (tokens - 1.0, now)
+                allowed, retry_after = True, 0.0
+                self.stats['allowed'] += 1
+            else:
+                self._buckets[client_id] = (tokens, now)
+                allowed, retry_after = False, (1.0 - tokens) / self.rate
+                self.stats['rejected'] += 1
+
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+
+            return allowed, retry_after
+
+    def get_stats(self):
+        """누적 통계와 설정"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                'rate_per_second': self.rate,
+                'burst': self.burst,
+                'tracked_clients': len(self._buckets)
+            })
+            return stats
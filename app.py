@@ -1,19 +1,38 @@
 # app.py - 로그인 기능이 추가된 Flask 챗봇 애플리케이션
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, Response, stream_with_context, g, send_from_directory
 import os
+import json
 import requests
 from datetime import datetime
 import time
 from werkzeug.utils import secure_filename
-from document_processor import DocumentProcessor, QuestionAnalyzer
+from document_processor import DocumentProcessor, QuestionAnalyzer, CorpusStats, CACHE_REQUESTS
+from admission import AdmissionController, RateLimiter
+from intent_router import load_intents
+from metrics import REGISTRY
+from profiling import RequestProfiler
+from reranker import create_reranker
+from request_log import RequestRecorder
+from log_config import (setup_logging, begin_request_sampling, resume_request_sampling,
+                        end_request_sampling, log_event)
 import traceback
-from functools import wraps
+from functools import partial, wraps
+import gzip
 import hashlib
+import logging
+import math
 import secrets
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production-' + secrets.token_hex(16))
 
+# 로깅 설정 (출력은 큐를 거쳐 별도 스레드에서, DEBUG 로그는 요청 단위로 샘플링)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # text | json
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0))  # DEBUG 로그를 남길 요청 비율
+setup_logging(LOG_LEVEL, json_format=(LOG_FORMAT == 'json'))
+
 # 관리자 계정 설정 (환경변수 또는 기본값)
 ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME', 'admin')
 ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin123')
@@ -25,6 +44,34 @@ ADMIN_PASSWORD_HASH = hashlib.sha256(ADMIN_PASSWORD.encode()).hexdigest()
 UPLOAD_FOLDER = 'uploaded_documents'
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'pptx', 'xlsx', 'xls'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+MAX_FILES_PER_PAGE = 500  # /api/files 한 페이지 최대 항목 수
+MAX_BATCH_QUESTIONS = int(os.environ.get('MAX_BATCH_QUESTIONS', 100))  # /api/chat/batch 한 번에 받을 최대 질문 수
+QUERY_BATCH_SIZE = int(os.environ.get('QUERY_BATCH_SIZE', 32))  # 질문 임베딩 마이크로 배치 최대 크기
+QUERY_BATCH_WINDOW_MS = float(os.environ.get('QUERY_BATCH_WINDOW_MS', 5))  # 동시 질문을 모으는 대기 시간 (0이면 비활성화)
+CHAT_MAX_INFLIGHT = int(os.environ.get('CHAT_MAX_INFLIGHT', os.cpu_count() or 4))  # 동시에 처리할 최대 채팅 요청 수
+CHAT_MAX_QUEUE = int(os.environ.get('CHAT_MAX_QUEUE', 16))  # 처리 슬롯을 기다릴 수 있는 최대 요청 수
+CHAT_QUEUE_TIMEOUT_MS = float(os.environ.get('CHAT_QUEUE_TIMEOUT_MS', 2000))  # 대기열에서 기다리는 최대 시간
+CHAT_RETRY_AFTER = int(os.environ.get('CHAT_RETRY_AFTER', 2))  # 과부하 거절 시 Retry-After (초)
+CHAT_RATE_LIMIT = float(os.environ.get('CHAT_RATE_LIMIT', 0))  # 클라이언트별 초당 요청 수 (0이면 비활성화)
+CHAT_RATE_BURST = int(os.environ.get('CHAT_RATE_BURST', 10))  # 클라이언트별 순간 최대 요청 수
+GZIP_MIN_SIZE = int(os.environ.get('GZIP_MIN_SIZE', 1024))  # 이 크기(bytes) 이상인 JSON 응답만 gzip 압축
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+CHAT_LATENCY_BUDGET_MS = float(os.environ.get('CHAT_LATENCY_BUDGET_MS', 3000))  # 질문당 최대 지연 예산 (요청의 budget_ms는 이보다 줄이기만 가능, 0이면 제한 없음)
+METRICS_DIR = os.environ.get('METRICS_DIR', '')  # 여러 워커(gunicorn)의 메트릭을 합칠 공유 디렉터리 (비우면 워커별)
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))  # 워커 메트릭 파일 기록 주기 (초)
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')  # pstats 파일 저장 폴더
+PROFILE_EVERY_N = int(os.environ.get('PROFILE_EVERY_N', 0))  # N번째 요청마다 프로파일링 (0이면 비활성화)
+PROFILE_TOP_N = int(os.environ.get('PROFILE_TOP_N', 25))  # 리포트에 담을 상위 함수 수
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 200))  # 보관할 최대 pstats 파일 수
+CHAT_RECORD_FILE = os.environ.get('CHAT_RECORD_FILE', '')  # 채팅 요청을 기록할 JSON Lines 파일 (부하 테스트 재생용, 비우면 기록 안 함)
+CHAT_RECORD_SAMPLE_RATE = float(os.environ.get('CHAT_RECORD_SAMPLE_RATE', 1.0))  # 기록할 요청 비율
+CHAT_RECORD_MAX_MB = float(os.environ.get('CHAT_RECORD_MAX_MB', 100))  # 기록 파일 최대 크기 (넘으면 기록 중단)
+RERANK_MODE = os.environ.get('RERANK_MODE', 'off')  # 2단계 재순위: off | features | cross-encoder (켜기 전 benchmarks evaluate로 비교)
+RERANK_MODEL = os.environ.get('RERANK_MODEL', '')  # cross-encoder 모델 로컬 폴더 경로 (cross-encoder 방식에 필요, 내려받지 않음)
+RERANK_CANDIDATES = int(os.environ.get('RERANK_CANDIDATES', 20))  # 1단계 검색이 재순위에 넘길 후보 수
+RERANK_BUDGET_MS = float(os.environ.get('RERANK_BUDGET_MS', 50))  # 재순위 최대 시간 (0이면 요청 예산만 따름)
+EMBEDDING_DTYPE = os.environ.get('EMBEDDING_DTYPE', 'float32')  # 임베딩 보관 형식: float32 | float16 | int8 (메모리/디스크 1, 1/2, 약 1/4)
+INTENTS_FILE = os.environ.get('INTENTS_FILE', '')  # 인사/감사/FAQ 의도 표 JSON (기본 의도에 합침, 비우면 기본값만)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
@@ -32,6 +79,31 @@ app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 # 업로드 폴더 생성
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# 채팅 API 과부하 보호 (워커 프로세스별)
+chat_admission = AdmissionController(CHAT_MAX_INFLIGHT, CHAT_MAX_QUEUE, CHAT_QUEUE_TIMEOUT_MS / 1000)
+chat_rate_limiter = RateLimiter(CHAT_RATE_LIMIT, CHAT_RATE_BURST) if CHAT_RATE_LIMIT > 0 else None
+
+# 채팅 요청 기록 (질문 원문이 남으므로 필요할 때만 켬)
+chat_recorder = (RequestRecorder(CHAT_RECORD_FILE, CHAT_RECORD_SAMPLE_RATE, int(CHAT_RECORD_MAX_MB * 1024 * 1024))
+                 if CHAT_RECORD_FILE else None)
+
+# 요청 프로파일링 (관리자 X-Profile 헤더/profile 파라미터 또는 N번째 요청마다)
+request_profiler = RequestProfiler(PROFILE_DIR, PROFILE_EVERY_N, PROFILE_TOP_N, PROFILE_MAX_FILES)
+
+# 메트릭 (/metrics)
+if METRICS_DIR:
+    REGISTRY.enable_multiprocess(METRICS_DIR, METRICS_FLUSH_INTERVAL)
+CHAT_REQUESTS = REGISTRY.counter('chatbot_chat_requests_total', '채팅 요청 수', ['endpoint', 'outcome'])
+CHAT_SECONDS = REGISTRY.histogram('chatbot_chat_request_seconds', '채팅 요청 처리 시간 (대기열 포함, 초)', ['endpoint'])
+CHAT_REJECTED = REGISTRY.counter('chatbot_chat_rejected_total', '과부하/속도 제한으로 거절된 채팅 요청 수', ['reason'])
+CHAT_INFLIGHT = REGISTRY.gauge('chatbot_chat_inflight', '처리 중인 채팅 요청 수')
+CHAT_WAITING = REGISTRY.gauge('chatbot_chat_waiting', '처리 슬롯을 기다리는 채팅 요청 수')
+INDEX_CHUNKS = REGISTRY.gauge('chatbot_index_chunks', '인덱스 청크 수', aggregate='max')
+INDEX_FILES = REGISTRY.gauge('chatbot_index_files', '처리된 파일 수', aggregate='max')
+INDEX_VERSION = REGISTRY.gauge('chatbot_index_version', '인덱스 스냅샷 버전', aggregate='max')
+EMBEDDING_ROWS = REGISTRY.gauge('chatbot_embedding_rows', '임베딩 행렬 행 수', aggregate='max')
+EMBEDDING_BYTES = REGISTRY.gauge('chatbot_embedding_bytes', '임베딩 행렬 크기 (bytes)', aggregate='max')
+
 # 전역 변수로 초기화 상태 추적
 initialization_status = {
     'success': False,
@@ -50,6 +122,189 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def overloaded_response(message, status_code, retry_after, reason):
+    """과부하/속도 제한 거절 응답 (Retry-After 포함)"""
+    response = jsonify({
+        'success': False,
+        'message': message,
+        'reason': reason,
+        'retry_after': retry_after
+    })
+    response.status_code = status_code
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def admission_controlled(f):
+    """채팅 API 과부하 보호 데코레이터
+
+    클라이언트별 속도 제한(설정 시)을 먼저 확인하고, 처리 슬롯을 얻지 못하면
+    대기열에서 잠시 기다린 뒤 503으로 바로 거절한다. 스트리밍 응답은 전송이
+    끝날 때 슬롯을 반환한다. 요청 기록이 켜져 있으면 거절될 요청까지 도착 순서대로 기록한다.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.chat_received_at = time.monotonic()  # 지연 예산은 대기열 대기 시간까지 포함
+        
+        if chat_recorder is not None:
+            chat_recorder.record(request.method, request.path,
+                                 body=request.get_json(silent=True) if request.method == 'POST' else None,
+                                 args=request.args.to_dict())
+        
+        if chat_rate_limiter is not None:
+            allowed, wait_seconds = chat_rate_limiter.allow(request.remote_addr or 'unknown')
+            if not allowed:
+                CHAT_REJECTED.labels('rate_limited').inc()
+                return overloaded_response('요청이 너무 잦습니다. 잠시 후 다시 시도해주세요.',
+                                           429, max(1, math.ceil(wait_seconds)), 'rate_limited')
+        
+        admitted, reason = chat_admission.acquire()
+        if not admitted:
+            logger.warning("⚠️ 채팅 요청 거절 (%s)", reason)
+            CHAT_REJECTED.labels(reason).inc()
+            return overloaded_response('현재 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.',
+                                       503, CHAT_RETRY_AFTER, reason)
+        
+        try:
+            response = app.make_response(f(*args, **kwargs))
+        except Exception:
+            chat_admission.release()
+            raise
+        
+        if response.is_streamed:
+            response.call_on_close(chat_admission.release)
+        else:
+            chat_admission.release()
+        return response
+    return decorated_function
+
+def profile_requested():
+    """관리자가 이 요청의 프로파일링을 요청했는지 (X-Profile 헤더 또는 profile 파라미터)"""
+    if not session.get('logged_in'):
+        return False
+    flag = request.headers.get('X-Profile') or request.values.get('profile')
+    return flag not in (None, '', '0', 'false')
+
+def profiled(label):
+    """요청 프로파일링 데코레이터
+    
+    관리자가 요청하면 JSON 응답에 'profile' 리포트(누적 시간 상위 함수)를 붙이고,
+    그 밖의 응답은 저장한 pstats 파일명을 알린다. PROFILE_EVERY_N 모드에서는
+    응답을 바꾸지 않고 파일만 남긴다.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            requested = profile_requested()
+            if not requested and not request_profiler.sample_due():
+                return f(*args, **kwargs)
+            
+            response, report = request_profiler.run(label, lambda: app.make_response(f(*args, **kwargs)))
+            if report is None:
+                logger.info("프로파일링 생략 (다른 요청 측정 중): %s", label)
+                return response
+            
+            log_event(logger, 'profile', '요청 프로파일 저장', label=label,
+                      elapsed_ms=report['elapsed_ms'], file=report['file'])
+            if requested:
+                response.headers['X-Profile-File'] = report['file'] or ''
+                if response.is_json:
+                    payload = response.get_json()
+                    if isinstance(payload, dict):
+                        payload['profile'] = report
+                        response.set_data(app.json.dumps(payload))
+                else:
+                    flash(f"프로파일 저장: {report['file']} ({report['elapsed_ms']}ms)", 'info')
+            return response
+        return decorated_function
+    return decorator
+
+def get_admission_stats():
+    """채팅 API 대기열/거절 통계"""
+    return {
+        'admission': chat_admission.get_stats(),
+        'rate_limit': chat_rate_limiter.get_stats() if chat_rate_limiter is not None else None
+    }
+
+def collect_gauge_metrics():
+    """/metrics 수집 직전 인덱스 크기와 대기열 상태 갱신"""
+    admission = chat_admission.get_stats()
+    CHAT_INFLIGHT.set(admission['inflight'])
+    CHAT_WAITING.set(admission['waiting'])
+    
+    document_processor = initialization_status['document_processor']
+    if document_processor is None:
+        return
+    snapshot = document_processor.snapshot
+    INDEX_CHUNKS.set(len(snapshot.documents))
+    INDEX_FILES.set(snapshot.stats.total_files)
+    INDEX_VERSION.set(snapshot.version)
+    embeddings = snapshot.embeddings
+    EMBEDDING_ROWS.set(len(embeddings) if embeddings is not None else 0)
+    EMBEDDING_BYTES.set(getattr(embeddings, 'nbytes', 0) if embeddings is not None else 0)
+
+REGISTRY.add_collector(collect_gauge_metrics)
+
+def log_chat_summary(endpoint, summary):
+    """채팅 요청 하나당 구조화 요약 레코드 하나 기록 (질문 원문은 남기지 않음)"""
+    search = summary.pop('search', None) or {}
+    received_at = g.get('chat_received_at')
+    total_seconds = time.monotonic() - received_at if received_at else None
+    
+    CHAT_REQUESTS.labels(endpoint, summary.get('outcome')).inc()
+    if total_seconds is not None:
+        CHAT_SECONDS.labels(endpoint).observe(total_seconds)
+    
+    log_event(logger, 'chat_request', '채팅 요청 처리',
+              endpoint=endpoint,
+              total_ms=round(total_seconds * 1000, 1) if total_seconds is not None else None,
+              budget_ms=search.get('budget_ms'),
+              stage_ms=search.get('stage_ms'),
+              skipped=search.get('skipped'),
+              degraded=search.get('degraded', False),
+              results=search.get('results'),
+              intent=search.get('intent'),
+              debug_sampled=g.get('debug_sampled'),
+              **summary)
+
+def get_search_filters(raw_filters):
+    """요청의 검색 필터 정규화 (형식이 잘못되면 사용자에게 보여줄 메시지와 함께 ValueError)"""
+    return DocumentProcessor.normalize_filters(raw_filters)
+
+def get_query_filters(args):
+    """GET 쿼리 문자열의 검색 필터 (filename, file_type은 여러 번 줄 수 있음)"""
+    filters = {}
+    for key in ('filename', 'file_type'):
+        values = [value for value in args.getlist(key) if value]
+        if values:
+            filters[key] = values
+    for key in ('date_from', 'date_to'):
+        if args.get(key):
+            filters[key] = args.get(key)
+    return filters
+
+def get_chat_deadline(requested_budget_ms=None):
+    """질문 지연 예산(ms)으로 검색 마감 시각 계산 (요청 수신 시각 기준)
+    
+    요청한 예산은 (0, CHAT_LATENCY_BUDGET_MS] 범위로 줄여서만 쓸 수 있다. 숫자가 아니거나
+    NaN/무한대/0 이하면 CHAT_LATENCY_BUDGET_MS를 쓰므로 마감 시각은 서버 설정으로만 끌 수 있다.
+    
+    Returns:
+        (time.monotonic 기준 마감 시각, 적용된 예산 ms) - 서버 예산이 0 이하이고 요청 예산도 없으면 (None, None)
+    """
+    budget_ms = CHAT_LATENCY_BUDGET_MS
+    try:
+        requested_ms = float(requested_budget_ms) if requested_budget_ms not in (None, '') else None
+    except (TypeError, ValueError):
+        requested_ms = None
+    if requested_ms is not None and math.isfinite(requested_ms) and requested_ms > 0:
+        budget_ms = requested_ms if budget_ms <= 0 else min(requested_ms, budget_ms)
+    
+    if budget_ms <= 0:
+        return None, None
+    
+    received_at = g.get('chat_received_at') or time.monotonic()
+    return received_at + budget_ms / 1000, budget_ms
+
 def verify_password(password):
     """비밀번호 검증"""
     password_hash = hashlib.sha256(password.encode()).hexdigest()
@@ -60,11 +315,17 @@ def initialize_processors():
     global initialization_status
     
     try:
-        print("=== 프로세서 초기화 시작 ===")
+        logger.info("=== 프로세서 초기화 시작 ===")
         
         # DocumentProcessor 초기화
-        document_processor = DocumentProcessor(UPLOAD_FOLDER)
-        question_analyzer = QuestionAnalyzer(document_processor)
+        document_processor = DocumentProcessor(UPLOAD_FOLDER,
+                                               query_batch_size=QUERY_BATCH_SIZE,
+                                               query_batch_window_ms=QUERY_BATCH_WINDOW_MS,
+                                               reranker=create_reranker(RERANK_MODE, RERANK_MODEL),
+                                               rerank_candidates=RERANK_CANDIDATES,
+                                               rerank_budget_ms=RERANK_BUDGET_MS,
+                                               embedding_dtype=EMBEDDING_DTYPE)
+        question_analyzer = QuestionAnalyzer(document_processor, load_intents(INTENTS_FILE))
         
         # 기존 문서 처리
         document_processor.initialize_existing_documents()
@@ -76,13 +337,12 @@ def initialize_processors():
             'question_analyzer': question_analyzer
         }
         
-        print("=== 프로세서 초기화 완료 ===")
-        print(f"처리된 문서 수: {len(document_processor.documents)}")
+        logger.info("=== 프로세서 초기화 완료 ===")
+        logger.info("처리된 문서 수: %s", len(document_processor.documents))
         
     except Exception as e:
         error_msg = f"프로세서 초기화 실패: {e}"
-        print(f"❌ {error_msg}")
-        traceback.print_exc()
+        logger.exception("❌ %s", error_msg)
         
         initialization_status = {
             'success': False,
@@ -93,11 +353,12 @@ def initialize_processors():
 
 # 서버 시작시 초기화
 initialize_processors()
+REGISTRY.flush()  # 초기 문서 처리 메트릭 기록 (워커를 fork하기 전 프로세스 몫)
 
 def get_processors():
     """프로세서 가져오기 (재초기화 포함)"""
     if not initialization_status['success']:
-        print("⚠️ 프로세서 재초기화 시도...")
+        logger.warning("⚠️ 프로세서 재초기화 시도...")
         initialize_processors()
     
     return initialization_status['document_processor'], initialization_status['question_analyzer']
@@ -106,6 +367,30 @@ def allowed_file(filename):
     """허용된 파일 확장자 확인"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def save_upload_streaming(file_storage, upload_folder, block_size=1024 * 1024):
+    """업로드 스트림을 임시 파일로 저장하면서 SHA-256 해시 계산
+    
+    Returns:
+        (임시 파일 경로, 해시 hex 문자열, 바이트 수)
+    """
+    temp_path = os.path.join(upload_folder, f".upload-{secrets.token_hex(8)}.part")
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        with open(temp_path, 'wb') as f:
+            while True:
+                block = file_storage.stream.read(block_size)
+                if not block:
+                    break
+                sha256.update(block)
+                f.write(block)
+                size += len(block)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return temp_path, sha256.hexdigest(), size
+
 def get_file_type_display(filename):
     """파일 확장자에 따른 표시명 반환"""
     ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
@@ -118,6 +403,134 @@ def get_file_type_display(filename):
     }
     return type_mapping.get(ext, 'Unknown')
 
+def build_no_documents_message(document_processor):
+    """처리된 문서가 없을 때 안내 메시지"""
+    supported_formats = ', '.join(document_processor.supported_extensions.values())
+    return f'''📋 **안내사항**
+
+현재 처리된 문서가 없습니다. 
+
+**관리자 기능**을 통해 문서 파일을 업로드해주세요.
+
+**📁 지원 파일 형식**: {supported_formats}
+
+💡 문서 파일을 업로드하면 해당 문서의 내용을 기반으로 정확한 답변을 제공할 수 있습니다.
+
+**🔧 문제 해결 방법:**
+1. 관리자 페이지에서 로그인 후 파일 업로드
+2. 파일이 "처리됨" 상태인지 확인
+3. 청크 수가 0이 아닌지 확인'''
+
+def build_debug_info(document_processor, search_trace=None):
+    """채팅 응답에 포함할 문서 청크 통계 문자열 (검색 단계별 소요 시간 포함)"""
+    stats = document_processor.corpus_stats
+    
+    debug_info = f"문서 청크: {stats.total_chunks}개"
+    if stats.chunk_types:
+        stats_str = ", ".join([f"{ft}: {count}" for ft, count in stats.chunk_types.items()])
+        debug_info += f" ({stats_str})"
+    
+    if search_trace:
+        timings = ", ".join(f"{stage} {ms:.1f}ms" for stage, ms in search_trace.get('stage_ms', {}).items())
+        if timings:
+            debug_info += f" | 검색 단계: {timings}"
+        if search_trace.get('skipped'):
+            debug_info += f" | 시간 예산 초과로 생략: {', '.join(search_trace['skipped'])}"
+    return debug_info
+
+def make_etag(*state):
+    """응답 내용을 결정하는 상태 값들로 ETag 생성"""
+    encoded = json.dumps(state, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:20]
+
+def conditional_json(etag, build_payload):
+    """If-None-Match가 ETag와 같으면 본문을 만들지 않고 304, 아니면 ETag를 붙인 JSON 응답
+    
+    gzip 압축 여부와 관계없이 같은 ETag를 쓰므로 약한(W/) ETag로 보낸다.
+    """
+    if request.if_none_match.contains_weak(etag):
+        CACHE_REQUESTS.labels('http_etag', 'hit').inc()
+        response = Response(status=304)
+    else:
+        CACHE_REQUESTS.labels('http_etag', 'miss').inc()
+        response = jsonify(build_payload())
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+FILE_SORT_KEYS = ('filename', 'file_type', 'file_size', 'chunks_count', 'processed_date', 'modified')
+
+def list_file_entries(document_processor, status='processed'):
+    """처리 정보와 업로드 폴더 목록을 합친 파일 항목 (status: processed | unprocessed | all)"""
+    entries = {}
+    for file_info in document_processor.get_processed_files_info():
+        entries[file_info['filename']] = dict(file_info, processed=True, modified=None)
+    
+    for upload_info in document_processor.get_uploaded_files():
+        entry = entries.get(upload_info['filename'])
+        if entry is None:
+            entry = entries[upload_info['filename']] = {
+                'filename': upload_info['filename'],
+                'file_type': upload_info['file_type'],
+                'chunks_count': 0,
+                'processed_date': None,
+                'file_size': upload_info['size'],
+                'processed': False
+            }
+        entry['modified'] = upload_info['modified']
+    
+    files_info = []
+    for entry in entries.values():
+        if status == 'processed' and not entry['processed']:
+            continue
+        if status == 'unprocessed' and entry['processed']:
+            continue
+        entry['display_type'] = entry['file_type']
+        entry['size_mb'] = round(entry['file_size'] / (1024 * 1024), 2)
+        files_info.append(entry)
+    return files_info
+
+def build_file_list(document_processor):
+    """/api/files 응답 본문 (필터/정렬/페이지 적용)"""
+    files_info = list_file_entries(document_processor, request.args.get('status', 'processed'))
+    
+    query = request.args.get('q', '').strip().lower()
+    if query:
+        files_info = [f for f in files_info if query in f['filename'].lower()]
+    
+    file_type = request.args.get('type', '').strip().lower()
+    if file_type:
+        files_info = [f for f in files_info if f['file_type'].lower() == file_type]
+    
+    sort_key = request.args.get('sort', 'filename')
+    if sort_key not in FILE_SORT_KEYS:
+        sort_key = 'filename'
+    files_info.sort(key=lambda f: (f.get(sort_key) is None, f.get(sort_key) if f.get(sort_key) is not None else 0),
+                    reverse=request.args.get('order') == 'desc')
+    
+    total_matched = len(files_info)
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = request.args.get('per_page', 0, type=int)
+    if per_page > 0:
+        per_page = min(per_page, MAX_FILES_PER_PAGE)
+        files_info = files_info[(page - 1) * per_page:page * per_page]
+    
+    return {
+        'success': True,
+        'files': files_info,
+        'total_files': total_matched,
+        'total_chunks': document_processor.corpus_stats.total_chunks,
+        'page': page if per_page > 0 else 1,
+        'per_page': per_page if per_page > 0 else total_matched,
+        'total_pages': max(1, -(-total_matched // per_page)) if per_page > 0 else 1,
+        'supported_formats': list(document_processor.supported_extensions.values())
+    }
+
+def format_sse(event, data):
+    """Server-Sent Events 형식의 메시지 생성"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.route('/')
 def index():
     """메인 페이지"""
@@ -138,7 +551,7 @@ def index():
                              processed_files=processed_files,
                              supported_formats=supported_formats)
     except Exception as e:
-        print(f"Index 페이지 오류: {e}")
+        logger.error("Index 페이지 오류: %s", e)
         return render_template('index.html', 
                              document_files=[],
                              processed_files=[],
@@ -152,7 +565,7 @@ def login():
             username = request.form.get('username', '').strip()
             password = request.form.get('password', '')
             
-            print(f"로그인 시도: 사용자명='{username}'")
+            logger.info("로그인 시도: 사용자명='%s'", username)
             
             # 입력값 검증
             if not username or not password:
@@ -165,7 +578,7 @@ def login():
                 session['username'] = username
                 session['login_time'] = datetime.now().isoformat()
                 
-                print(f"✅ 로그인 성공: {username}")
+                logger.info("✅ 로그인 성공: %s", username)
                 flash('관리자 로그인에 성공했습니다.', 'success')
                 
                 # 원래 요청한 페이지로 리다이렉트 (있다면)
@@ -175,13 +588,12 @@ def login():
                 else:
                     return redirect(url_for('admin'))
             else:
-                print(f"❌ 로그인 실패: {username}")
+                logger.warning("❌ 로그인 실패: %s", username)
                 flash('사용자명 또는 비밀번호가 올바르지 않습니다.', 'error')
                 return render_template('login.html')
                 
         except Exception as e:
-            print(f"로그인 처리 오류: {e}")
-            traceback.print_exc()
+            logger.exception("로그인 처리 오류: %s", e)
             flash('로그인 처리 중 오류가 발생했습니다.', 'error')
             return render_template('login.html')
     
@@ -194,10 +606,10 @@ def logout():
     try:
         username = session.get('username', 'unknown')
         session.clear()
-        print(f"로그아웃: {username}")
+        logger.info("로그아웃: %s", username)
         flash('로그아웃되었습니다.', 'success')
     except Exception as e:
-        print(f"로그아웃 오류: {e}")
+        logger.error("로그아웃 오류: %s", e)
         flash('로그아웃 처리 중 오류가 발생했습니다.', 'warning')
     
     return redirect(url_for('index'))
@@ -212,19 +624,18 @@ def admin():
         if document_processor:
             document_files = document_processor.get_uploaded_files()
             processed_files = document_processor.get_processed_files_info()
-            
-            # 파일 형식별 통계
-            file_type_stats = {}
-            for file_info in processed_files:
-                file_type = file_info['file_type']
-                file_type_stats[file_type] = file_type_stats.get(file_type, 0) + 1
-            
+            corpus_stats = document_processor.corpus_stats.as_dict()
             supported_formats = list(document_processor.supported_extensions.values())
+            rebuild_status = document_processor.rebuild_status
         else:
             document_files = []
             processed_files = []
-            file_type_stats = {}
+            corpus_stats = CorpusStats().as_dict()
             supported_formats = ['PDF']
+            rebuild_status = {'state': 'idle'}
+        
+        # 업로드 파일 목록에서 처리 정보를 바로 찾도록 파일명으로 색인
+        processed_by_name = {file_info['filename']: file_info for file_info in processed_files}
         
         allowed_extensions_list = list(ALLOWED_EXTENSIONS)
         
@@ -237,22 +648,25 @@ def admin():
         return render_template('admin.html', 
                              document_files=document_files, 
                              processed_files=processed_files,
-                             file_type_stats=file_type_stats,
+                             processed_by_name=processed_by_name,
+                             corpus_stats=corpus_stats,
+                             file_type_stats=corpus_stats['file_types'],
                              supported_formats=supported_formats,
                              allowed_extensions=allowed_extensions_list,
+                             rebuild_status=rebuild_status,
                              login_info=login_info)
     except Exception as e:
-        print(f"Admin 페이지 오류: {e}")
-        traceback.print_exc()
+        logger.exception("Admin 페이지 오류: %s", e)
         flash(f'관리자 페이지 로딩 오류: {str(e)}', 'error')
         return redirect(url_for('index'))
 
 @app.route('/upload', methods=['POST'])
 @login_required
+@profiled('upload')
 def upload_file():
     """문서 파일 업로드 (로그인 필수)"""
     try:
-        print("=== 파일 업로드 시작 ===")
+        logger.info("=== 파일 업로드 시작 ===")
         
         document_processor, _ = get_processors()
         if not document_processor:
@@ -272,32 +686,55 @@ def upload_file():
             filename = secure_filename(file.filename)
             file_type = get_file_type_display(filename)
             username = session.get('username', 'unknown')
-            print(f"업로드 파일: {filename} ({file_type}) - 업로드자: {username}")
+            logger.info("업로드 파일: %s (%s) - 업로드자: %s", filename, file_type, username)
+            
+            # 저장하면서 내용 해시 계산
+            upload_folder = app.config['UPLOAD_FOLDER']
+            folder_mtime = document_processor.upload_manifest.folder_mtime()
+            temp_path, file_hash, file_size = save_upload_streaming(file, upload_folder)
+            logger.debug("업로드 수신: %s bytes (sha256 %s)", file_size, file_hash[:12])
+            
+            # 같은 이름, 같은 내용이면 다시 처리하지 않음
+            existing_info = document_processor.metadata.get(filename)
+            if (existing_info and existing_info.get('file_hash') == file_hash
+                    and os.path.exists(os.path.join(upload_folder, filename))):
+                os.remove(temp_path)
+                logger.info("동일 파일 재업로드: %s (처리 생략)", filename)
+                flash(f'{file_type} 파일 "{filename}"은 이미 같은 내용으로 처리되어 있습니다.', 'warning')
+                return redirect(url_for('admin'))
             
             # 중복 파일명 처리
-            if os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], filename)):
+            if os.path.exists(os.path.join(upload_folder, filename)):
                 name, ext = os.path.splitext(filename)
                 counter = 1
-                while os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], f"{name}_{counter}{ext}")):
+                while os.path.exists(os.path.join(upload_folder, f"{name}_{counter}{ext}")):
                     counter += 1
                 filename = f"{name}_{counter}{ext}"
-                print(f"중복 방지 파일명: {filename}")
+                logger.info("중복 방지 파일명: %s", filename)
             
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            print(f"파일 저장: {filepath} ({os.path.getsize(filepath)} bytes)")
+            filepath = os.path.join(upload_folder, filename)
+            os.replace(temp_path, filepath)
+            document_processor.upload_manifest.record(filepath, folder_mtime)
+            logger.debug("파일 저장: %s (%s bytes)", filepath, file_size)
+            
+            duplicate_of = document_processor.find_processed_by_hash(file_hash, exclude=filename)
+            if duplicate_of:
+                logger.info("동일 내용 파일 존재: %s (청크 연결)", duplicate_of)
             
             # 문서 처리
-            print(f"{file_type} 문서 처리 시작...")
-            success = document_processor.process_document(filepath)
+            logger.debug("%s 문서 처리 시작...", file_type)
+            success = document_processor.process_document(filepath, file_hash=file_hash)
             
-            if success:
+            if success and duplicate_of:
+                chunks_count = document_processor.metadata[filename]['chunks_count']
+                flash(f'{file_type} 파일 "{filename}"은 "{duplicate_of}"과 내용이 같아 기존 처리 결과를 연결했습니다. ({chunks_count}개 청크)', 'success')
+            elif success:
                 doc_count = len(document_processor.documents)
-                chunks_count = len([doc for doc in document_processor.documents if doc['filename'] == filename])
-                print(f"✓ 처리 완료: {chunks_count}개 청크 생성 (전체: {doc_count}개)")
+                chunks_count = document_processor.metadata[filename]['chunks_count']
+                logger.info("✓ 처리 완료: %s개 청크 생성 (전체: %s개)", chunks_count, doc_count)
                 flash(f'{file_type} 파일 "{filename}"이 성공적으로 처리되었습니다. ({chunks_count}개 청크)', 'success')
             else:
-                print(f"✗ {file_type} 문서 처리 실패")
+                logger.warning("✗ %s 문서 처리 실패", file_type)
                 flash(f'파일 업로드는 성공했지만 {file_type} 문서 처리 중 오류가 발생했습니다.', 'warning')
             
             return redirect(url_for('admin'))
@@ -307,8 +744,7 @@ def upload_file():
             return redirect(url_for('admin'))
             
     except Exception as e:
-        print(f"❌ 업로드 오류: {e}")
-        traceback.print_exc()
+        logger.exception("❌ 업로드 오류: %s", e)
         flash(f'업로드 중 오류가 발생했습니다: {str(e)}', 'error')
         return redirect(url_for('admin'))
 
@@ -324,7 +760,7 @@ def delete_file(filename):
         
         file_type = get_file_type_display(filename)
         username = session.get('username', 'unknown')
-        print(f"파일 삭제 요청: {filename} ({file_type}) - 요청자: {username}")
+        logger.info("파일 삭제 요청: %s (%s) - 요청자: %s", filename, file_type, username)
         
         success = document_processor.delete_file(filename)
         if success:
@@ -332,7 +768,7 @@ def delete_file(filename):
         else:
             flash(f'파일 삭제에 실패했습니다.', 'error')
     except Exception as e:
-        print(f"❌ 삭제 오류: {e}")
+        logger.error("❌ 삭제 오류: %s", e)
         flash(f'삭제 중 오류가 발생했습니다: {str(e)}', 'error')
     
     return redirect(url_for('admin'))
@@ -340,7 +776,11 @@ def delete_file(filename):
 @app.route('/reprocess', methods=['POST'])
 @login_required
 def reprocess_all():
-    """모든 문서 파일 재처리 (로그인 필수)"""
+    """모든 문서 파일 백그라운드 재처리 (로그인 필수)
+    
+    스테이징 인덱스에서 재구축하는 동안 기존 인덱스로 계속 답변하고,
+    검증을 통과하면 교체한다.
+    """
     try:
         document_processor, _ = get_processors()
         if not document_processor:
@@ -348,33 +788,98 @@ def reprocess_all():
             return redirect(url_for('admin'))
         
         username = session.get('username', 'unknown')
-        print(f"=== 모든 문서 재처리 시작 - 요청자: {username} ===")
+        logger.info("=== 모든 문서 재처리 시작 - 요청자: %s ===", username)
         
-        success = document_processor.reprocess_all_documents()
-        if success:
-            doc_count = len(document_processor.documents)
-            flash(f'모든 문서 파일이 재처리되었습니다. (총 {doc_count}개 청크)', 'success')
+        force = request.form.get('force') == '1'
+        
+        # 재처리는 백그라운드 스레드에서 실행되므로 그 스레드를 프로파일링
+        runner = None
+        profile = profile_requested()
+        if profile or request_profiler.sample_due():
+            runner = partial(request_profiler.run, 'reprocess')
+        
+        if document_processor.start_rebuild(force=force, runner=runner):
+            flash('백그라운드에서 문서 재처리를 시작했습니다. 완료될 때까지 기존 인덱스로 답변합니다.', 'success')
+            if profile:
+                flash('재처리가 끝나면 프로파일을 /admin/profiles에서 확인할 수 있습니다.', 'info')
         else:
-            flash('재처리 중 일부 오류가 발생했습니다.', 'warning')
+            flash('이미 재처리가 진행 중입니다.', 'warning')
     except Exception as e:
-        print(f"❌ 재처리 오류: {e}")
-        traceback.print_exc()
+        logger.exception("❌ 재처리 오류: %s", e)
         flash(f'재처리 중 오류가 발생했습니다: {str(e)}', 'error')
     
     return redirect(url_for('admin'))
 
+@app.route('/reprocess/status')
+@login_required
+def reprocess_status():
+    """백그라운드 재처리 상태 API (로그인 필수)"""
+    document_processor, _ = get_processors()
+    if not document_processor:
+        return jsonify({'state': 'error', 'error': initialization_status.get('error', '초기화 실패')})
+    
+    return jsonify(dict(document_processor.rebuild_status,
+                        total_chunks=len(document_processor.documents)))
+
+@app.route('/reprocess/rollback', methods=['POST'])
+@login_required
+def reprocess_rollback():
+    """직전 재처리 이전 인덱스로 롤백 (로그인 필수)"""
+    try:
+        document_processor, _ = get_processors()
+        if not document_processor:
+            flash('시스템 오류가 발생했습니다.', 'error')
+            return redirect(url_for('admin'))
+        
+        username = session.get('username', 'unknown')
+        logger.info("=== 인덱스 롤백 요청 - 요청자: %s ===", username)
+        
+        if document_processor.rollback_index():
+            doc_count = len(document_processor.documents)
+            flash(f'이전 인덱스로 되돌렸습니다. (총 {doc_count}개 청크)', 'success')
+        else:
+            flash('되돌릴 이전 인덱스가 없습니다.', 'warning')
+    except Exception as e:
+        logger.exception("❌ 롤백 오류: %s", e)
+        flash(f'롤백 중 오류가 발생했습니다: {str(e)}', 'error')
+    
+    return redirect(url_for('admin'))
+
+@app.route('/admin/profiles')
+@login_required
+def list_profiles():
+    """최근 프로파일 리포트와 저장된 pstats 파일 목록 (로그인 필수)"""
+    return jsonify({
+        'success': True,
+        'profiles': list(request_profiler.recent),
+        'files': request_profiler.list_files(),
+        'stats': request_profiler.get_stats()
+    })
+
+@app.route('/admin/profiles/<filename>')
+@login_required
+def download_profile(filename):
+    """pstats 파일 다운로드 (python -m pstats, snakeviz 등으로 분석)"""
+    filename = secure_filename(filename)
+    if filename not in request_profiler.list_files():
+        return jsonify({'success': False, 'message': '프로파일 파일을 찾을 수 없습니다.'}), 404
+    return send_from_directory(os.path.abspath(PROFILE_DIR), filename, as_attachment=True)
+
 @app.route('/api/chat', methods=['POST'])
+@admission_controlled
+@profiled('chat')
 def chat():
     """챗봇 대화 API (로그인 불필요)"""
+    summary = {'outcome': 'error'}
     try:
-        print("\n" + "="*50)
-        print("=== 채팅 API 호출 ===")
+        logger.debug("=== 채팅 API 호출 ===")
         
         # 프로세서 확인
         document_processor, question_analyzer = get_processors()
         if not document_processor or not question_analyzer:
             error_msg = f"시스템 초기화 오류: {initialization_status.get('error', '알 수 없는 오류')}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
+            summary['outcome'] = 'not_initialized'
             return jsonify({
                 'success': False,
                 'message': f'시스템 오류가 발생했습니다: {error_msg}'
@@ -383,127 +888,295 @@ def chat():
         # 요청 데이터 확인
         data = request.get_json()
         if not data:
-            print("❌ JSON 데이터 없음")
+            logger.debug("❌ JSON 데이터 없음")
+            summary['outcome'] = 'invalid_request'
             return jsonify({
                 'success': False,
                 'message': '잘못된 요청입니다.'
             })
         
         question = data.get('message', '').strip()
-        print(f"📝 받은 질문: '{question}'")
+        deadline, budget_ms = get_chat_deadline(data.get('budget_ms'))
+        summary['question_chars'] = len(question)
+        logger.debug("📝 받은 질문: '%s'", question)
         
         if not question:
-            print("❌ 빈 질문")
+            logger.debug("❌ 빈 질문")
+            summary['outcome'] = 'empty_question'
             return jsonify({
                 'success': False,
                 'message': '질문을 입력해주세요.'
             })
         
+        try:
+            filters = get_search_filters(data.get('filters'))
+        except ValueError as e:
+            summary['outcome'] = 'invalid_filters'
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            })
+        summary['filtered'] = filters is not None
+        
         # 문서 상태 확인
-        doc_count = len(document_processor.documents)
-        processed_files = document_processor.get_processed_files_info()
-        print(f"📊 현재 상태:")
-        print(f"  - 문서 청크 수: {doc_count}")
-        print(f"  - 처리된 파일 수: {len(processed_files)}")
+        corpus_stats = document_processor.corpus_stats
+        logger.debug("📊 현재 상태: 문서 청크 %s개, 처리된 파일 %s개",
+                     corpus_stats.total_chunks, corpus_stats.total_files)
         
         # 문서가 없는 경우
         if not document_processor.has_processed_documents():
-            print("⚠️ 처리된 문서 없음")
-            supported_formats = ', '.join(document_processor.supported_extensions.values())
+            logger.debug("⚠️ 처리된 문서 없음")
+            summary['outcome'] = 'no_documents'
             return jsonify({
                 'success': True,
-                'message': f'''📋 **안내사항**
-
-현재 처리된 문서가 없습니다. 
-
-**관리자 기능**을 통해 문서 파일을 업로드해주세요.
-
-**📁 지원 파일 형식**: {supported_formats}
-
-💡 문서 파일을 업로드하면 해당 문서의 내용을 기반으로 정확한 답변을 제공할 수 있습니다.
-
-**🔧 문제 해결 방법:**
-1. 관리자 페이지에서 로그인 후 파일 업로드
-2. 파일이 "처리됨" 상태인지 확인
-3. 청크 수가 0이 아닌지 확인''',
+                'message': build_no_documents_message(document_processor),
                 'timestamp': datetime.now().strftime('%H:%M:%S')
             })
         
         # 질문 분석 및 답변 생성
-        print("🔍 질문 분석 시작...")
+        logger.debug("🔍 질문 분석 시작...")
         start_time = time.time()
         
         try:
-            answer = question_analyzer.analyze_question(question)
+            search_trace = summary['search'] = {'budget_ms': budget_ms}
+            answer = question_analyzer.analyze_question(question, deadline=deadline, trace=search_trace,
+                                                        filters=filters)
             processing_time = time.time() - start_time
-            print(f"✅ 답변 생성 완료 ({processing_time:.2f}초)")
-            print(f"📤 답변 길이: {len(answer)}자")
+            logger.debug("✅ 답변 생성 완료 (%.2f초), 답변 길이: %s자", processing_time, len(answer))
+            summary.update(outcome='answered', answer_chars=len(answer))
             
             # 디버그 정보 생성
-            file_type_stats = {}
-            for doc in document_processor.documents:
-                file_type = doc.get('file_type', 'Unknown')
-                file_type_stats[file_type] = file_type_stats.get(file_type, 0) + 1
-            
-            debug_info = f"문서 청크: {doc_count}개"
-            if file_type_stats:
-                stats_str = ", ".join([f"{ft}: {count}" for ft, count in file_type_stats.items()])
-                debug_info += f" ({stats_str})"
-            
-            print("="*50)
+            debug_info = build_debug_info(document_processor, search_trace)
             
             return jsonify({
                 'success': True,
                 'message': answer,
                 'timestamp': datetime.now().strftime('%H:%M:%S'),
+                'degraded': search_trace.get('degraded', False),
+                'search_trace': search_trace,
                 'debug_info': debug_info,
                 'processing_time': f"{processing_time:.2f}초"
             })
             
         except Exception as e:
-            print(f"❌ 질문 분석 오류: {e}")
-            traceback.print_exc()
+            logger.exception("❌ 질문 분석 오류: %s", e)
             return jsonify({
                 'success': False,
                 'message': f'질문 처리 중 오류가 발생했습니다: {str(e)}'
             })
         
     except Exception as e:
-        print(f"❌ Chat API 전체 오류: {e}")
-        traceback.print_exc()
+        logger.exception("❌ Chat API 전체 오류: %s", e)
+        return jsonify({
+            'success': False,
+            'message': '서버 오류가 발생했습니다. 콘솔을 확인해주세요.'
+        })
+    finally:
+        log_chat_summary('/api/chat', summary)
+
+@app.route('/api/chat/batch', methods=['POST'])
+@admission_controlled
+def chat_batch():
+    """여러 질문 일괄 답변 API (로그인 불필요)
+    
+    요청: {"messages": ["질문1", "질문2", ...], "filters": {...}}
+    filters(선택)는 /api/chat과 같고 모든 질문에 적용된다. 응답의 answers는 요청 순서와 같다.
+    """
+    summary = {'outcome': 'error'}
+    try:
+        document_processor, question_analyzer = get_processors()
+        if not document_processor or not question_analyzer:
+            error_msg = f"시스템 초기화 오류: {initialization_status.get('error', '알 수 없는 오류')}"
+            summary['outcome'] = 'not_initialized'
+            return jsonify({
+                'success': False,
+                'message': f'시스템 오류가 발생했습니다: {error_msg}'
+            })
+        
+        data = request.get_json(silent=True)
+        questions = data.get('messages') if isinstance(data, dict) else None
+        if not isinstance(questions, list) or not questions:
+            summary['outcome'] = 'invalid_request'
+            return jsonify({
+                'success': False,
+                'message': "'messages' 배열에 질문을 담아 보내주세요."
+            })
+        
+        if len(questions) > MAX_BATCH_QUESTIONS:
+            summary.update(outcome='too_many_questions', questions=len(questions))
+            return jsonify({
+                'success': False,
+                'message': f'한 번에 최대 {MAX_BATCH_QUESTIONS}개 질문까지 처리할 수 있습니다.'
+            })
+        
+        try:
+            filters = get_search_filters(data.get('filters'))
+        except ValueError as e:
+            summary['outcome'] = 'invalid_filters'
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            })
+        summary['filtered'] = filters is not None
+        
+        questions = [str(question).strip() if question is not None else '' for question in questions]
+        logger.debug("📝 배치 질문 %s개 수신", len(questions))
+        summary['questions'] = len(questions)
+        
+        start_time = time.time()
+        if document_processor.has_processed_documents():
+            answers = question_analyzer.analyze_questions(questions, filters)
+            summary['outcome'] = 'answered'
+        else:
+            answers = [build_no_documents_message(document_processor)] * len(questions)
+            summary['outcome'] = 'no_documents'
+        processing_time = time.time() - start_time
+        logger.debug("✅ 배치 답변 완료: %s개 (%.2f초)", len(questions), processing_time)
+        summary['answer_chars'] = sum(len(answer) for answer in answers)
+        
+        return jsonify({
+            'success': True,
+            'answers': [
+                {'question': question, 'message': answer}
+                for question, answer in zip(questions, answers)
+            ],
+            'count': len(answers),
+            'timestamp': datetime.now().strftime('%H:%M:%S'),
+            'debug_info': build_debug_info(document_processor),
+            'processing_time': f"{processing_time:.2f}초"
+        })
+        
+    except Exception as e:
+        logger.exception("❌ 배치 Chat API 오류: %s", e)
         return jsonify({
             'success': False,
             'message': '서버 오류가 발생했습니다. 콘솔을 확인해주세요.'
         })
+    finally:
+        log_chat_summary('/api/chat/batch', summary)
+
+@app.route('/api/chat/stream', methods=['GET', 'POST'])
+@admission_controlled
+def chat_stream():
+    """챗봇 대화 SSE 스트리밍 API (로그인 불필요)
+    
+    검색 단계가 끝날 때마다 현재 최고 청크를 보내고, 관련 정보/출처/신뢰도와
+    최종 답변을 이어서 보낸다. GET(?message=, EventSource용)과 POST(JSON) 모두 지원.
+    검색 필터는 POST의 filters 또는 GET의 filename/file_type/date_from/date_to.
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        question = data.get('message', '')
+        requested_budget_ms = data.get('budget_ms')
+        raw_filters = data.get('filters')
+    else:
+        question = request.args.get('message', '')
+        requested_budget_ms = request.args.get('budget_ms')
+        raw_filters = get_query_filters(request.args)
+    question = (question or '').strip()
+    try:
+        filters, filters_error = get_search_filters(raw_filters), None
+    except ValueError as e:
+        filters, filters_error = None, str(e)
+    deadline, budget_ms = get_chat_deadline(requested_budget_ms)
+    
+    document_processor, question_analyzer = get_processors()
+    debug_sampled = g.debug_sampled
+    logger.debug("📝 스트리밍 질문: '%s'", question)
+    
+    def generate():
+        sampling_token = resume_request_sampling(debug_sampled)
+        start_time = time.time()
+        search_trace = {'budget_ms': budget_ms}
+        summary = {'outcome': 'error', 'question_chars': len(question), 'search': search_trace}
+        try:
+            yield format_sse('start', {'timestamp': datetime.now().strftime('%H:%M:%S')})
+            
+            if not document_processor or not question_analyzer:
+                error_msg = f"시스템 초기화 오류: {initialization_status.get('error', '알 수 없는 오류')}"
+                summary['outcome'] = 'not_initialized'
+                yield format_sse('error', {'message': f'시스템 오류가 발생했습니다: {error_msg}'})
+                return
+            
+            if not question:
+                summary['outcome'] = 'empty_question'
+                yield format_sse('error', {'message': '질문을 입력해주세요.'})
+                return
+            
+            if filters_error:
+                summary['outcome'] = 'invalid_filters'
+                yield format_sse('error', {'message': filters_error})
+                return
+            summary['filtered'] = filters is not None
+            
+            if not document_processor.has_processed_documents():
+                summary['outcome'] = 'no_documents'
+                yield format_sse('answer', {'message': build_no_documents_message(document_processor)})
+            else:
+                stream = question_analyzer.stream_answer(question, deadline=deadline, trace=search_trace, filters=filters)
+                for event, data in stream:
+                    data['elapsed_ms'] = round((time.time() - start_time) * 1000, 1)
+                    if event == 'answer':
+                        summary.update(outcome='answered', answer_chars=len(data.get('message', '')))
+                    yield format_sse(event, data)
+            
+            processing_time = time.time() - start_time
+            logger.debug("✅ 스트리밍 답변 완료 (%.2f초)", processing_time)
+            yield format_sse('done', {
+                'timestamp': datetime.now().strftime('%H:%M:%S'),
+                'degraded': search_trace.get('degraded', False),
+                'search_trace': search_trace,
+                'debug_info': build_debug_info(document_processor, search_trace),
+                'processing_time': f"{processing_time:.2f}초"
+            })
+        except GeneratorExit:
+            summary['outcome'] = 'client_disconnected'
+            raise
+        finally:
+            log_chat_summary('/api/chat/stream', summary)
+            end_request_sampling(sampling_token)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/api/status')
 def status():
-    """시스템 상태 API (로그인 불필요)"""
+    """시스템 상태 API (로그인 불필요, ETag 지원)
+    
+    ETag는 코퍼스 버전, 업로드 폴더 목록, 초기화 상태, 로그인 여부로만 만든다.
+    요청마다 바뀌는 대기열/인코더 통계는 /api/load에서 따로 조회한다.
+    """
     try:
         document_processor, _ = get_processors()
         
         if document_processor:
-            document_files = document_processor.get_uploaded_files()
-            processed_files = document_processor.get_processed_files_info()
+            snapshot = document_processor.snapshot
+            corpus_stats = snapshot.stats
+            admin_logged_in = session.get('logged_in', False)
+            etag = make_etag('status', corpus_stats.version, document_processor.upload_manifest.current_generation(),
+                             initialization_status['success'], admin_logged_in)
             
-            # 파일 타입별 통계
-            file_type_stats = {}
-            for file_info in processed_files:
-                file_type = file_info['file_type']
-                file_type_stats[file_type] = file_type_stats.get(file_type, 0) + 1
+            def build_status():
+                document_files = document_processor.get_uploaded_files()
+                return {
+                    'status': 'connected' if document_files else 'no_files',
+                    'total_files': len(document_files),
+                    'processed_files': corpus_stats.total_files,
+                    'total_chunks': corpus_stats.total_chunks,
+                    'file_type_stats': corpus_stats.file_types,
+                    'chunk_type_stats': corpus_stats.chunk_types,
+                    'total_bytes': corpus_stats.total_bytes,
+                    'corpus_version': corpus_stats.version,
+                    'supported_formats': list(document_processor.supported_extensions.values()),
+                    'last_updated': snapshot.published_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    'data_loaded': corpus_stats.total_files > 0,
+                    'initialization_success': initialization_status['success'],
+                    'admin_logged_in': admin_logged_in
+                }
             
-            return jsonify({
-                'status': 'connected' if document_files else 'no_files',
-                'total_files': len(document_files),
-                'processed_files': len(processed_files),
-                'total_chunks': len(document_processor.documents),
-                'file_type_stats': file_type_stats,
-                'supported_formats': list(document_processor.supported_extensions.values()),
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'data_loaded': len(processed_files) > 0,
-                'initialization_success': initialization_status['success'],
-                'admin_logged_in': session.get('logged_in', False)
-            })
+            return conditional_json(etag, build_status)
         else:
             return jsonify({
                 'status': 'error',
@@ -521,25 +1194,23 @@ def status():
 
 @app.route('/api/files')
 def get_files():
-    """업로드된 파일 목록 API (로그인 불필요)"""
+    """업로드된 파일 목록 API (로그인 불필요, ETag 지원)
+    
+    쿼리 파라미터 (모두 선택):
+        status: processed(기본) | unprocessed | all
+        q: 파일명 검색어, type: 파일 형식 (예: PDF, Word)
+        sort: filename | file_type | file_size | chunks_count | processed_date | modified
+        order: asc(기본) | desc
+        page, per_page: 페이지 번호(1부터)와 크기 (per_page가 없으면 전체)
+    """
     try:
         document_processor, _ = get_processors()
         
         if document_processor:
-            files_info = document_processor.get_processed_files_info()
-            
-            # 추가 정보 포함
-            for file_info in files_info:
-                file_info['display_type'] = file_info['file_type']
-                file_info['size_mb'] = round(file_info['file_size'] / (1024 * 1024), 2)
-            
-            return jsonify({
-                'success': True,
-                'files': files_info,
-                'total_files': len(files_info),
-                'total_chunks': len(document_processor.documents),
-                'supported_formats': list(document_processor.supported_extensions.values())
-            })
+            etag = make_etag('files', document_processor.index_version,
+                             document_processor.upload_manifest.current_generation(),
+                             sorted(request.args.items()))
+            return conditional_json(etag, lambda: build_file_list(document_processor))
         else:
             return jsonify({
                 'success': False,
@@ -555,12 +1226,12 @@ def get_files():
 def test_chat():
     """간단한 채팅 테스트 API (로그인 불필요)"""
     try:
-        print("🧪 테스트 채팅 API 호출됨")
+        logger.debug("🧪 테스트 채팅 API 호출됨")
         
         data = request.get_json()
         message = data.get('message', '') if data else ''
         
-        print(f"📨 받은 메시지: '{message}'")
+        logger.debug("📨 받은 메시지: '%s'", message)
         
         # 간단한 응답 반환 (문서 처리 없이)
         if not message:
@@ -577,12 +1248,11 @@ def test_chat():
             'test_mode': True
         }
         
-        print(f"📤 응답 전송: {result}")
+        logger.debug("📤 응답 전송: %s", result)
         return jsonify(result)
         
     except Exception as e:
-        print(f"❌ 테스트 채팅 오류: {e}")
-        traceback.print_exc()
+        logger.exception("❌ 테스트 채팅 오류: %s", e)
         return jsonify({
             'success': False,
             'message': f'테스트 오류: {str(e)}',
@@ -591,45 +1261,113 @@ def test_chat():
 
 @app.route('/api/debug')
 def debug_info():
-    """디버그 정보 API (로그인 불필요)"""
+    """디버그 정보 API (로그인 불필요, ETag 지원)
+    
+    ETag는 코퍼스 버전, 업로드 폴더 목록, 초기화 상태, 세션으로만 만든다.
+    (폴더 목록 캐시의 조회 횟수처럼 조회 자체로 바뀌는 값은 제외하고,
+    인코더/대기열/검색 단계 통계처럼 요청마다 바뀌는 값은 /api/load에서 조회)
+    """
     try:
         document_processor, question_analyzer = get_processors()
         
-        # JSON 직렬화 가능한 데이터만 포함
-        debug_data = {
+        session_data = {
+            'username': session.get('username', None),
+            'login_time': session.get('login_time', None)
+        }
+        state = {
             'initialization_success': initialization_status['success'],
             'initialization_error': initialization_status['error'],
-            'has_document_processor': document_processor is not None,
-            'has_question_analyzer': question_analyzer is not None,
-            'document_count': len(document_processor.documents) if document_processor else 0,
-            'metadata_count': len(document_processor.metadata) if document_processor else 0,
-            'upload_folder_exists': os.path.exists(UPLOAD_FOLDER),
-            'upload_folder_files': os.listdir(UPLOAD_FOLDER) if os.path.exists(UPLOAD_FOLDER) else [],
-            'supported_extensions': list(document_processor.supported_extensions.values()) if document_processor else [],
-            'embeddings_available': (document_processor.embeddings is not None) if document_processor else False,
-            'admin_logged_in': session.get('logged_in', False),
-            'session_data': {
-                'username': session.get('username', None),
-                'login_time': session.get('login_time', None)
-            }
+            'admin_logged_in': session.get('logged_in', False)
         }
+        etag = make_etag('debug',
+                         document_processor.index_version if document_processor else None,
+                         document_processor.upload_manifest.current_generation() if document_processor else None,
+                         session_data, state)
         
-        # 처리된 파일 정보 추가
-        if document_processor:
-            try:
-                processed_files = document_processor.get_processed_files_info()
-                debug_data['processed_files'] = processed_files
-                debug_data['processed_files_count'] = len(processed_files)
-            except Exception as e:
-                debug_data['processed_files_error'] = str(e)
-        
-        return jsonify(debug_data)
+        def build_debug_data():
+            # JSON 직렬화 가능한 데이터만 포함
+            debug_data = dict(state, **{
+                'has_document_processor': document_processor is not None,
+                'has_question_analyzer': question_analyzer is not None,
+                'document_count': document_processor.corpus_stats.total_chunks if document_processor else 0,
+                'metadata_count': document_processor.corpus_stats.total_files if document_processor else 0,
+                'corpus_stats': document_processor.corpus_stats.as_dict() if document_processor else None,
+                'upload_folder_exists': os.path.exists(UPLOAD_FOLDER),
+                'upload_folder_files': document_processor.upload_manifest.filenames() if document_processor else [],
+                'upload_manifest': document_processor.upload_manifest.get_stats() if document_processor else None,
+                'supported_extensions': list(document_processor.supported_extensions.values()) if document_processor else [],
+                'embeddings_available': (document_processor.embeddings is not None) if document_processor else False,
+                'latency_budget_ms': CHAT_LATENCY_BUDGET_MS,
+                'session_data': session_data
+            })
+            
+            # 처리된 파일 정보 추가
+            if document_processor:
+                try:
+                    processed_files = document_processor.get_processed_files_info()
+                    debug_data['processed_files'] = processed_files
+                    debug_data['processed_files_count'] = len(processed_files)
+                except Exception as e:
+                    debug_data['processed_files_error'] = str(e)
+            
+            return debug_data
+        
+        return conditional_json(etag, build_debug_data)
     except Exception as e:
         return jsonify({
             'error': str(e),
             'traceback': traceback.format_exc()
         })
 
+@app.route('/api/load')
+def load_info():
+    """실시간 부하 정보 API (로그인 불필요, 요청마다 바뀌므로 캐시하지 않음)"""
+    document_processor, _ = get_processors()
+    response = jsonify({
+        'success': True,
+        'chat_load': get_admission_stats(),
+        'query_encoder': document_processor.query_encoder.get_stats() if document_processor else None,
+        'search_stage_costs_ms': document_processor.get_stage_costs() if document_processor else None
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 형식 메트릭 (METRICS_DIR 설정 시 모든 워커 합산)"""
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.after_request
+def compress_response(response):
+    """큰 JSON 응답 gzip 압축 (클라이언트가 gzip을 받을 수 있을 때만, 스트리밍 제외)"""
+    if response.mimetype != 'application/json' or response.is_streamed or response.direct_passthrough:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or request.accept_encodings['gzip'] <= 0):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+@app.before_request
+def start_request_logging():
+    """요청별 DEBUG 로그 샘플링 결정"""
+    g.debug_sampled, g.debug_sampling_token = begin_request_sampling(LOG_DEBUG_SAMPLE_RATE)
+    REGISTRY.check_process()  # fork된 워커의 첫 요청에서 메트릭 초기화/기록 스레드 시작
+
+@app.teardown_request
+def finish_request_logging(exc=None):
+    token = g.pop('debug_sampling_token', None)
+    if token is not None:
+        end_request_sampling(token)
+
 # 오류 처리
 @app.errorhandler(413)
 def too_large(e):
@@ -642,8 +1380,7 @@ def not_found(e):
 
 @app.errorhandler(500)
 def server_error(e):
-    print(f"500 오류: {e}")
-    traceback.print_exc()
+    logger.exception("500 오류: %s", e)
     return f"서버 오류가 발생했습니다: {str(e)}", 500
 
 if __name__ == '__main__':
@@ -0,0 +1,14 @@
+# benchmarks - 문서 처리/검색 성능 측정 패키지
+"""합성 코퍼스로 문서 처리 단계와 검색 방법의 성능, 검색 품질을 측정한다.
+
+저장소 루트에서 실행:
+    python -m benchmarks run --scales 100,1000 --output bench.json
+    python -m benchmarks run --scales 1000 --baseline bench.json
+    python -m benchmarks compare bench.json new.json
+    python -m benchmarks replay chat_requests.jsonl --concurrency 16 --speed 2
+    python -m benchmarks replay chat_requests.jsonl --target http://localhost:8000 --rate 50
+    python -m benchmarks evaluate --chunks 1000 --encoders simple,all-MiniLM-L6-v2
+    python -m benchmarks evaluate --labels labels.jsonl --upload-dir uploaded_documents
+    python -m benchmarks evaluate --chunks 1000 --embedding-dtypes float32,float16,int8 --configs vector,search
+    python -m benchmarks corpus --chunks 1000 --output-dir /tmp/corpus
+"""
@@ -0,0 +1,215 @@
+# benchmarks/__main__.py - 벤치마크 명령행 (python -m benchmarks)
+import argparse
+import json
+import os
+import sys
+
+# 저장소 루트의 document_processor를 불러오기 위해
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.compare import compare, format_report
+from benchmarks.corpus import FORMATS, generate_corpus
+from benchmarks.evaluate import CONFIGURATIONS, DEFAULT_KS, format_table, run_evaluation
+from benchmarks.replay import HttpTarget, InProcessTarget, build_schedule, load_requests, replay, summarize_replay
+from benchmarks.runner import SEARCH_METHODS, run_benchmarks
+from document_processor import EmbeddingMatrix
+
+
+def _csv(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _print_summary(results):
+    for scale, result in results['scales'].items():
+        ingest, memory = result['ingest'], result['memory']
+        print(f"\n=== {scale} 청크 목표 ({result['corpus']['files']}개 파일, 실제 {ingest['chunks']} 청크) ===")
+        print(f"문서 처리: {ingest['seconds']}초, {ingest['chunks_per_sec']} 청크/초, 실패 {ingest['failed_files']}")
+        for stage, summary in ingest['stages'].items():
+            print(f"  {stage:<10} 합계 {summary.get('total_ms', 0):>10.1f}ms  p95 {summary.get('p95_ms', 0):>8.2f}ms")
+        embeddings = result['embeddings']
+        print(f"임베딩: {embeddings['rows']}x{embeddings['dimensions']} ({embeddings['size_mb']}MB, "
+              f"{embeddings['encoder']}), 재인코딩 {embeddings['reencode'].get('total_ms', 0):.1f}ms")
+        for method, summary in result['search'].items():
+            print(f"  {method:<10} p50 {summary['p50_ms']:>8.2f}ms  p95 {summary['p95_ms']:>8.2f}ms  "
+                  f"p99 {summary['p99_ms']:>8.2f}ms  {summary['qps']} qps")
+        print(f"최대 메모리: {memory['peak_rss_mb']}MB (시작 {memory['rss_before_mb']}MB)")
+
+
+def _print_replay(summary, target_name):
+    print(f"\n=== 재생 결과 ({target_name}, {summary['wall_seconds']}초) ===")
+    for name, section in [('전체', summary['overall'])] + list(summary['paths'].items()):
+        latency = section['latency']
+        scheduled = section['latency_from_schedule']
+        print(f"{name}: {section['requests']}건, {section['throughput_per_sec']}건/초, "
+              f"오류 {section['error_rate'] * 100:.1f}%, 거절 {section['rejected_rate'] * 100:.1f}%, 상태 {section['status']}")
+        if latency['count']:
+            print(f"  지연 p50 {latency['p50_ms']:.1f}ms  p95 {latency['p95_ms']:.1f}ms  p99 {latency['p99_ms']:.1f}ms"
+                  f"  (예정 시각 기준 p99 {scheduled['p99_ms']:.1f}ms)")
+    for error in summary['sample_errors']:
+        print(f"  예외: {error}")
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='문서 처리/검색 벤치마크')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='벤치마크 실행')
+    run.add_argument('--scales', type=_csv, default=['100', '1000'], help='목표 청크 수 목록 (예: 100,1000,10000,100000)')
+    run.add_argument('--formats', type=_csv, default=list(FORMATS), help='문서 형식 (pdf,docx,pptx,xlsx)')
+    run.add_argument('--methods', type=_csv, default=list(SEARCH_METHODS), help='측정할 검색 방법')
+    run.add_argument('--queries', type=int, default=50, help='검색 질의 수')
+    run.add_argument('--repeat', type=int, default=3, help='질의 반복 횟수')
+    run.add_argument('--seed', type=int, default=42)
+    run.add_argument('--corpus-dir', help='생성한 코퍼스를 보관해 재사용할 폴더 (생략 시 임시 폴더)')
+    run.add_argument('--no-isolate', action='store_true', help='규모마다 새 프로세스를 띄우지 않음')
+    run.add_argument('--output', help='결과 JSON 파일')
+    run.add_argument('--baseline', help='비교할 기준 결과 JSON')
+    run.add_argument('--threshold', type=float, default=0.2, help='회귀 판정 기준 (0.2 = 20%%)')
+
+    compare_parser = commands.add_parser('compare', help='두 결과 비교')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.2)
+    compare_parser.add_argument('--only-changed', action='store_true', help='기준 이상 변한 지표만 표시')
+
+    replay_parser = commands.add_parser('replay', help='기록된 채팅 요청(CHAT_RECORD_FILE) 재생 부하 테스트')
+    replay_parser.add_argument('requests_file', help='JSON Lines 요청 기록 파일')
+    replay_parser.add_argument('--target', default='inprocess',
+                               help="'inprocess'(Flask 테스트 클라이언트) 또는 서버 주소 (예: http://localhost:8000)")
+    replay_parser.add_argument('--app-dir', help='inprocess 대상에서 앱을 실행할 폴더 (uploaded_documents가 있는 곳)')
+    replay_parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 수')
+    replay_parser.add_argument('--rate', type=float, default=0.0, help='초당 요청 수 고정 (0이면 기록된 간격 사용)')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help='기록된 간격 재생 배속 (0이면 최대한 빠르게)')
+    replay_parser.add_argument('--paths', type=_csv, help='재생할 경로만 (예: /api/chat,/api/chat/batch)')
+    replay_parser.add_argument('--limit', type=int, help='재생할 최대 요청 수')
+    replay_parser.add_argument('--timeout', type=float, default=30.0, help='HTTP 요청 제한 시간 (초)')
+    replay_parser.add_argument('--output', help='결과 JSON 파일')
+
+    evaluate = commands.add_parser('evaluate', help='검색 설정별 품질(recall@k, MRR)과 지연/메모리 비교')
+    evaluate.add_argument('--labels', help='정답 파일 (JSON Lines, 생략 시 합성 코퍼스의 사실 문장 사용)')
+    evaluate.add_argument('--upload-dir', help='저장된 인덱스 폴더 (--labels 필요, 인코더별로 다시 임베딩)')
+    evaluate.add_argument('--chunks', type=int, default=1000, help='합성 코퍼스 목표 청크 수')
+    evaluate.add_argument('--formats', type=_csv, default=list(FORMATS))
+    evaluate.add_argument('--seed', type=int, default=42)
+    evaluate.add_argument('--corpus-dir', help='생성한 코퍼스를 보관해 재사용할 폴더')
+    evaluate.add_argument('--encoders', type=_csv, default=['simple'],
+                          help="'simple' 또는 로컬 SentenceTransformer 모델 이름/경로 목록")
+    evaluate.add_argument('--configs', type=_csv, default=list(CONFIGURATIONS), help='평가할 검색 설정')
+    evaluate.add_argument('--embedding-dtypes', type=_csv, default=['float32'],
+                          help='비교할 임베딩 보관 형식 목록 (float32,float16,int8)')
+    evaluate.add_argument('--k', type=_csv, default=[str(k) for k in DEFAULT_KS], help='recall@k의 k 목록')
+    evaluate.add_argument('--min-similarity', type=float, default=0.01)
+    evaluate.add_argument('--rerank-mode', default='features', help="rerank 설정의 재순위 방식 (features | cross-encoder)")
+    evaluate.add_argument('--rerank-model', help='cross-encoder 모델 로컬 폴더 경로')
+    evaluate.add_argument('--rerank-candidates', type=int, default=20, help='재순위할 1단계 후보 수 N')
+    evaluate.add_argument('--rerank-budget-ms', type=float, default=50.0, help='질문당 재순위 시간 예산 (ms)')
+    evaluate.add_argument('--limit', type=int, help='평가할 최대 질문 수')
+    evaluate.add_argument('--write-labels', help='사용한 정답 목록을 JSON Lines로 저장 (직접 만든 정답 파일의 틀)')
+    evaluate.add_argument('--output', help='결과 JSON 파일')
+
+    corpus = commands.add_parser('corpus', help='합성 코퍼스만 생성')
+    corpus.add_argument('--chunks', type=int, required=True)
+    corpus.add_argument('--output-dir', required=True)
+    corpus.add_argument('--formats', type=_csv, default=list(FORMATS))
+    corpus.add_argument('--seed', type=int, default=42)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'corpus':
+        manifest = generate_corpus(args.output_dir, args.chunks, args.formats, args.seed)
+        print(f"{len(manifest['files'])}개 파일, {manifest['total_chars']}자, 사실 문장 {len(manifest['facts'])}개")
+        return 0
+
+    if args.command == 'replay':
+        records = load_requests(args.requests_file, args.paths, args.limit)
+        if not records:
+            parser.error('재생할 요청이 없습니다.')
+
+        if args.target == 'inprocess':
+            requests_file = os.path.abspath(args.requests_file)
+            if args.app_dir:
+                os.chdir(args.app_dir)
+            os.environ.setdefault('LOG_LEVEL', 'WARNING')  # 요청별 요약 로그가 결과 출력을 덮지 않도록
+            from app import app
+            target = InProcessTarget(app)
+            args.requests_file = requests_file
+        else:
+            target = HttpTarget(args.target, args.timeout)
+
+        schedule = build_schedule(records, args.rate, args.speed)
+        print(f"{len(records)}건 재생 (동시 {args.concurrency}, 예정 소요 {schedule[-1]:.1f}초)", file=sys.stderr)
+        results, wall_seconds = replay(records, target, args.concurrency, schedule,
+                                       progress=lambda message: print(message, file=sys.stderr))
+        summary = summarize_replay(results, wall_seconds)
+        summary['options'] = {'target': target.name, 'concurrency': args.concurrency, 'rate': args.rate,
+                              'speed': args.speed, 'requests_file': args.requests_file}
+        _print_replay(summary, target.name)
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            print(f"\n결과 저장: {args.output}")
+        return 0
+
+    if args.command == 'evaluate':
+        unknown = set(args.configs) - set(CONFIGURATIONS)
+        if unknown:
+            parser.error(f"알 수 없는 검색 설정: {', '.join(sorted(unknown))}")
+        unknown = set(args.embedding_dtypes) - set(EmbeddingMatrix.DTYPES)
+        if unknown:
+            parser.error(f"지원하지 않는 임베딩 형식: {', '.join(sorted(unknown))}")
+        if args.upload_dir and not args.labels:
+            parser.error('--upload-dir에는 --labels가 필요합니다.')
+
+        evaluation = run_evaluation(args.encoders, args.configs, args.labels, args.upload_dir, args.chunks,
+                                    args.formats, args.seed, args.corpus_dir, sorted(int(k) for k in args.k),
+                                    args.min_similarity, args.limit, args.write_labels,
+                                    progress=lambda message: print(message, file=sys.stderr),
+                                    rerank_mode=args.rerank_mode, rerank_model=args.rerank_model,
+                                    rerank_candidates=args.rerank_candidates,
+                                    rerank_budget_ms=args.rerank_budget_ms,
+                                    embedding_dtypes=args.embedding_dtypes)
+        print(format_table(evaluation))
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(evaluation, f, ensure_ascii=False, indent=2)
+            print(f"\n결과 저장: {args.output}")
+        return 0
+
+    if args.command == 'compare':
+        rows = compare(_load(args.baseline), _load(args.current), args.threshold)
+        print(format_report(rows, args.only_changed, args.threshold))
+        return 1 if any(row['regression'] for row in rows) else 0
+
+    unknown = set(args.formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"지원하지 않는 형식: {', '.join(sorted(unknown))}")
+    unknown = set(args.methods) - set(SEARCH_METHODS)
+    if unknown:
+        parser.error(f"알 수 없는 검색 방법: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks([int(scale) for scale in args.scales], args.formats, args.queries, args.repeat,
+                             args.seed, args.corpus_dir, args.methods, isolate=not args.no_isolate,
+                             progress=lambda message: print(message, file=sys.stderr))
+    _print_summary(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+    if args.baseline:
+        rows = compare(_load(args.baseline), results, args.threshold)
+        print('\n' + format_report(rows, only_changed=True, threshold=args.threshold))
+        return 1 if any(row['regression'] for row in rows) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# benchmarks/compare.py - 벤치마크 결과와 저장된 기준(baseline) 비교
+
+# 값이 작을수록 좋은 지표 / 클수록 좋은 지표 (키 이름 끝부분으로 판단)
+LOWER_IS_BETTER = ('_ms', '_mb', 'seconds')
+HIGHER_IS_BETTER = ('_per_sec', 'qps')
+MIN_DIFF_MS = 0.5  # 이보다 작은 절대 차이는 측정 잡음으로 보고 회귀로 판정하지 않음
+IGNORED = ('max_ms', 'rss_before_mb', 'generate_seconds')  # 단일 이상치, 측정 시작값, 코퍼스 생성 시간은 비교하지 않음
+
+
+def flatten(data, prefix=''):
+    """중첩 dict의 숫자 값을 'a.b.c' 키로 펼침"""
+    items = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            items.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[path] = value
+    return items
+
+
+def _direction(key):
+    name = key.rsplit('.', 1)[-1]
+    if name in IGNORED:
+        return 0
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(baseline, current, threshold=0.2):
+    """두 결과의 공통 지표 비교
+
+    Args:
+        threshold: 나빠진 비율이 이 값을 넘으면 회귀로 판정 (0.2 = 20%)
+
+    Returns:
+        [{'metric', 'baseline', 'current', 'change', 'regression'}] - change는 상대 변화율
+    """
+    base_values = flatten(baseline.get('scales', {}))
+    current_values = flatten(current.get('scales', {}))
+
+    rows = []
+    for key in sorted(base_values.keys() & current_values.keys()):
+        direction = _direction(key)
+        if direction == 0:
+            continue
+
+        before, after = base_values[key], current_values[key]
+        change = (after - before) / before if before else 0.0
+        worse = -change * direction  # 나빠진 비율 (양수면 악화)
+        regression = worse > threshold
+        if regression and key.endswith('_ms') and abs(after - before) < MIN_DIFF_MS:
+            regression = False
+
+        rows.append({'metric': key, 'baseline': before, 'current': after,
+                     'change': round(change, 4), 'regression': regression})
+    return rows
+
+
+def format_report(rows, only_changed=False, threshold=0.2):
+    """비교 결과 표 문자열"""
+    lines = [f"{'지표':<52} {'기준':>12} {'현재':>12} {'변화':>9}"]
+    for row in rows:
+        if only_changed and abs(row['change']) < threshold and not row['regression']:
+            continue
+        mark = '  ▲ 회귀' if row['regression'] else ''
+        lines.append(f"{row['metric']:<52} {row['baseline']:>12.3f} {row['current']:>12.3f} "
+                     f"{row['change'] * 100:>+8.1f}%{mark}")
+
+    regressions = sum(1 for row in rows if row['regression'])
+    lines.append(f"\n비교 지표 {len(rows)}개, 회귀 {regressions}개 (기준 {threshold * 100:.0f}%)")
+    return '\n'.join(lines)
@@ -0,0 +1,305 @@
+# benchmarks/corpus.py - 벤치마크용 합성 한국어/영어 문서 생성 (PDF, DOCX, PPTX, XLSX, 네트워크 불필요)
+import json
+import os
+import random
+import textwrap
+
+# 청크 하나에 들어가는 평균 글자 수 (CHUNK_SIZE 600 - CHUNK_OVERLAP 50)
+CHARS_PER_CHUNK = 550
+
+FORMATS = ('pdf', 'docx', 'pptx', 'xlsx')
+
+KO_SUBJECTS = [
+    '신입 사원', '팀장', '인사 담당자', '보안 관리자', '연구원', '협력 업체', '재무팀', '고객 지원팀',
+    '시설 관리자', '교육 담당자', '품질 관리팀', '구매 담당자', '법무팀', '개발팀', '운영팀', '감사팀'
+]
+KO_OBJECTS = [
+    '출장 신청서', '휴가 계획', '보안 점검표', '연구 보고서', '계약서 초안', '예산 집행 내역', '고객 문의',
+    '장비 반출 기록', '교육 일정', '품질 검사 결과', '구매 요청서', '개인정보 처리 방침', '배포 절차',
+    '장애 보고서', '회의록', '재택근무 신청'
+]
+KO_VERBS = [
+    '검토한다', '승인한다', '제출해야 한다', '보관한다', '작성한다', '공유한다', '점검한다', '갱신한다',
+    '확인해야 한다', '등록한다', '보고한다', '폐기한다'
+]
+KO_MODIFIERS = [
+    '매월 말일까지', '분기마다', '사전에', '즉시', '영업일 기준 3일 이내에', '담당 부서와 협의하여',
+    '전자 결재 시스템으로', '규정에 따라', '필요한 경우', '연 1회 이상'
+]
+
+EN_SUBJECTS = [
+    'The security team', 'Each employee', 'The project manager', 'A contractor', 'The finance office',
+    'The help desk', 'Every reviewer', 'The data owner', 'The release engineer', 'The auditor'
+]
+EN_OBJECTS = [
+    'the travel request', 'the access log', 'the incident report', 'the expense claim', 'the onboarding checklist',
+    'the backup policy', 'the vendor contract', 'the deployment plan', 'the training record', 'the asset inventory'
+]
+EN_VERBS = ['reviews', 'approves', 'archives', 'submits', 'updates', 'verifies', 'signs', 'publishes']
+EN_MODIFIERS = [
+    'before the end of each month', 'within three business days', 'after every release', 'on request',
+    'according to the policy', 'once per quarter', 'in the shared drive', 'with written approval'
+]
+
+# 검색 정답 확인용 고유 사실 문장 (문서마다 서로 다른 코드가 들어감)
+FACT_TEMPLATES_KO = [
+    '{code} 규정에 따르면 {object_topic} {subject_nom} {modifier} {verb}.',
+    '{code} 항목: {subject_topic} {object_acc} {modifier} {verb}.'
+]
+FACT_TEMPLATES_EN = [
+    'Under rule {code}, {subject_lower} {verb} {object} {modifier}.',
+    'Policy {code} states that {subject_lower} {verb} {object} {modifier}.'
+]
+
+
+def _josa(word, pair):
+    """받침 유무에 맞는 조사 ('은는', '을를', '이가')"""
+    last = word[-1]
+    has_final = '가' <= last <= '힣' and (ord(last) - ord('가')) % 28 > 0
+    return word + (pair[0] if has_final else pair[1])
+
+
+class SentenceGenerator:
+    """시드 고정 한국어/영어 문장 생성기"""
+
+    def __init__(self, seed=42, english_ratio=0.3):
+        self.random = random.Random(seed)
+        self.english_ratio = english_ratio
+
+    def sentence(self):
+        r = self.random
+        if r.random() < self.english_ratio:
+            return f"{r.choice(EN_SUBJECTS)} {r.choice(EN_VERBS)} {r.choice(EN_OBJECTS)} {r.choice(EN_MODIFIERS)}."
+        return (f"{_josa(r.choice(KO_SUBJECTS), '은는')} {_josa(r.choice(KO_OBJECTS), '을를')} "
+                f"{r.choice(KO_MODIFIERS)} {r.choice(KO_VERBS)}.")
+
+    def paragraph(self, sentences=6):
+        return ' '.join(self.sentence() for _ in range(sentences))
+
+    def fact(self, code):
+        """고유 코드가 들어간 사실 문장과 그 문장을 찾는 질문
+
+        Returns:
+            (문장, 질문)
+        """
+        r = self.random
+        if r.random() < self.english_ratio:
+            subject, verb = r.choice(EN_SUBJECTS), r.choice(EN_VERBS)
+            obj, modifier = r.choice(EN_OBJECTS), r.choice(EN_MODIFIERS)
+            text = r.choice(FACT_TEMPLATES_EN).format(
+                code=code, subject_lower=subject[0].lower() + subject[1:], verb=verb, object=obj, modifier=modifier)
+            return text, f"What does rule {code} say about {obj}?"
+
+        subject, verb = r.choice(KO_SUBJECTS), r.choice(KO_VERBS)
+        obj, modifier = r.choice(KO_OBJECTS), r.choice(KO_MODIFIERS)
+        text = r.choice(FACT_TEMPLATES_KO).format(
+            code=code, verb=verb, modifier=modifier,
+            subject_topic=_josa(subject, '은는'), subject_nom=_josa(subject, '이가'),
+            object_topic=_josa(obj, '은는'), object_acc=_josa(obj, '을를'))
+        return text, f"{code} 규정에서 {_josa(obj, '은는')} 어떻게 처리하나요?"
+
+    def document(self, target_chars, doc_index, facts_per_doc=3):
+        """목표 글자 수만큼의 단락 목록과 문서에 넣은 사실 목록
+
+        Returns:
+            (단락 목록, [{'code', 'text', 'question'}])
+        """
+        paragraphs = []
+        facts = []
+        length = 0
+        while length < target_chars:
+            paragraph = self.paragraph(self.random.randint(4, 8))
+            # 사실 문장은 문서 안에 고르게 배치
+            if len(facts) < facts_per_doc and length >= target_chars * len(facts) / facts_per_doc:
+                code = f"R{doc_index:05d}-{len(facts) + 1}"
+                text, question = self.fact(code)
+                paragraph = f"{paragraph} {text}"
+                facts.append({'code': code, 'text': text, 'question': question})
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 1
+        return paragraphs, facts
+
+
+# --- 파일 쓰기 ---
+
+def _pdf_hex(text):
+    """Identity-H 인코딩 문자열 (CID = 유니코드 BMP 코드 포인트)"""
+    return ''.join(f"{ord(ch):04X}" for ch in text if ord(ch) <= 0xFFFF)
+
+
+def _to_unicode_cmap(high_bytes):
+    """CID -> 유니코드 매핑 CMap (사용한 상위 바이트 구간만)"""
+    ranges = [f"<{hb:02X}00> <{hb:02X}FF> <{hb:02X}00>" for hb in sorted(high_bytes)]
+    blocks = []
+    for start in range(0, len(ranges), 100):
+        part = ranges[start:start + 100]
+        blocks.append(f"{len(part)} beginbfrange\n" + '\n'.join(part) + "\nendbfrange")
+    return (
+        "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+        "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+        "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+        + '\n'.join(blocks) +
+        "\nendcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+    )
+
+
+def write_pdf(path, paragraphs, title=None):
+    """텍스트 추출 가능한 PDF 직접 작성 (폰트 미포함, ToUnicode CMap으로 한글 추출 지원)"""
+    font_size, leading = 10, 14
+    chars_per_line, lines_per_page = 52, 55
+
+    lines = []
+    if title:
+        lines.append(title)
+    for paragraph in paragraphs:
+        lines.extend(textwrap.wrap(paragraph, chars_per_line, break_long_words=True))
+        lines.append('')
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    high_bytes = {ord(ch) >> 8 for line in lines for ch in line if ord(ch) <= 0xFFFF} or {0}
+    to_unicode = _to_unicode_cmap(high_bytes).encode('ascii')
+
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type0 /BaseFont /BenchSans /Encoding /Identity-H "
+           b"/DescendantFonts [4 0 R] /ToUnicode 5 0 R >>",
+        4: b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /BenchSans "
+           b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+           b"/FontDescriptor 6 0 R /DW 1000 /CIDToGIDMap /Identity >>",
+        5: b"<< /Length %d >>\nstream\n" % len(to_unicode) + to_unicode + b"\nendstream",
+        6: b"<< /Type /FontDescriptor /FontName /BenchSans /Flags 4 /FontBBox [0 -200 1000 900] "
+           b"/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 700 /StemV 80 >>"
+    }
+
+    page_ids = []
+    next_id = 7
+    for page_lines in pages:
+        commands = [f"BT /F1 {font_size} Tf {leading} TL 36 800 Td"]
+        for line in page_lines:
+            commands.append(f"<{_pdf_hex(line)}> Tj T*")
+        commands.append("ET")
+        content = '\n'.join(commands).encode('ascii')
+
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(page_id)
+
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids).encode('ascii')
+    objects[2] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+
+    xref_offset = len(output)
+    size = max(objects) + 1
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for object_id in range(1, size):
+        output += b"%010d 00000 n \n" % offsets[object_id]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset)
+
+    with open(path, 'wb') as f:
+        f.write(output)
+
+
+def write_docx(path, paragraphs, title=None):
+    from docx import Document
+
+    document = Document()
+    if title:
+        document.add_heading(title, level=1)
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def write_pptx(path, paragraphs, title=None, paragraphs_per_slide=3):
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # 빈 슬라이드
+    for start in range(0, len(paragraphs), paragraphs_per_slide):
+        slide = presentation.slides.add_slide(layout)
+        text_frame = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(6.5)).text_frame
+        text_frame.word_wrap = True
+        text_frame.text = f"{title} ({start // paragraphs_per_slide + 1})" if title else ''
+        for paragraph in paragraphs[start:start + paragraphs_per_slide]:
+            text_frame.add_paragraph().text = paragraph
+    presentation.save(path)
+
+
+def write_xlsx(path, paragraphs, title=None):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = 'data'
+    sheet.append(['번호', '제목', '내용'])
+    for n, paragraph in enumerate(paragraphs, 1):
+        sheet.append([n, title or '', paragraph])
+    workbook.save(path)
+
+
+WRITERS = {'pdf': write_pdf, 'docx': write_docx, 'pptx': write_pptx, 'xlsx': write_xlsx}
+
+
+def generate_corpus(output_dir, target_chunks, formats=FORMATS, seed=42, chunks_per_doc=20, facts_per_doc=3):
+    """목표 청크 수에 맞춰 합성 문서 생성 (이미 같은 설정으로 생성된 폴더면 재사용)
+
+    Returns:
+        매니페스트 dict ({'files': [...], 'facts': [...], ...}) - output_dir/corpus.json에도 저장
+    """
+    formats = tuple(formats)
+    config = {'target_chunks': target_chunks, 'formats': list(formats), 'seed': seed,
+              'chunks_per_doc': chunks_per_doc, 'facts_per_doc': facts_per_doc}
+    manifest_path = os.path.join(output_dir, 'corpus.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('config') == config and all(
+                os.path.exists(os.path.join(output_dir, entry['filename'])) for entry in manifest['files']):
+            return manifest
+
+    os.makedirs(output_dir, exist_ok=True)
+    generator = SentenceGenerator(seed)
+    doc_count = max(1, -(-target_chunks // chunks_per_doc))
+    chars_per_doc = chunks_per_doc * CHARS_PER_CHUNK
+
+    files, facts, total_chars = [], [], 0
+    for doc_index in range(doc_count):
+        file_format = formats[doc_index % len(formats)]
+        filename = f"bench_{doc_index:05d}.{file_format}"
+        paragraphs, doc_facts = generator.document(chars_per_doc, doc_index, facts_per_doc)
+        WRITERS[file_format](os.path.join(output_dir, filename), paragraphs, title=f"문서 {doc_index} / Document {doc_index}")
+
+        chars = sum(len(paragraph) for paragraph in paragraphs)
+        total_chars += chars
+        files.append({'filename': filename, 'format': file_format, 'chars': chars})
+        facts.extend(dict(fact, filename=filename) for fact in doc_facts)
+
+    manifest = {'config': config, 'files': files, 'facts': facts, 'total_chars': total_chars}
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def sample_queries(manifest, count, seed=42):
+    """사실 문장 질문과 일반 키워드 질문을 섞은 검색 질의 목록"""
+    r = random.Random(seed)
+    fact_questions = [fact['question'] for fact in manifest['facts']]
+    generic = [f"{obj} 처리 절차" for obj in KO_OBJECTS] + [f"how to handle {obj[4:]}" for obj in EN_OBJECTS]
+
+    queries = []
+    for n in range(count):
+        if fact_questions and n % 3 != 2:
+            queries.append(r.choice(fact_questions))
+        else:
+            queries.append(r.choice(generic))
+    return queries
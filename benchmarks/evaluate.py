@@ -0,0 +1,291 @@
+# benchmarks/evaluate.py - 검색 품질(recall@k, MRR)과 지연/메모리를 검색 설정별로 비교
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from .corpus import FORMATS, generate_corpus
+from .runner import peak_rss_mb, summarize
+from reranker import create_reranker
+
+DEFAULT_KS = (1, 3, 5, 10)
+
+
+def _search(document_processor, query, top_k, min_similarity):
+    return document_processor.search_similar_documents(query, top_k=top_k, min_similarity=min_similarity,
+                                                       rerank=False)
+
+
+def _rerank(document_processor, query, top_k, min_similarity):
+    return document_processor.search_similar_documents(query, top_k=top_k, min_similarity=min_similarity,
+                                                       rerank=True)
+
+
+# 검색 설정 이름 -> (document_processor, 질문, top_k, min_similarity) -> 결과 목록
+CONFIGURATIONS = {
+    'keyword': lambda dp, query, top_k, min_similarity: dp.keyword_search(query, top_k),
+    'vector': lambda dp, query, top_k, min_similarity: dp.vector_search(query, top_k, min_similarity),
+    'substring': lambda dp, query, top_k, min_similarity: dp.substring_search(query, top_k),
+    'search': _search,
+    'rerank': _rerank,  # search 후보 rerank_candidates개를 재순위
+}
+
+
+def load_labels(path):
+    """정답 파일 읽기 (JSON Lines)
+
+    한 줄 형식: {"question": "...", "expected": [{"filename": "...", "contains": "...", "chunk_id": 3}]}
+    expected 항목의 키는 모두 선택이며, 주어진 조건을 모두 만족하는 청크를 정답으로 본다.
+    """
+    labels = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                label = json.loads(line)
+                if label.get('question') and label.get('expected'):
+                    labels.append(label)
+    return labels
+
+
+def labels_from_corpus(manifest):
+    """합성 코퍼스의 사실 문장으로 정답 목록 구성 (사실 코드가 들어간 청크가 정답)"""
+    return [
+        {'question': fact['question'], 'expected': [{'filename': fact['filename'], 'contains': fact['code']}]}
+        for fact in manifest['facts']
+    ]
+
+
+def write_labels(path, labels):
+    with open(path, 'w', encoding='utf-8') as f:
+        for label in labels:
+            f.write(json.dumps(label, ensure_ascii=False) + '\n')
+
+
+def matches(document, expected, get_sources):
+    """청크가 정답 조건 하나를 만족하는지 (근접 중복으로 합쳐진 청크는 출처 중 하나만 맞으면 됨)"""
+    if 'contains' in expected and expected['contains'] not in document.get('content', ''):
+        return False
+    if 'filename' not in expected and 'chunk_id' not in expected:
+        return True
+    for source in get_sources(document):
+        if 'filename' in expected and source.get('filename') != expected['filename']:
+            continue
+        if 'chunk_id' in expected and source.get('chunk_id') != expected['chunk_id']:
+            continue
+        return True
+    return False
+
+
+def score_results(results, expected_items, ks, get_sources):
+    """질문 하나의 recall@k와 역순위
+
+    Returns:
+        ({k: recall}, reciprocal_rank)
+    """
+    first_match = [None] * len(expected_items)  # 정답 항목별 처음 찾은 순위 (1부터)
+    for rank, result in enumerate(results, 1):
+        for n, expected in enumerate(expected_items):
+            if first_match[n] is None and matches(result['document'], expected, get_sources):
+                first_match[n] = rank
+
+    found = [rank for rank in first_match if rank is not None]
+    recall = {k: sum(1 for rank in found if rank <= k) / len(expected_items) for k in ks}
+    return recall, (1.0 / min(found) if found else 0.0)
+
+
+def load_encoder(spec):
+    """'simple'이면 SimpleEmbedding, 그 밖에는 로컬에 있는 SentenceTransformer 모델 이름/경로"""
+    import document_processor as dp_module
+
+    if spec == 'simple':
+        return dp_module.SimpleEmbedding()
+    if not dp_module.HAS_SENTENCE_TRANSFORMERS:
+        raise RuntimeError(f"sentence-transformers가 설치되어 있지 않아 '{spec}' 모델을 사용할 수 없습니다.")
+
+    # 네트워크 없이 로컬 캐시/경로의 모델만 사용
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+    return dp_module.SentenceTransformer(spec)
+
+
+def build_index(encoder, corpus_dir=None, manifest=None, upload_dir=None, work_dir=None, embedding_dtype='float32'):
+    """평가용 인덱스 구성
+
+    합성 코퍼스(corpus_dir + manifest)는 새로 처리하고, upload_dir이 주어지면
+    저장된 인덱스를 불러와 주어진 인코더로 다시 임베딩한다 (디스크에는 저장하지 않음).
+    임베딩은 embedding_dtype 형식으로 보관한다.
+
+    Returns:
+        (DocumentProcessor, 인덱스 구성 초)
+    """
+    from document_processor import DocumentProcessor
+
+    start = time.perf_counter()
+    if upload_dir:
+        document_processor = DocumentProcessor(upload_dir, encoder=encoder, persist=False,
+                                               embedding_dtype=embedding_dtype)
+        document_processor.load_data()
+        document_processor.update_embeddings()
+    else:
+        document_processor = DocumentProcessor(work_dir, encoder=encoder, persist=False,
+                                               embedding_dtype=embedding_dtype)
+        for entry in manifest['files']:
+            document_processor.process_document(os.path.join(corpus_dir, entry['filename']), save=False)
+        # 첫 파일로 어휘를 만든 SimpleEmbedding도 전체 코퍼스 기준으로 맞춤
+        document_processor.update_embeddings()
+    return document_processor, time.perf_counter() - start
+
+
+def evaluate_configuration(document_processor, retrieve, labels, ks=DEFAULT_KS, min_similarity=0.01):
+    """한 검색 설정의 품질/지연/메모리 측정
+
+    지연은 추적 없이 한 번, 질문별 최대 임시 메모리(tracemalloc)는 따로 한 번 더 실행해 잰다.
+    """
+    top_k = max(ks)
+    get_sources = document_processor.get_document_sources
+    recall_sums = {k: 0.0 for k in ks}
+    reciprocal_ranks, latencies, errors = [], [], 0
+
+    for label in labels:
+        start = time.perf_counter()
+        try:
+            results = retrieve(document_processor, label['question'], top_k, min_similarity)
+        except Exception:
+            results = []
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        recall, reciprocal_rank = score_results(results, label['expected'], ks, get_sources)
+        for k in ks:
+            recall_sums[k] += recall[k]
+        reciprocal_ranks.append(reciprocal_rank)
+
+    peak_bytes = 0
+    tracemalloc.start()
+    try:
+        for label in labels:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            try:
+                retrieve(document_processor, label['question'], top_k, min_similarity)
+            except Exception:
+                pass
+            peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    count = len(labels)
+    latency = summarize(latencies)
+    total_seconds = sum(latencies) / 1000
+    return {
+        'questions': count,
+        'errors': errors,
+        'recall': {f"@{k}": round(recall_sums[k] / count, 4) if count else 0.0 for k in ks},
+        'mrr': round(sum(reciprocal_ranks) / count, 4) if count else 0.0,
+        'latency': latency,
+        'qps': round(count / total_seconds, 2) if total_seconds else None,
+        'query_peak_kb': round(peak_bytes / 1024, 1)
+    }
+
+
+def run_evaluation(encoders=('simple',), configs=None, labels_path=None, upload_dir=None, target_chunks=1000,
+                   formats=FORMATS, seed=42, corpus_dir=None, ks=DEFAULT_KS, min_similarity=0.01, limit=None,
+                   labels_output=None, progress=None, rerank_mode='features', rerank_model=None,
+                   rerank_candidates=20, rerank_budget_ms=50.0, embedding_dtypes=('float32',)):
+    """인코더 x 임베딩 형식 x 검색 설정 조합별 평가
+
+    rerank 설정은 rerank_mode(reranker.create_reranker)의 재순위기로 상위
+    rerank_candidates개 후보를 rerank_budget_ms 안에서 다시 정렬한다.
+    embedding_dtypes의 형식마다 인덱스를 따로 구성해 압축에 따른 recall 차이를 비교한다.
+
+    Returns:
+        {'meta': {...}, 'results': [{'encoder', 'config', ...}]}
+    """
+    import logging
+    logging.getLogger().setLevel(logging.WARNING)
+
+    configs = list(configs or CONFIGURATIONS)
+    temp_corpus = corpus_dir is None and not upload_dir
+    work_dir = tempfile.mkdtemp(prefix='bench-eval-')
+    manifest = None
+    try:
+        if not upload_dir:
+            corpus_dir = (os.path.join(work_dir, 'corpus') if temp_corpus
+                          else os.path.join(corpus_dir, f"chunks-{target_chunks}-seed-{seed}"))
+            manifest = generate_corpus(corpus_dir, target_chunks, formats, seed)
+
+        if labels_path:
+            labels = load_labels(labels_path)
+        elif manifest:
+            labels = labels_from_corpus(manifest)
+        else:
+            raise ValueError('저장된 인덱스를 평가하려면 정답 파일(--labels)이 필요합니다.')
+        labels = labels[:limit] if limit else labels
+        if labels_output:
+            write_labels(labels_output, labels)
+
+        results = []
+        for encoder_spec in encoders:
+            encoder = load_encoder(encoder_spec)
+            for embedding_dtype in embedding_dtypes:
+                if progress:
+                    progress(f"인코더 '{encoder_spec}' ({embedding_dtype}) 인덱스 구성 중...")
+                index_dir = os.path.join(work_dir, f"index-{len(results)}")
+                os.makedirs(index_dir, exist_ok=True)
+                document_processor, index_seconds = build_index(
+                    encoder, corpus_dir, manifest, upload_dir, index_dir, embedding_dtype)
+                document_processor.reranker = create_reranker(rerank_mode, rerank_model) if 'rerank' in configs else None
+                document_processor.rerank_candidates = rerank_candidates
+                document_processor.rerank_budget_ms = rerank_budget_ms
+
+                embeddings = document_processor.embeddings
+                index_info = {
+                    'chunks': len(document_processor.documents),
+                    'build_seconds': round(index_seconds, 3),
+                    'embedding_dtype': embedding_dtype,
+                    'embedding_mb': round(embeddings.nbytes / (1024 * 1024), 3) if embeddings is not None else 0.0,
+                    'embedding_dimensions': int(embeddings.shape[1]) if embeddings is not None and embeddings.ndim > 1 else 0
+                }
+
+                for config in configs:
+                    if progress:
+                        progress(f"  '{config}' 평가 중 ({len(labels)}개 질문)")
+                    result = evaluate_configuration(document_processor, CONFIGURATIONS[config], labels, ks,
+                                                    min_similarity)
+                    results.append(dict(result, encoder=encoder_spec, config=config, index=index_info))
+
+        return {
+            'meta': {
+                'labels': labels_path or 'synthetic',
+                'upload_dir': upload_dir,
+                'target_chunks': None if upload_dir else target_chunks,
+                'ks': list(ks),
+                'min_similarity': min_similarity,
+                'rerank': {'mode': rerank_mode, 'model': rerank_model, 'candidates': rerank_candidates,
+                           'budget_ms': rerank_budget_ms} if 'rerank' in configs else None,
+                'embedding_dtypes': list(embedding_dtypes),
+                'peak_rss_mb': peak_rss_mb()
+            },
+            'results': results
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def format_table(evaluation):
+    """설정별 품질/지연 비교 표 문자열"""
+    ks = evaluation['meta']['ks']
+    header = f"{'인코더':<24} {'형식':<8} {'설정':<12}" + ''.join(f" {'R@' + str(k):>6}" for k in ks)
+    header += f" {'MRR':>6} {'p50ms':>8} {'p95ms':>8} {'qps':>9} {'질의KB':>8} {'임베딩MB':>9}"
+    lines = [header]
+    for result in evaluation['results']:
+        latency = result['latency']
+        line = f"{result['encoder'][:24]:<24} {result['index']['embedding_dtype']:<8} {result['config']:<12}"
+        line += ''.join(f" {result['recall']['@' + str(k)]:>6.3f}" for k in ks)
+        line += (f" {result['mrr']:>6.3f} {latency.get('p50_ms', 0):>8.2f} {latency.get('p95_ms', 0):>8.2f}"
+                 f" {result['qps'] or 0:>9.1f} {result['query_peak_kb']:>8.1f} {result['index']['embedding_mb']:>9.2f}")
+        lines.append(line)
+    return '\n'.join(lines)
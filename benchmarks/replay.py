@@ -0,0 +1,182 @@
+# benchmarks/replay.py - 기록된 채팅 요청(JSON Lines) 재생 부하 테스트 (Flask 테스트 클라이언트 또는 HTTP)
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .runner import summarize
+
+REJECTED_STATUS = (429, 503)
+
+
+def load_requests(path, paths=None, limit=None):
+    """기록 파일 읽기 (도착 시각 순, 손상된 줄은 건너뜀)
+
+    Args:
+        paths: 재생할 경로 목록 (예: ['/api/chat']), None이면 전부
+    """
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'path' not in record or (paths and record['path'] not in paths):
+                continue
+            records.append(record)
+    records.sort(key=lambda record: record.get('ts', 0))
+    return records[:limit] if limit else records
+
+
+def build_schedule(records, rate=0.0, speed=1.0):
+    """요청별 시작 시각 (재생 시작 기준 초)
+
+    rate > 0이면 초당 rate개 고정 간격, speed > 0이면 기록된 도착 간격을 speed배
+    빠르게, 둘 다 0이면 모두 0 (동시 처리 수만큼 최대한 빠르게).
+    """
+    if rate > 0:
+        return [n / rate for n in range(len(records))]
+    if speed > 0 and records and 'ts' in records[0]:
+        first = records[0]['ts']
+        return [max(0.0, (record.get('ts', first) - first) / speed) for record in records]
+    return [0.0] * len(records)
+
+
+def _is_success(status, body):
+    """HTTP 200이고 JSON success가 False가 아니며 SSE error 이벤트가 없으면 성공"""
+    if status != 200:
+        return False
+    if body.startswith(b'{'):
+        try:
+            return json.loads(body).get('success', True) is not False
+        except ValueError:
+            return False
+    return b'event: error' not in body
+
+
+class InProcessTarget:
+    """Flask 테스트 클라이언트로 같은 프로세스의 앱에 요청 (스레드마다 클라이언트 하나)"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+        self.name = 'inprocess'
+
+    def send(self, record):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(record['path'], method=record.get('method', 'POST'),
+                               json=record.get('body'), query_string=record.get('args'))
+        try:
+            return response.status_code, response.get_data()
+        finally:
+            response.close()  # 스트리밍 응답의 처리 슬롯 반환
+
+
+class HttpTarget:
+    """HTTP로 실행 중인 서버(gunicorn 등)에 요청"""
+
+    def __init__(self, base_url, timeout=30.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.name = self.base_url
+
+    def send(self, record):
+        url = self.base_url + record['path']
+        if record.get('args'):
+            url += '?' + urllib.parse.urlencode(record['args'])
+
+        data, headers = None, {}
+        if record.get('body') is not None:
+            data = json.dumps(record['body'], ensure_ascii=False).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        http_request = urllib.request.Request(url, data=data, headers=headers, method=record.get('method', 'POST'))
+        try:
+            with urllib.request.urlopen(http_request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+def replay(records, target, concurrency=8, schedule=None, progress=None):
+    """요청을 예정 시각에 맞춰 보내고 결과 수집
+
+    예정 시각에 빈 작업자가 없으면 요청은 대기열에서 기다린다. 그 대기 시간까지
+    포함한 지연(latency_from_schedule)을 따로 기록해 과부하 시 지연이 과소평가되지 않게 한다.
+
+    Returns:
+        (요청별 결과 목록, 전체 소요 초)
+    """
+    schedule = schedule if schedule is not None else [0.0] * len(records)
+    results = [None] * len(records)
+
+    def send(n, scheduled_at):
+        start = time.perf_counter()
+        result = {'path': records[n]['path'], 'status': None, 'ok': False, 'error': None}
+        try:
+            status, body = target.send(records[n])
+            result.update(status=status, ok=_is_success(status, body), bytes=len(body))
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        end = time.perf_counter()
+        result['latency_ms'] = (end - start) * 1000
+        result['latency_from_schedule_ms'] = (end - scheduled_at) * 1000
+        results[n] = result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for n, offset in enumerate(schedule):
+            scheduled_at = started + offset
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, n, scheduled_at)
+            if progress and (n + 1) % 100 == 0:
+                progress(f"{n + 1}/{len(records)} 요청 전송")
+    return results, time.perf_counter() - started
+
+
+def summarize_replay(results, wall_seconds):
+    """처리량, 지연 백분위수, 오류/거절 비율 (전체 및 경로별)"""
+    def section(items):
+        total = len(items)
+        rejected = sum(1 for item in items if item['status'] in REJECTED_STATUS)
+        errors = sum(1 for item in items if not item['ok'] and item['status'] not in REJECTED_STATUS)
+        status_counts = {}
+        for item in items:
+            key = str(item['status']) if item['status'] is not None else 'exception'
+            status_counts[key] = status_counts.get(key, 0) + 1
+        return {
+            'requests': total,
+            'ok': total - rejected - errors,
+            'rejected': rejected,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0,
+            'rejected_rate': round(rejected / total, 4) if total else 0,
+            'throughput_per_sec': round(total / wall_seconds, 2) if wall_seconds else None,
+            'status': status_counts,
+            'latency': summarize([item['latency_ms'] for item in items]),
+            'latency_from_schedule': summarize([item['latency_from_schedule_ms'] for item in items])
+        }
+
+    results = [result for result in results if result is not None]
+    by_path = {}
+    for result in results:
+        by_path.setdefault(result['path'], []).append(result)
+
+    sample_errors = sorted({result['error'] for result in results if result['error']})[:5]
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'overall': section(results),
+        'paths': {path: section(items) for path, items in sorted(by_path.items())},
+        'sample_errors': sample_errors
+    }
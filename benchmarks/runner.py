@@ -0,0 +1,259 @@
+# benchmarks/runner.py - 문서 처리 단계/검색 방법별 소요 시간, 처리량, 최대 메모리 측정
+import contextlib
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .corpus import FORMATS, generate_corpus, sample_queries
+
+# 문서 처리 단계 -> DocumentProcessor 메서드 (process_document 안에서 호출되는 순서)
+INGEST_STAGES = (
+    ('extract', 'get_document_text'),
+    ('clean', 'clean_text'),
+    ('chunk', 'chunk_text'),
+    ('dedup', '_deduplicate_chunks'),
+    ('encode', '_add_documents'),
+)
+SEARCH_METHODS = ('keyword', 'vector', 'substring', 'search', 'analyze')
+
+
+def percentile(sorted_values, q):
+    """선형 보간 백분위수 (sorted_values는 정렬된 목록)"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(samples_ms):
+    """소요 시간 목록(ms) 요약"""
+    values = sorted(samples_ms)
+    if not values:
+        return {'count': 0}
+    total = sum(values)
+    return {
+        'count': len(values),
+        'total_ms': round(total, 3),
+        'mean_ms': round(total / len(values), 3),
+        'p50_ms': round(percentile(values, 50), 3),
+        'p95_ms': round(percentile(values, 95), 3),
+        'p99_ms': round(percentile(values, 99), 3),
+        'max_ms': round(values[-1], 3)
+    }
+
+
+def peak_rss_mb():
+    """프로세스 최대 상주 메모리 (MB, 측정 불가 시 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 bytes 단위
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+@contextlib.contextmanager
+def timed_methods(obj, stages, samples):
+    """obj의 메서드 호출 시간을 단계별로 samples[단계]에 기록 (인스턴스 속성으로 잠시 감쌈)"""
+    for stage, name in stages:
+        method = getattr(obj, name)
+
+        def timed(*args, _method=method, _samples=samples.setdefault(stage, []), **kwargs):
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                _samples.append((time.perf_counter() - start) * 1000)
+
+        setattr(obj, name, timed)
+    try:
+        yield samples
+    finally:
+        for _, name in stages:
+            obj.__dict__.pop(name, None)
+
+
+def time_calls(func, queries, repeat=1, warmup=2):
+    """질의마다 func(query) 소요 시간 측정
+
+    Returns:
+        (소요 시간 목록 ms, 오류 수)
+    """
+    for query in queries[:warmup]:
+        try:
+            func(query)
+        except Exception:
+            pass
+
+    samples, errors = [], 0
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            try:
+                func(query)
+            except Exception:
+                errors += 1
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples, errors
+
+
+def run_scale(target_chunks, options):
+    """한 규모의 코퍼스 생성 → 문서 처리 → 검색 측정
+
+    Returns:
+        결과 dict
+    """
+    logging.getLogger().setLevel(logging.WARNING)
+    from document_processor import DocumentProcessor, QuestionAnalyzer
+
+    rss_start = peak_rss_mb()
+    corpus_root = options.get('corpus_dir')
+    temp_corpus = corpus_root is None
+    corpus_dir = (tempfile.mkdtemp(prefix='bench-corpus-') if temp_corpus
+                  else os.path.join(corpus_root, f"chunks-{target_chunks}-seed-{options['seed']}"))
+    work_dir = tempfile.mkdtemp(prefix='bench-index-')
+
+    try:
+        start = time.perf_counter()
+        manifest = generate_corpus(corpus_dir, target_chunks, options['formats'], options['seed'])
+        corpus_seconds = time.perf_counter() - start
+
+        document_processor = DocumentProcessor(work_dir)
+        analyzer = QuestionAnalyzer(document_processor)
+
+        # 문서 처리 (단계별 시간은 process_document 안의 메서드 호출을 감싸 측정)
+        stage_samples, file_samples, failed = {}, [], 0
+        ingest_start = time.perf_counter()
+        with timed_methods(document_processor, INGEST_STAGES, stage_samples):
+            for entry in manifest['files']:
+                start = time.perf_counter()
+                if not document_processor.process_document(os.path.join(corpus_dir, entry['filename']), save=False):
+                    failed += 1
+                file_samples.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        document_processor.save_data()
+        stage_samples['save'] = [(time.perf_counter() - start) * 1000]
+        ingest_seconds = time.perf_counter() - ingest_start
+
+        chunks = len(document_processor.documents)
+        ingest = {
+            'files': len(manifest['files']),
+            'failed_files': failed,
+            'chunks': chunks,
+            'seconds': round(ingest_seconds, 3),
+            'chunks_per_sec': round(chunks / ingest_seconds, 2) if ingest_seconds else None,
+            'files_per_sec': round(len(manifest['files']) / ingest_seconds, 2) if ingest_seconds else None,
+            'per_file': summarize(file_samples),
+            'stages': {stage: summarize(samples) for stage, samples in stage_samples.items()}
+        }
+
+        # 전체 재인코딩
+        start = time.perf_counter()
+        document_processor.update_embeddings()
+        embeddings = document_processor.embeddings
+        reencode_ms = (time.perf_counter() - start) * 1000
+        embedding_info = {
+            'reencode': summarize([reencode_ms]),
+            'rows': int(embeddings.shape[0]) if embeddings is not None else 0,
+            'dimensions': int(embeddings.shape[1]) if embeddings is not None and embeddings.ndim > 1 else 0,
+            'size_mb': round(embeddings.nbytes / (1024 * 1024), 2) if embeddings is not None else 0,
+            'encoder': type(document_processor.encoder).__name__
+        }
+
+        # 검색
+        snapshot = document_processor.snapshot
+        queries = sample_queries(manifest, options['queries'], options['seed'])
+        methods = {
+            'keyword': lambda q: document_processor.keyword_search(q, 5, snapshot),
+            'vector': lambda q: document_processor.vector_search(q, 5, 0.01, snapshot),
+            'substring': lambda q: document_processor.substring_search(q, 5, snapshot),
+            'search': lambda q: document_processor.search_similar_documents(q, top_k=5, min_similarity=0.05),
+            'analyze': analyzer.analyze_question
+        }
+        search = {}
+        for name in options.get('methods') or SEARCH_METHODS:
+            samples, errors = time_calls(methods[name], queries, options['repeat'])
+            total_seconds = sum(samples) / 1000
+            search[name] = dict(summarize(samples), errors=errors,
+                                qps=round(len(samples) / total_seconds, 2) if total_seconds else None)
+
+        return {
+            'target_chunks': target_chunks,
+            'corpus': {
+                'files': len(manifest['files']),
+                'chars': manifest['total_chars'],
+                'formats': manifest['config']['formats'],
+                'generate_seconds': round(corpus_seconds, 3)
+            },
+            'ingest': ingest,
+            'embeddings': embedding_info,
+            'search': search,
+            'memory': {'rss_before_mb': rss_start, 'peak_rss_mb': peak_rss_mb()}
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if temp_corpus:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(scales, formats=FORMATS, queries=50, repeat=3, seed=42, corpus_dir=None,
+                   methods=None, isolate=True, progress=None):
+    """여러 규모에서 벤치마크 실행
+
+    isolate=True면 규모마다 새 프로세스에서 실행해 최대 메모리(peak RSS)가
+    이전 규모의 영향을 받지 않게 한다.
+
+    Returns:
+        {'meta': {...}, 'scales': {'<청크 수>': 결과}}
+    """
+    import numpy as np
+
+    options = {'formats': list(formats), 'queries': queries, 'repeat': repeat, 'seed': seed,
+               'corpus_dir': corpus_dir, 'methods': list(methods) if methods else None}
+    results = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'options': {key: value for key, value in options.items() if key != 'corpus_dir'}
+        },
+        'scales': {}
+    }
+
+    context = multiprocessing.get_context('spawn')
+    for target_chunks in scales:
+        if progress:
+            progress(f"규모 {target_chunks} 청크 측정 중...")
+        if isolate:
+            with context.Pool(1) as pool:
+                result = pool.apply(run_scale, (target_chunks, options))
+        else:
+            result = run_scale(target_chunks, options)
+        results['scales'][str(target_chunks)] = result
+    return results
@@ -1,51 +1,79 @@
 # document_processor.py - 안정화된 다중 문서 형식 처리 및 벡터 검색 모듈
 import os
+import bisect
 import json
 import pickle
 import re
-from datetime import datetime
+import hashlib
+import gzip
+import zlib
+import threading
+import functools
+import contextlib
+import logging
+import queue
+import time
+from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
 # PDF 처리
 import PyPDF2
 import pdfplumber
 
+from intent_router import IntentRouter
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# 메트릭 (/metrics)
+SEARCH_STAGE_SECONDS = REGISTRY.histogram(
+    'chatbot_search_stage_seconds', '검색/답변 단계별 소요 시간 (초)', ['stage'])
+ENCODE_SECONDS = REGISTRY.histogram(
+    'chatbot_encode_seconds', '임베딩 인코더 호출 소요 시간 (초)', ['kind'])
+ENCODE_TEXTS = REGISTRY.counter(
+    'chatbot_encode_texts_total', '인코딩한 텍스트 수', ['kind'])
+INGEST_STAGE_SECONDS = REGISTRY.histogram(
+    'chatbot_ingest_stage_seconds', '문서 처리 단계별 소요 시간 (초)', ['stage'])
+CACHE_REQUESTS = REGISTRY.counter(
+    'chatbot_cache_requests_total', '캐시 조회 수', ['cache', 'result'])
+INTENT_ROUTED = REGISTRY.counter(
+    'chatbot_intent_routed_total', '검색 없이 의도 답변으로 처리한 질문 수', ['intent'])
+
 # Office 문서 처리 (안전한 로딩)
 try:
     from docx import Document
     HAS_DOCX = True
-    print("✓ python-docx 로딩 성공")
+    logger.info("✓ python-docx 로딩 성공")
 except ImportError as e:
     HAS_DOCX = False
-    print(f"⚠️ python-docx 없음: Word 파일 지원 안함 - {e}")
+    logger.warning("⚠️ python-docx 없음: Word 파일 지원 안함 - %s", e)
 
 try:
     from pptx import Presentation
     HAS_PPTX = True
-    print("✓ python-pptx 로딩 성공")
+    logger.info("✓ python-pptx 로딩 성공")
 except ImportError as e:
     HAS_PPTX = False
-    print(f"⚠️ python-pptx 없음: PowerPoint 파일 지원 안함 - {e}")
+    logger.warning("⚠️ python-pptx 없음: PowerPoint 파일 지원 안함 - %s", e)
 
 try:
     import openpyxl
     import pandas as pd
     HAS_EXCEL = True
-    print("✓ Excel 라이브러리 로딩 성공")
+    logger.info("✓ Excel 라이브러리 로딩 성공")
 except ImportError as e:
     HAS_EXCEL = False
-    print(f"⚠️ openpyxl/pandas 없음: Excel 파일 지원 안함 - {e}")
+    logger.warning("⚠️ openpyxl/pandas 없음: Excel 파일 지원 안함 - %s", e)
 
 # sentence-transformers (안전한 로딩)
 try:
     from sentence_transformers import SentenceTransformer
     HAS_SENTENCE_TRANSFORMERS = True
-    print("✓ sentence-transformers 로딩 성공")
+    logger.info("✓ sentence-transformers 로딩 성공")
 except ImportError as e:
     HAS_SENTENCE_TRANSFORMERS = False
-    print(f"⚠️ sentence-transformers 없음: 기본 임베딩 사용 - {e}")
+    logger.warning("⚠️ sentence-transformers 없음: 기본 임베딩 사용 - %s", e)
 
 class SimpleEmbedding:
     """sentence-transformers가 없을 때 사용하는 간단한 임베딩"""
@@ -53,7 +81,7 @@ class SimpleEmbedding:
     def __init__(self):
         self.vocabulary = {}
         self.vocab_size = 0
-        print("SimpleEmbedding 초기화 (fallback 모드)")
+        logger.debug("SimpleEmbedding 초기화 (fallback 모드)")
     
     def _build_vocabulary(self, texts):
         """텍스트에서 어휘 구축"""
@@ -90,15 +118,784 @@ class SimpleEmbedding:
         
         return np.array(vectors)
 
+class _EncodeRequest:
+    """QueryEncoderService 대기열 항목"""
+    
+    __slots__ = ('texts', 'done', 'result', 'error')
+    
+    def __init__(self, texts):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QueryEncoderService:
+    """동시에 들어오는 질문 임베딩 요청을 모아 한 번의 배치로 인코딩하는 서비스
+    
+    백그라운드 스레드가 첫 요청 이후 window_ms 동안(또는 텍스트가 max_batch_size개
+    찰 때까지) 들어온 요청을 모아 encoder.encode를 한 번만 호출하고 결과를 나눠준다.
+    대기 중인 다른 요청이 없으면 기다리지 않고 바로 인코딩한다.
+    """
+    
+    def __init__(self, encoder, max_batch_size=32, window_ms=5.0):
+        self.encoder = encoder
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        
+        self._queue = queue.Queue()
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+        
+        self.stats = {'requests': 0, 'batches': 0, 'batched_texts': 0, 'max_batch_texts': 0}
+    
+    def encode(self, texts):
+        """encoder.encode와 같은 인터페이스 (배치 가능한 경우 대기열 경유)"""
+        if isinstance(texts, str):
+            texts = [texts]
+        texts = list(texts)
+        
+        # 배치 비활성화 또는 이미 충분히 큰 요청은 바로 인코딩
+        if self.window <= 0 or len(texts) >= self.max_batch_size:
+            ENCODE_TEXTS.labels('query').inc(len(texts))
+            with ENCODE_SECONDS.labels('query').time():
+                return self.encoder.encode(texts)
+        
+        self._ensure_worker()
+        request = _EncodeRequest(texts)
+        with self._inflight_lock:
+            self._inflight += 1
+        try:
+            self._queue.put(request)
+            request.done.wait()
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+        
+        if request.error is not None:
+            raise request.error
+        return request.result
+    
+    def get_stats(self):
+        """배치 통계 (평균 배치 크기 포함)"""
+        stats = dict(self.stats)
+        stats['avg_batch_texts'] = round(stats['batched_texts'] / stats['batches'], 2) if stats['batches'] else 0
+        stats['max_batch_size'] = self.max_batch_size
+        stats['window_ms'] = self.window * 1000.0
+        return stats
+    
+    def _ensure_worker(self):
+        """워커 스레드 시작 (fork된 프로세스에서는 새로 시작)"""
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='query-encoder', daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.window
+            
+            # 아직 대기열에 오지 않은 동시 요청이 있을 때만 창이 끝날 때까지 기다림
+            while size < self.max_batch_size and len(batch) < self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.texts)
+            
+            self._encode_batch(batch, size)
+    
+    def _encode_batch(self, batch, size):
+        texts = [text for request in batch for text in request.texts]
+        ENCODE_TEXTS.labels('query').inc(len(texts))
+        try:
+            with ENCODE_SECONDS.labels('query').time():
+                embeddings = np.asarray(self.encoder.encode(texts))
+            offset = 0
+            for request in batch:
+                count = len(request.texts)
+                request.result = embeddings[offset:offset + count]
+                offset += count
+        except Exception as e:
+            for request in batch:
+                request.error = e
+        finally:
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['batched_texts'] += size
+            self.stats['max_batch_texts'] = max(self.stats['max_batch_texts'], size)
+            for request in batch:
+                request.done.set()
+
+
+# 청크 출처를 나타내는 필드 (근접 중복 병합 시 출처별로 보관)
+SOURCE_FIELDS = ('filename', 'file_type', 'chunk_id', 'file_path', 'processed_date')
+
+
+class MinHashIndex:
+    """청크 근접 중복 탐지를 위한 MinHash 서명 + LSH 밴드 인덱스
+    
+    키(문서 위치)별로 서명을 보관하고, 밴드가 하나라도 겹치는 후보 중
+    추정 자카드 유사도가 threshold 이상인 가장 유사한 키를 반환한다.
+    """
+    
+    _PRIME = 4294967291  # 2^32보다 작은 최대 소수 (서명을 uint32로 저장)
+    
+    def __init__(self, num_perm=64, bands=16, shingle_size=5, threshold=0.85, seed=1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm은 bands의 배수여야 합니다")
+        
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        
+        # a*x + b 연산이 uint64 범위를 넘지 않도록 a < 2^31
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+        
+        self._buckets = {}
+        self._signatures = {}
+    
+    def __len__(self):
+        return len(self._signatures)
+    
+    def signature(self, text):
+        """텍스트의 MinHash 서명 (문자 shingle 기준, 공백/대소문자 정규화)"""
+        normalized = re.sub(r'\s+', ' ', text.lower()).strip()
+        size = self.shingle_size
+        if len(normalized) <= size:
+            shingles = {normalized}
+        else:
+            shingles = {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+        
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles))
+        permuted = (np.outer(hashes, self._a) + self._b) % self._PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+    
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows].tobytes()
+    
+    def add(self, key, signature):
+        """서명을 인덱스에 등록"""
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+    
+    def query(self, signature):
+        """가장 유사한 근접 중복 키 반환 (없으면 None)"""
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        
+        best_key = None
+        best_similarity = self.threshold
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= best_similarity:
+                best_key = key
+                best_similarity = similarity
+        return best_key
+
+class TermIndex:
+    """용어 -> 그 용어가 나오는 청크 위치 (정렬된 배열)
+    
+    용어는 extract_keywords와 같은 규칙(한글/영문/숫자 연속)으로 소문자화해 뽑는다.
+    정렬된 용어 목록으로 접두어 조회를 지원해 조사가 붙은 본문 단어('계약서는')도
+    질문 단어('계약서')로 찾는다.
+    """
+    
+    TERM_PATTERN = re.compile(r'[가-힣]+|[a-z]+|\d+')
+    MAX_PREFIX_TERMS = 256  # 접두어 조회 시 확인할 최대 용어 수 (짧은 접두어의 비용 상한)
+    
+    def __init__(self, documents):
+        postings = {}
+        for position, doc in enumerate(documents):
+            for term in set(self.TERM_PATTERN.findall(doc.get('content', '').lower())):
+                postings.setdefault(term, []).append(position)
+        self._postings = {term: np.asarray(value, dtype=np.int64) for term, value in postings.items()}
+        self._terms = sorted(postings)
+    
+    def __len__(self):
+        return len(self._terms)
+    
+    @classmethod
+    def terms(cls, text):
+        return cls.TERM_PATTERN.findall(text.lower())
+    
+    def first_position(self, term, positions=None):
+        """term으로 시작하는 용어가 처음 나오는 청크 위치 (없으면 None)
+        
+        positions(정렬된 청크 위치 배열, FilterIndex.resolve 결과)가 주어지면 그 안에서만 찾는다.
+        """
+        term = term.lower()
+        start = bisect.bisect_left(self._terms, term)
+        best = None
+        for candidate in self._terms[start:start + self.MAX_PREFIX_TERMS]:
+            if not candidate.startswith(term):
+                break
+            found = self._postings[candidate]
+            if positions is not None:
+                found = np.intersect1d(found, positions, assume_unique=True)
+            if len(found) and (best is None or found[0] < best):
+                best = int(found[0])
+        return best
+
+
+class FilterIndex:
+    """메타데이터 필터용 청크 위치 목록 (파일명별, 문서 형식별)
+    
+    근접 중복으로 합쳐진 청크는 출처 파일마다 등록된다. 처리 날짜 범위는 메타데이터의
+    processed_date로 파일을 고른 뒤 그 파일들의 위치 목록을 합친다.
+    """
+    
+    def __init__(self, documents, metadata):
+        by_filename, by_type = {}, {}
+        for position, doc in enumerate(documents):
+            for source in DocumentProcessor.get_document_sources(doc):
+                by_filename.setdefault(source.get('filename'), []).append(position)
+                by_type.setdefault((source.get('file_type') or 'Unknown').lower(), []).append(position)
+        
+        self._by_filename = {key: np.unique(np.asarray(value, dtype=np.int64)) for key, value in by_filename.items()}
+        self._by_type = {key: np.unique(np.asarray(value, dtype=np.int64)) for key, value in by_type.items()}
+        self._processed_dates = {}
+        for filename, info in metadata.items():
+            try:
+                self._processed_dates[filename] = datetime.fromisoformat(info['processed_date'])
+            except (KeyError, TypeError, ValueError):
+                pass
+    
+    @staticmethod
+    def _union(arrays):
+        arrays = [array for array in arrays if array is not None and len(array)]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+    
+    def resolve(self, filters):
+        """필터를 만족하는 청크 위치 (정렬된 배열, 필터가 없으면 None = 전체)"""
+        if not filters:
+            return None
+        
+        selected = []
+        if 'filename' in filters:
+            selected.append(self._union(self._by_filename.get(name) for name in filters['filename']))
+        if 'file_type' in filters:
+            selected.append(self._union(self._by_type.get(file_type) for file_type in filters['file_type']))
+        if 'date_from' in filters or 'date_before' in filters:
+            date_from, date_before = filters.get('date_from'), filters.get('date_before')
+            filenames = [
+                filename for filename, processed in self._processed_dates.items()
+                if (date_from is None or processed >= date_from) and (date_before is None or processed < date_before)
+            ]
+            selected.append(self._union(self._by_filename.get(filename) for filename in filenames))
+        
+        positions = selected[0]
+        for other in selected[1:]:
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        return positions
+
+
+class EmbeddingMatrix:
+    """float32, float16 또는 int8(차원별 스케일)로 보관하는 임베딩 행렬
+    
+    float32 대비 메모리와 디스크 크기가 float16은 1/2, int8은 약 1/4이다. int8은 차원마다
+    최대 절댓값/127을 스케일로 두고 반올림한 코드만 저장한다. 코사인 유사도는 압축된 코드를
+    BLOCK_ROWS 행씩 float32로 올려 float32 질문 벡터(int8이면 스케일을 미리 곱함)와 곱하므로
+    전체 행렬의 float 사본을 만들지 않는다. 행 노름은 불러올 때 코드에서 다시 계산한다.
+    (numpy의 float16 -> float32 변환은 느려서 검색 시간은 int8이 float16보다 짧다)
+    """
+    
+    DTYPES = ('float32', 'float16', 'int8')
+    BLOCK_ROWS = 2048  # 블록당 float32 임시 배열 크기 (2048 x 차원)
+    INT8_MAX = 127
+    
+    def __init__(self, codes, scales=None):
+        """
+        Args:
+            codes: (행, 차원) float32/float16/int8 배열
+            scales: int8일 때 차원별 스케일 (float32)
+        """
+        self.codes = codes
+        self.scales = scales
+        self.norms = self._row_norms(codes, scales)
+    
+    @classmethod
+    def quantize(cls, embeddings, dtype='float32'):
+        """인코더 출력(float 배열)을 dtype 형식으로 변환
+        
+        Raises:
+            ValueError: 알 수 없는 형식이거나 NaN/Inf 값이 있는 경우 (int8로 바꾸면 검사할 수 없게 됨)
+        """
+        if dtype not in cls.DTYPES:
+            raise ValueError(f"지원하지 않는 임베딩 형식: {dtype} ({', '.join(cls.DTYPES)})")
+        embeddings = cls._finite(embeddings)
+        if embeddings.ndim == 1:
+            embeddings = embeddings.reshape(1, -1)
+        if dtype != 'int8':
+            return cls(embeddings.astype(dtype, copy=False))
+        
+        scales = np.abs(embeddings).max(axis=0) / cls.INT8_MAX if len(embeddings) else np.ones(embeddings.shape[1])
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        return cls(cls._int8_codes(embeddings, scales), scales)
+    
+    @classmethod
+    def from_stored(cls, codes, scales=None, dtype='float32'):
+        """embeddings.pkl에 저장된 배열로 생성 (이전 형식의 float64 배열 포함), dtype이 다르면 변환"""
+        codes = np.asarray(codes)
+        if codes.dtype == np.int8 and scales is not None:
+            matrix = cls(codes, np.asarray(scales, dtype=np.float32))
+        elif codes.dtype in (np.float32, np.float16):
+            matrix = cls(codes)
+        else:
+            matrix = cls.quantize(codes, 'float32')
+        return matrix if matrix.dtype == dtype else matrix.astype(dtype)
+    
+    @staticmethod
+    def _finite(embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not np.all(np.isfinite(embeddings)):
+            raise ValueError("임베딩에 NaN/Inf 값이 있습니다")
+        return embeddings
+    
+    @classmethod
+    def _int8_codes(cls, embeddings, scales):
+        return np.clip(np.rint(embeddings / scales), -cls.INT8_MAX, cls.INT8_MAX).astype(np.int8)
+    
+    @classmethod
+    def _row_norms(cls, codes, scales):
+        norms = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), cls.BLOCK_ROWS):
+            block = codes[start:start + cls.BLOCK_ROWS].astype(np.float32)
+            if scales is not None:
+                block *= scales
+            norms[start:start + len(block)] = np.linalg.norm(block, axis=1)
+        return norms
+    
+    @property
+    def dtype(self):
+        return self.codes.dtype.name
+    
+    @property
+    def shape(self):
+        return self.codes.shape
+    
+    @property
+    def ndim(self):
+        return self.codes.ndim
+    
+    @property
+    def nbytes(self):
+        """코드, 스케일, 행 노름을 합한 바이트 수"""
+        return self.codes.nbytes + self.norms.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def __getitem__(self, rows):
+        """행 선택 (정수 배열/목록/슬라이스), 같은 형식의 새 행렬"""
+        matrix = object.__new__(EmbeddingMatrix)
+        matrix.codes = self.codes[rows]
+        matrix.scales = self.scales
+        matrix.norms = self.norms[rows]
+        return matrix
+    
+    def readonly(self):
+        """쓰기 금지 뷰 (스냅샷용, 배열을 복사하지 않음)"""
+        matrix = self[:]
+        matrix.codes.flags.writeable = False
+        matrix.norms.flags.writeable = False
+        return matrix
+    
+    def dequantize(self):
+        """float32 배열로 복원"""
+        embeddings = self.codes.astype(np.float32)
+        return embeddings * self.scales if self.scales is not None else embeddings
+    
+    def astype(self, dtype):
+        return self if dtype == self.dtype else EmbeddingMatrix.quantize(self.dequantize(), dtype)
+    
+    def append(self, embeddings):
+        """행을 뒤에 붙인 새 행렬 (int8은 새 행이 스케일 범위를 넘는 차원만 스케일을 넓혀 다시 양자화)
+        
+        Raises:
+            ValueError: NaN/Inf 값이 있는 경우
+        """
+        embeddings = self._finite(embeddings)
+        if self.scales is None:
+            return EmbeddingMatrix(np.vstack([self.codes, embeddings.astype(self.codes.dtype, copy=False)]))
+        
+        scales = np.maximum(self.scales, np.abs(embeddings).max(axis=0) / self.INT8_MAX).astype(np.float32)
+        codes = self.codes
+        if np.any(scales > self.scales):
+            codes = self._int8_codes(codes * self.scales, scales)
+        return EmbeddingMatrix(np.vstack([codes, self._int8_codes(embeddings, scales)]), scales)
+    
+    def is_finite(self):
+        return bool(np.all(np.isfinite(self.codes)))
+    
+    def similarities(self, queries, rows=None):
+        """질문 벡터들과 각 행의 코사인 유사도
+        
+        Args:
+            queries: (질문 수, 차원) float 배열
+            rows: 계산할 행 위치 (None이면 전체)
+        
+        Returns:
+            (질문 수, 행 수) float32 배열 (노름이 0인 행/질문은 0)
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(query_norms > 0, query_norms, 1.0)
+        if self.scales is not None:
+            queries = queries * self.scales
+        
+        codes, norms = (self.codes, self.norms) if rows is None else (self.codes[rows], self.norms[rows])
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), self.BLOCK_ROWS):
+            block = codes[start:start + self.BLOCK_ROWS].astype(np.float32, copy=False)
+            scores[:, start:start + len(block)] = queries @ block.T
+        scores /= np.where(norms > 0, norms, np.inf)
+        return scores
+
+
+class IndexSnapshot:
+    """검색 요청이 잠금 없이 읽는 불변 인덱스 스냅샷
+    
+    documents와 embeddings의 길이가 항상 같도록 보장하며(어긋나면 임베딩 제외),
+    쓰기 작업은 스냅샷을 수정하지 않고 새 스냅샷으로 참조를 교체한다.
+    용어 인덱스(term_index)와 필터 인덱스(filter_index)는 처음 필요할 때 한 번 만든다.
+    """
+    
+    __slots__ = ('documents', 'embeddings', 'metadata', 'stats', 'version', 'published_at',
+                 '_term_index', '_filter_index', '_lazy_lock')
+    
+    def __init__(self, documents=(), embeddings=None, metadata=None, version=0, stats=None):
+        documents = tuple(documents)
+        if embeddings is not None:
+            if not isinstance(embeddings, EmbeddingMatrix):
+                embeddings = EmbeddingMatrix.quantize(embeddings)
+            if len(embeddings) != len(documents):
+                logger.warning("⚠️ 스냅샷 임베딩 길이 불일치 (%s != %s), 벡터 검색 제외", len(embeddings), len(documents))
+                embeddings = None
+            else:
+                embeddings = embeddings.readonly()
+        
+        self.documents = documents
+        self.embeddings = embeddings
+        self.metadata = dict(metadata or {})
+        self.stats = stats.copy() if stats is not None else CorpusStats.from_index(documents, self.metadata)
+        self.stats.version = version
+        self.version = version
+        self.published_at = datetime.now()
+        self._term_index = None
+        self._filter_index = None
+        self._lazy_lock = threading.Lock()
+    
+    def _lazy(self, slot, cache, build):
+        """스냅샷마다 처음 조회할 때 한 번만 만드는 보조 인덱스"""
+        value = getattr(self, slot)
+        if value is None:
+            with self._lazy_lock:
+                value = getattr(self, slot)
+                if value is None:
+                    CACHE_REQUESTS.labels(cache, 'miss').inc()
+                    value = build()
+                    setattr(self, slot, value)
+                    return value
+        CACHE_REQUESTS.labels(cache, 'hit').inc()
+        return value
+    
+    @property
+    def term_index(self):
+        """용어 인덱스 (처음 조회할 때 생성)"""
+        return self._lazy('_term_index', 'term_index', lambda: TermIndex(self.documents))
+    
+    @property
+    def filter_index(self):
+        """메타데이터 필터 인덱스 (처음 조회할 때 생성)"""
+        return self._lazy('_filter_index', 'filter_index', lambda: FilterIndex(self.documents, self.metadata))
+    
+    def filter_positions(self, filters):
+        """정규화된 필터를 만족하는 청크 위치 (필터가 없으면 None)"""
+        return self.filter_index.resolve(filters) if filters else None
+
+
+class CorpusStats:
+    """코퍼스 통계 (청크/파일 수, 형식별 개수, 파일 크기 합계)
+    
+    문서 추가/삭제 시 증분으로 갱신하므로 조회할 때 전체 문서를 순회하지 않는다.
+    스냅샷에는 게시 시점의 복사본이 들어가고 version은 스냅샷 버전과 같다.
+    """
+    
+    __slots__ = ('total_chunks', 'chunk_types', 'total_files', 'file_types', 'total_bytes', 'version')
+    
+    def __init__(self):
+        self.total_chunks = 0
+        self.chunk_types = {}
+        self.total_files = 0
+        self.file_types = {}
+        self.total_bytes = 0
+        self.version = 0
+    
+    @classmethod
+    def from_index(cls, documents, metadata):
+        """문서 목록과 메타데이터에서 통계를 새로 계산"""
+        stats = cls()
+        stats.add_chunks(documents)
+        for info in metadata.values():
+            stats.add_file(info)
+        return stats
+    
+    @staticmethod
+    def _count(counter, key, delta):
+        count = counter.get(key, 0) + delta
+        if count > 0:
+            counter[key] = count
+        else:
+            counter.pop(key, None)
+    
+    def add_chunks(self, docs, sign=1):
+        """청크 추가 (sign=-1이면 제거)"""
+        for doc in docs:
+            self._count(self.chunk_types, doc.get('file_type', 'Unknown'), sign)
+            self.total_chunks += sign
+    
+    def remove_chunks(self, docs):
+        """청크 제거"""
+        self.add_chunks(docs, sign=-1)
+    
+    def add_file(self, info, sign=1):
+        """메타데이터 항목 추가 (sign=-1이면 제거)"""
+        self._count(self.file_types, info.get('file_type', 'Unknown'), sign)
+        self.total_files += sign
+        self.total_bytes += sign * (info.get('file_size') or 0)
+    
+    def remove_file(self, info):
+        """메타데이터 항목 제거"""
+        self.add_file(info, sign=-1)
+    
+    def copy(self):
+        stats = CorpusStats()
+        stats.total_chunks = self.total_chunks
+        stats.chunk_types = dict(self.chunk_types)
+        stats.total_files = self.total_files
+        stats.file_types = dict(self.file_types)
+        stats.total_bytes = self.total_bytes
+        stats.version = self.version
+        return stats
+    
+    def as_dict(self):
+        return {
+            'total_chunks': self.total_chunks,
+            'chunk_types': dict(self.chunk_types),
+            'total_files': self.total_files,
+            'file_types': dict(self.file_types),
+            'total_bytes': self.total_bytes,
+            'version': self.version
+        }
+
+
+class UploadManifest:
+    """업로드 폴더 파일 목록 캐시
+    
+    업로드/삭제 시 해당 파일 항목만 갱신하고, 조회할 때는 폴더 mtime만 확인해
+    바뀐 경우에만 폴더 전체를 다시 읽는다 (외부에서 파일을 넣거나 지운 경우).
+    """
+    
+    MTIME_SETTLE_SECONDS = 2.0  # mtime 해상도가 낮은 파일시스템에서 같은 시각의 변경을 놓치지 않도록
+    
+    def __init__(self, folder, supported_extensions):
+        self.folder = folder
+        self.supported_extensions = supported_extensions
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dir_mtime = None
+        self.generation = 0  # 파일 목록이 바뀔 때마다 증가 (ETag용)
+        self.stats = {'rescans': 0, 'hits': 0}
+    
+    def _folder_mtime(self):
+        try:
+            return os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _trust_mtime(self, mtime_ns):
+        """방금 바뀐 폴더 mtime은 신뢰하지 않음 (다음 조회에서 다시 확인)"""
+        if mtime_ns is None or time.time() - mtime_ns / 1e9 < self.MTIME_SETTLE_SECONDS:
+            return None
+        return mtime_ns
+    
+    def _build_entry(self, filename):
+        _, ext = os.path.splitext(filename.lower())
+        if ext not in self.supported_extensions:
+            return None
+        
+        try:
+            stat = os.stat(os.path.join(self.folder, filename))
+        except OSError:
+            return None
+        
+        return {
+            'filename': filename,
+            'file_type': self.supported_extensions[ext],
+            'size': stat.st_size,
+            'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
+        }
+    
+    def _rescan(self, mtime_ns):
+        entries = {}
+        for filename in os.listdir(self.folder):
+            entry = self._build_entry(filename)
+            if entry:
+                entries[filename] = entry
+        
+        if entries != self._entries:
+            self.generation += 1
+        self._entries = entries
+        self._dir_mtime = self._trust_mtime(mtime_ns)
+        self.stats['rescans'] += 1
+    
+    def _revalidate(self):
+        """폴더 mtime이 바뀌었으면 다시 읽기 (잠금 안에서 호출)"""
+        mtime_ns = self._folder_mtime()
+        if mtime_ns is None:
+            if self._entries:
+                self.generation += 1
+            self._entries = {}
+            self._dir_mtime = None
+        elif self._dir_mtime is None or mtime_ns != self._dir_mtime:
+            self._rescan(mtime_ns)
+            CACHE_REQUESTS.labels('upload_manifest', 'miss').inc()
+        else:
+            self.stats['hits'] += 1
+            CACHE_REQUESTS.labels('upload_manifest', 'hit').inc()
+    
+    def files(self):
+        """파일 목록 (파일명 순, 폴더가 바뀌었을 때만 다시 읽음)"""
+        with self._lock:
+            self._revalidate()
+            return [dict(self._entries[filename]) for filename in sorted(self._entries)]
+    
+    def current_generation(self):
+        """목록을 복사하지 않고 최신 여부만 확인한 세대 번호"""
+        with self._lock:
+            self._revalidate()
+            return self.generation
+    
+    def filenames(self):
+        """파일명 목록"""
+        return [entry['filename'] for entry in self.files()]
+    
+    def _after_change(self, previous_mtime):
+        """직접 반영한 변경 이후 폴더 mtime 갱신 (그 전에 캐시가 유효했던 경우에만)"""
+        if self._dir_mtime is not None and previous_mtime == self._dir_mtime:
+            self._dir_mtime = self._trust_mtime(self._folder_mtime())
+        else:
+            self._dir_mtime = None
+    
+    def record(self, file_path, previous_mtime=None):
+        """업로드된 파일 항목 추가/갱신
+        
+        Args:
+            previous_mtime: 파일을 만들기 직전 폴더 mtime (folder_mtime() 결과)
+        """
+        filename = os.path.basename(file_path)
+        with self._lock:
+            entry = self._build_entry(filename)
+            if entry:
+                self._entries[filename] = entry
+            else:
+                self._entries.pop(filename, None)
+            self.generation += 1
+            self._after_change(previous_mtime)
+    
+    def discard(self, filename, previous_mtime=None):
+        """삭제된 파일 항목 제거"""
+        with self._lock:
+            if self._entries.pop(filename, None) is not None:
+                self.generation += 1
+            self._after_change(previous_mtime)
+    
+    def folder_mtime(self):
+        """현재 폴더 mtime (record/discard의 previous_mtime용)"""
+        return self._folder_mtime()
+    
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, files=len(self._entries), generation=self.generation,
+                        cached=self._dir_mtime is not None)
+
+
+def index_writer(method):
+    """인덱스를 변경하는 메서드용 데코레이터
+    
+    쓰기 잠금 안에서 실행하고, 가장 바깥 호출이 끝날 때 새 스냅샷을 게시한다.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.bulk_update():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class DocumentProcessor:
     """안정화된 다중 문서 형식 처리 및 벡터 검색 클래스"""
     
-    def __init__(self, upload_folder):
-        print(f"\n=== DocumentProcessor 초기화 시작 ===")
+    # 처리 파라미터 (추출/정리/청킹 로직이 바뀌면 PROCESSING_VERSION을 올려 재처리 대상으로 만든다)
+    PROCESSING_VERSION = 1
+    EXTRACTOR_VERSION = 1
+    CHUNK_SIZE = 600
+    CHUNK_OVERLAP = 50
+    MIN_TEXT_LENGTH = 50
+    DEDUP_THRESHOLD = 0.85  # 추정 자카드 유사도가 이 이상이면 같은 청크로 합침
+    HASH_BLOCK_SIZE = 1024 * 1024
+    REBUILD_MIN_CHUNK_RATIO = 0.5  # 재구축 결과 청크 수가 현재의 이 비율 미만이면 교체 거부
+    SEARCH_STAGES = ('substring', 'keyword', 'vector')  # 비용이 낮은 순서로 실행
+    STAGE_COST_SMOOTHING = 0.2  # 단계별 소요 시간 이동 평균의 새 측정값 가중치
+    SENTENCE_END = re.compile(r'[.!?。](?=\s|$)|\n')  # 문장 끝 (소수점 등 공백 없는 마침표는 제외)
+    
+    def __init__(self, upload_folder, encoder=None, persist=True,
+                 query_batch_size=32, query_batch_window_ms=5.0,
+                 reranker=None, rerank_candidates=20, rerank_budget_ms=50.0, embedding_dtype='float32'):
+        """
+        Args:
+            upload_folder: 문서와 인덱스 파일이 저장되는 폴더
+            encoder: 이미 로드된 임베딩 모델 (스테이징 인덱스가 모델을 공유할 때)
+            persist: False면 디스크에서 로드/저장하지 않음 (스테이징 인덱스용)
+            query_batch_size: 질문 임베딩 마이크로 배치의 최대 텍스트 수
+            query_batch_window_ms: 동시 질문을 모으는 최대 대기 시간 (0이면 배치 안 함)
+            reranker: 2단계 재순위기 (reranker.create_reranker 결과, None이면 1단계 결과 그대로)
+            rerank_candidates: 1단계 검색이 재순위에 넘길 후보 수 N
+            rerank_budget_ms: 재순위에 쓸 최대 시간 (요청 마감 시각이 더 빠르면 그쪽을 따름)
+            embedding_dtype: 임베딩 보관 형식 (EmbeddingMatrix.DTYPES, 메모리와 embeddings.pkl에 같은 형식)
+        """
+        logger.info("=== DocumentProcessor 초기화 시작 ===")
         
         self.upload_folder = upload_folder
+        self.persist = persist
         self.embeddings_file = os.path.join(upload_folder, 'embeddings.pkl')
         self.metadata_file = os.path.join(upload_folder, 'metadata.json')
+        self.text_cache_folder = os.path.join(upload_folder, 'text_cache')
         
         # 실제 지원 가능한 파일 확장자만 포함
         self.supported_extensions = {'.pdf': 'PDF'}
@@ -111,28 +908,117 @@ class DocumentProcessor:
             self.supported_extensions['.xlsx'] = 'Excel'
             self.supported_extensions['.xls'] = 'Excel (Legacy)'
         
-        print(f"지원 파일 형식: {list(self.supported_extensions.values())}")
+        logger.info("지원 파일 형식: %s", list(self.supported_extensions.values()))
+        
+        # 업로드 폴더 파일 목록 캐시
+        self.upload_manifest = UploadManifest(upload_folder, self.supported_extensions)
+        
+        # 메타데이터에 함께 기록되어 변경 여부 판단에 사용
+        self.processing_params = {
+            'version': self.PROCESSING_VERSION,
+            'extractor_version': self.EXTRACTOR_VERSION,
+            'chunk_size': self.CHUNK_SIZE,
+            'overlap': self.CHUNK_OVERLAP,
+            'min_text_length': self.MIN_TEXT_LENGTH,
+            'dedup_threshold': self.DEDUP_THRESHOLD
+        }
         
         # 임베딩 모델 안전 초기화
-        self.encoder = None
-        self._safe_init_encoder()
+        self.encoder = encoder
+        if self.encoder is None:
+            self._safe_init_encoder()
+        
+        # 질문 임베딩은 동시 요청을 모아 배치로 인코딩
+        self.query_encoder = QueryEncoderService(self.encoder, query_batch_size, query_batch_window_ms)
         
-        # 데이터 저장소
-        self.documents = []
-        self.embeddings = None
+        # 2단계 검색 (1단계 후보 N개를 재순위)
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self.rerank_budget_ms = rerank_budget_ms
+        
+        # 임베딩 보관 형식 (float16/int8이면 메모리/디스크 절약)
+        if embedding_dtype not in EmbeddingMatrix.DTYPES:
+            logger.warning("⚠️ 알 수 없는 임베딩 형식 '%s', float32 사용", embedding_dtype)
+            embedding_dtype = 'float32'
+        self.embedding_dtype = embedding_dtype
+        
+        # 데이터 저장소 (쓰기 작업 전용 작업본, 검색은 스냅샷을 사용)
+        self._documents = []
+        self._embeddings = None
         self.metadata = {}
+        self._minhash_index = None  # 근접 중복 탐지용 (필요할 때 생성)
+        self._stats = CorpusStats()  # 작업본 통계 (문서/메타데이터 변경 시 증분 갱신)
+        self._stage_cost_ms = {}  # 검색 단계별 소요 시간 이동 평균 (마감 시간 판단용)
+        
+        # 검색용 스냅샷과 쓰기 잠금
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._snapshot = IndexSnapshot()
+        
+        # 백그라운드 재구축 상태와 롤백용 이전 인덱스
+        self._rebuild_lock = threading.Lock()
+        self._previous_state = None
+        self.rebuild_status = {'state': 'idle'}
         
         # 데이터 로드
-        self.load_data()
+        if self.persist:
+            self.load_data()
+        self._publish_snapshot()
         
-        print(f"=== DocumentProcessor 초기화 완료 ===")
-        print(f"로드된 문서: {len(self.documents)}개")
+        logger.info("=== DocumentProcessor 초기화 완료 ===")
+        logger.info("로드된 문서: %s개", len(self._documents))
+    
+    @property
+    def snapshot(self):
+        """현재 검색용 인덱스 스냅샷 (한 요청 안에서는 한 번만 가져와 사용)"""
+        return self._snapshot
+    
+    @property
+    def documents(self):
+        """현재 스냅샷의 문서 목록 (읽기 전용)"""
+        return self._snapshot.documents
+    
+    @property
+    def embeddings(self):
+        """현재 스냅샷의 임베딩 행렬 (읽기 전용 EmbeddingMatrix)"""
+        return self._snapshot.embeddings
+    
+    @property
+    def corpus_stats(self):
+        """현재 스냅샷의 코퍼스 통계 (O(1) 조회)"""
+        return self._snapshot.stats
+    
+    @property
+    def index_version(self):
+        """인덱스가 바뀔 때마다 증가하는 버전"""
+        return self._snapshot.version
+    
+    @contextlib.contextmanager
+    def bulk_update(self):
+        """여러 쓰기 작업을 묶어 마지막에 스냅샷을 한 번만 게시 (대량 수집용)
+        
+        with processor.bulk_update(): 안의 process_document 등은 중첩 쓰기가 되어
+        호출마다 문서 튜플을 다시 만들지 않고, 블록이 끝날 때 한 번 교체한다.
+        """
+        with self._write_lock:
+            self._write_depth += 1
+            try:
+                yield self
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._publish_snapshot()
+    
+    def _publish_snapshot(self):
+        """작업본으로 새 스냅샷을 만들어 원자적으로 교체"""
+        self._snapshot = IndexSnapshot(
+            self._documents, self._embeddings, self.metadata, self._snapshot.version + 1, self._stats)
     
     def _safe_init_encoder(self):
         """임베딩 모델 안전 초기화"""
         if HAS_SENTENCE_TRANSFORMERS:
             try:
-                print("sentence-transformers 모델 로딩 시도...")
+                logger.info("sentence-transformers 모델 로딩 시도...")
                 # 가장 안정적인 모델 순서대로 시도
                 models_to_try = [
                     'all-MiniLM-L6-v2',
@@ -142,28 +1028,28 @@ class DocumentProcessor:
                 
                 for model_name in models_to_try:
                     try:
-                        print(f"모델 시도: {model_name}")
+                        logger.debug("모델 시도: %s", model_name)
                         self.encoder = SentenceTransformer(model_name)
-                        print(f"✓ {model_name} 로딩 성공")
+                        logger.info("✓ %s 로딩 성공", model_name)
                         return
                     except Exception as e:
-                        print(f"✗ {model_name} 로딩 실패: {e}")
+                        logger.warning("✗ %s 로딩 실패: %s", model_name, e)
                         continue
                 
-                print("모든 sentence-transformers 모델 로딩 실패, SimpleEmbedding 사용")
+                logger.warning("모든 sentence-transformers 모델 로딩 실패, SimpleEmbedding 사용")
                 self.encoder = SimpleEmbedding()
                 
             except Exception as e:
-                print(f"sentence-transformers 초기화 전체 실패: {e}")
+                logger.warning("sentence-transformers 초기화 전체 실패: %s", e)
                 self.encoder = SimpleEmbedding()
         else:
-            print("sentence-transformers 없음, SimpleEmbedding 사용")
+            logger.info("sentence-transformers 없음, SimpleEmbedding 사용")
             self.encoder = SimpleEmbedding()
     
-    def extract_text_from_pdf(self, pdf_path):
-        """PDF에서 텍스트 추출 (안정화)"""
-        print(f"PDF 텍스트 추출: {os.path.basename(pdf_path)}")
-        text = ""
+    def extract_pages_from_pdf(self, pdf_path):
+        """PDF에서 페이지별 텍스트 추출 (안정화)"""
+        logger.debug("PDF 텍스트 추출: %s", os.path.basename(pdf_path))
+        pages = []
         
         try:
             # pdfplumber 우선 시도
@@ -172,13 +1058,13 @@ class DocumentProcessor:
                     try:
                         page_text = page.extract_text()
                         if page_text and page_text.strip():
-                            text += page_text + "\n"
+                            pages.append(page_text + "\n")
                     except Exception as e:
-                        print(f"페이지 {i+1} 처리 오류: {e}")
+                        logger.warning("페이지 %s 처리 오류: %s", i+1, e)
                         continue
                         
         except Exception as e1:
-            print(f"pdfplumber 실패, PyPDF2 시도: {e1}")
+            logger.warning("pdfplumber 실패, PyPDF2 시도: %s", e1)
             
             try:
                 with open(pdf_path, 'rb') as file:
@@ -187,29 +1073,28 @@ class DocumentProcessor:
                         try:
                             page_text = page.extract_text()
                             if page_text and page_text.strip():
-                                text += page_text + "\n"
+                                pages.append(page_text + "\n")
                         except Exception as e:
-                            print(f"PyPDF2 페이지 {i+1} 처리 오류: {e}")
+                            logger.warning("PyPDF2 페이지 %s 처리 오류: %s", i+1, e)
                             continue
             except Exception as e2:
-                print(f"PyPDF2도 실패: {e2}")
+                logger.warning("PyPDF2도 실패: %s", e2)
                 return None
         
-        extracted_text = text.strip() if text.strip() else None
-        if extracted_text:
-            print(f"✓ PDF 텍스트 추출 성공: {len(extracted_text)}자")
-        else:
-            print("✗ PDF 텍스트 추출 실패")
+        if self.join_pages(pages):
+            logger.info("✓ PDF 텍스트 추출 성공: %s페이지", len(pages))
+            return pages
         
-        return extracted_text
+        logger.warning("✗ PDF 텍스트 추출 실패")
+        return None
     
-    def extract_text_from_docx(self, docx_path):
-        """Word 문서에서 텍스트 추출 (안전화)"""
+    def extract_pages_from_docx(self, docx_path):
+        """Word 문서에서 텍스트 추출 (본문, 표 순서의 섹션 목록)"""
         if not HAS_DOCX:
             return None
         
         try:
-            print(f"Word 문서 처리: {os.path.basename(docx_path)}")
+            logger.debug("Word 문서 처리: %s", os.path.basename(docx_path))
             doc = Document(docx_path)
             text = ""
             
@@ -219,6 +1104,7 @@ class DocumentProcessor:
                     text += paragraph.text.strip() + "\n"
             
             # 표 텍스트 추출 (안전하게)
+            table_text = ""
             try:
                 for table in doc.tables:
                     for row in table.rows:
@@ -227,28 +1113,29 @@ class DocumentProcessor:
                             if cell.text and cell.text.strip():
                                 row_text.append(cell.text.strip())
                         if row_text:
-                            text += " | ".join(row_text) + "\n"
+                            table_text += " | ".join(row_text) + "\n"
             except Exception as e:
-                print(f"Word 표 처리 오류 (무시): {e}")
+                logger.warning("Word 표 처리 오류 (무시): %s", e)
             
-            result = text.strip() if text.strip() else None
-            if result:
-                print(f"✓ Word 텍스트 추출 성공: {len(result)}자")
-            return result
+            pages = [section for section in (text, table_text) if section]
+            if self.join_pages(pages):
+                logger.info("✓ Word 텍스트 추출 성공: %s개 섹션", len(pages))
+                return pages
+            return None
             
         except Exception as e:
-            print(f"✗ Word 문서 처리 오류: {e}")
+            logger.warning("✗ Word 문서 처리 오류: %s", e)
             return None
     
-    def extract_text_from_pptx(self, pptx_path):
-        """PowerPoint 문서에서 텍스트 추출 (안전화)"""
+    def extract_pages_from_pptx(self, pptx_path):
+        """PowerPoint 문서에서 슬라이드별 텍스트 추출 (안전화)"""
         if not HAS_PPTX:
             return None
         
         try:
-            print(f"PowerPoint 문서 처리: {os.path.basename(pptx_path)}")
+            logger.debug("PowerPoint 문서 처리: %s", os.path.basename(pptx_path))
             prs = Presentation(pptx_path)
-            text = ""
+            pages = []
             
             for i, slide in enumerate(prs.slides):
                 slide_text = f"\n=== 슬라이드 {i+1} ===\n"
@@ -271,32 +1158,32 @@ class DocumentProcessor:
                                     if row_text:
                                         slide_text += " | ".join(row_text) + "\n"
                             except Exception as e:
-                                print(f"PowerPoint 표 처리 오류 (무시): {e}")
+                                logger.warning("PowerPoint 표 처리 오류 (무시): %s", e)
                                 
                     except Exception as e:
-                        print(f"PowerPoint shape 처리 오류 (무시): {e}")
+                        logger.warning("PowerPoint shape 처리 오류 (무시): %s", e)
                         continue
                 
                 if slide_text.strip() != f"=== 슬라이드 {i+1} ===":
-                    text += slide_text
+                    pages.append(slide_text)
             
-            result = text.strip() if text.strip() else None
-            if result:
-                print(f"✓ PowerPoint 텍스트 추출 성공: {len(result)}자")
-            return result
+            if self.join_pages(pages):
+                logger.info("✓ PowerPoint 텍스트 추출 성공: %s개 슬라이드", len(pages))
+                return pages
+            return None
             
         except Exception as e:
-            print(f"✗ PowerPoint 문서 처리 오류: {e}")
+            logger.warning("✗ PowerPoint 문서 처리 오류: %s", e)
             return None
     
-    def extract_text_from_excel(self, excel_path):
-        """Excel 문서에서 텍스트 추출 (안전화)"""
+    def extract_pages_from_excel(self, excel_path):
+        """Excel 문서에서 시트별 텍스트 추출 (안전화)"""
         if not HAS_EXCEL:
             return None
         
         try:
-            print(f"Excel 문서 처리: {os.path.basename(excel_path)}")
-            text = ""
+            logger.debug("Excel 문서 처리: %s", os.path.basename(excel_path))
+            pages = []
             
             # pandas로 안전하게 읽기
             excel_file = pd.ExcelFile(excel_path)
@@ -327,38 +1214,111 @@ class DocumentProcessor:
                             if row_text:
                                 sheet_text += " | ".join(row_text) + "\n"
                         
-                        text += sheet_text
+                        pages.append(sheet_text)
                         
                 except Exception as e:
-                    print(f"Excel 시트 {sheet_name} 처리 오류 (무시): {e}")
+                    logger.warning("Excel 시트 %s 처리 오류 (무시): %s", sheet_name, e)
                     continue
             
-            result = text.strip() if text.strip() else None
-            if result:
-                print(f"✓ Excel 텍스트 추출 성공: {len(result)}자")
-            return result
+            if self.join_pages(pages):
+                logger.info("✓ Excel 텍스트 추출 성공: %s개 시트", len(pages))
+                return pages
+            return None
             
         except Exception as e:
-            print(f"✗ Excel 문서 처리 오류: {e}")
+            logger.warning("✗ Excel 문서 처리 오류: %s", e)
             return None
     
-    def extract_text_from_document(self, file_path):
-        """파일 형식에 따라 적절한 텍스트 추출 방법 선택"""
+    @staticmethod
+    def join_pages(pages):
+        """페이지별 텍스트를 하나의 문서 텍스트로 결합"""
+        if not pages:
+            return None
+        text = "".join(pages).strip()
+        return text if text else None
+    
+    def extract_pages_from_document(self, file_path):
+        """파일 형식에 따라 적절한 텍스트 추출 방법 선택 (페이지/슬라이드/시트 목록 반환)"""
         filename = os.path.basename(file_path)
         _, ext = os.path.splitext(filename.lower())
         
         if ext == '.pdf':
-            return self.extract_text_from_pdf(file_path)
+            return self.extract_pages_from_pdf(file_path)
         elif ext == '.docx':
-            return self.extract_text_from_docx(file_path)
+            return self.extract_pages_from_docx(file_path)
         elif ext == '.pptx':
-            return self.extract_text_from_pptx(file_path)
+            return self.extract_pages_from_pptx(file_path)
         elif ext in ['.xlsx', '.xls']:
-            return self.extract_text_from_excel(file_path)
+            return self.extract_pages_from_excel(file_path)
         else:
-            print(f"지원하지 않는 파일 형식: {ext}")
+            logger.warning("지원하지 않는 파일 형식: %s", ext)
+            return None
+    
+    def extract_text_from_document(self, file_path):
+        """파일 형식에 따라 텍스트 추출 (페이지 결합)"""
+        return self.join_pages(self.extract_pages_from_document(file_path))
+    
+    def _text_cache_path(self, file_hash):
+        """추출 텍스트 캐시 파일 경로 (파일 해시 + 추출기 버전)"""
+        return os.path.join(self.text_cache_folder, f"{file_hash}.v{self.EXTRACTOR_VERSION}.json.gz")
+    
+    def load_cached_pages(self, file_hash):
+        """캐시된 추출 텍스트 로드 (없거나 손상되면 None)"""
+        cache_path = self._text_cache_path(file_hash)
+        if not os.path.exists(cache_path):
+            return None
+        
+        try:
+            with gzip.open(cache_path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('extractor_version') != self.EXTRACTOR_VERSION:
+                return None
+            return data.get('pages')
+        except Exception as e:
+            logger.warning("텍스트 캐시 로드 오류 (무시): %s", e)
             return None
     
+    def save_cached_pages(self, file_hash, pages):
+        """추출 텍스트를 캐시에 저장 (임시 파일에 쓴 뒤 교체)"""
+        cache_path = self._text_cache_path(file_hash)
+        temp_path = cache_path + '.tmp'
+        
+        try:
+            os.makedirs(self.text_cache_folder, exist_ok=True)
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump({
+                    'extractor_version': self.EXTRACTOR_VERSION,
+                    'pages': pages
+                }, f, ensure_ascii=False)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.warning("텍스트 캐시 저장 오류 (무시): %s", e)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def remove_cached_pages(self, file_hash):
+        """다른 파일이 같은 내용을 참조하지 않으면 캐시 삭제"""
+        if not file_hash:
+            return
+        if any(info.get('file_hash') == file_hash for info in self.metadata.values()):
+            return
+        cache_path = self._text_cache_path(file_hash)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+    
+    def get_document_text(self, file_path, file_hash):
+        """캐시를 우선 사용해 문서 원문 텍스트 반환 (캐시 미스 시 추출 후 저장)"""
+        pages = self.load_cached_pages(file_hash)
+        CACHE_REQUESTS.labels('text_cache', 'miss' if pages is None else 'hit').inc()
+        if pages is not None:
+            logger.debug("✓ 텍스트 캐시 사용: %s (%s페이지)", os.path.basename(file_path), len(pages))
+            return self.join_pages(pages)
+        
+        pages = self.extract_pages_from_document(file_path)
+        if pages:
+            self.save_cached_pages(file_hash, pages)
+        return self.join_pages(pages)
+    
     def clean_text(self, text, file_type=None):
         """텍스트 정리 (간소화 및 안전화)"""
         if not text or not isinstance(text, str):
@@ -388,9 +1348,26 @@ class DocumentProcessor:
             return cleaned_text
             
         except Exception as e:
-            print(f"텍스트 정리 오류: {e}")
+            logger.error("텍스트 정리 오류: %s", e)
             return text  # 오류 시 원본 반환
     
+    @classmethod
+    def sentence_offsets(cls, text):
+        """청크 안 문장들의 (시작, 끝) 위치 목록 (앞뒤 공백 제외, 문서 처리 시 한 번 계산)"""
+        offsets = []
+        start = 0
+        ends = [match.end() for match in cls.SENTENCE_END.finditer(text)]
+        for end in ends + [len(text)]:
+            sentence_start, sentence_end = start, end
+            while sentence_start < sentence_end and text[sentence_start].isspace():
+                sentence_start += 1
+            while sentence_end > sentence_start and text[sentence_end - 1].isspace():
+                sentence_end -= 1
+            if sentence_end > sentence_start:
+                offsets.append((sentence_start, sentence_end))
+            start = end
+        return offsets
+    
     def chunk_text(self, text, chunk_size=600, overlap=50):
         """텍스트를 청크로 분할 (안전화)"""
         if not text:
@@ -439,136 +1416,625 @@ class DocumentProcessor:
             return chunks if chunks else [text[:chunk_size]]
             
         except Exception as e:
-            print(f"청킹 오류: {e}")
+            logger.error("청킹 오류: %s", e)
             return [text]  # 오류 시 전체 텍스트를 하나의 청크로
     
-    def process_document(self, file_path):
-        """문서 파일 처리 (안전화)"""
+    @classmethod
+    def compute_file_hash(cls, file_path):
+        """파일 내용의 SHA-256 해시 계산 (블록 단위로 읽어 메모리 사용 최소화)"""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(cls.HASH_BLOCK_SIZE), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+    
+    def find_processed_by_hash(self, file_hash, exclude=None):
+        """동일한 내용으로 현재 파라미터에서 처리된 파일명 반환 (없으면 None)"""
+        for filename, info in self.metadata.items():
+            if filename == exclude:
+                continue
+            if info.get('file_hash') == file_hash and info.get('processing_params') == self.processing_params:
+                return filename
+        return None
+    
+    def is_up_to_date(self, filename, file_path, indexed_files=None):
+        """파일 내용과 처리 파라미터가 마지막 처리 이후 그대로인지 확인"""
+        info = self.metadata.get(filename)
+        if not info or not info.get('file_hash'):
+            return False
+        if info.get('processing_params') != self.processing_params:
+            return False
+        
+        if indexed_files is None:
+            indexed_files = self.indexed_filenames()
+        if filename not in indexed_files:
+            return False
+        
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        
+        # 크기와 수정 시각이 같으면 해시 계산 생략
+        if info.get('file_size') == stat.st_size and info.get('file_mtime') == stat.st_mtime:
+            return True
+        
+        if self.compute_file_hash(file_path) != info['file_hash']:
+            return False
+        
+        # 게시된 스냅샷이 같은 항목을 참조하므로 제자리 수정 대신 새 항목으로 교체
+        self._set_file_metadata(filename, dict(info, file_size=stat.st_size, file_mtime=stat.st_mtime))
+        return True
+    
+    def _build_file_metadata(self, file_path, file_type, chunks_count, file_hash,
+                             duplicate_chunks=0, linked_from=None):
+        """메타데이터 항목 생성"""
+        stat = os.stat(file_path)
+        info = {
+            'file_path': file_path,
+            'file_type': file_type,
+            'chunks_count': chunks_count,
+            'processed_date': datetime.now().isoformat(),
+            'file_size': stat.st_size,
+            'file_mtime': stat.st_mtime,
+            'file_hash': file_hash,
+            'processing_params': dict(self.processing_params),
+            'duplicate_chunks': duplicate_chunks
+        }
+        if linked_from:
+            info['linked_from'] = linked_from
+        return info
+    
+    def _set_file_metadata(self, filename, info):
+        """메타데이터 항목 저장 (통계 함께 갱신)"""
+        previous = self.metadata.get(filename)
+        if previous is not None:
+            self._stats.remove_file(previous)
+        self.metadata[filename] = info
+        self._stats.add_file(info)
+    
+    def _reset_stats(self):
+        """작업본 전체가 바뀐 뒤 통계 재계산 (로드/초기화 시에만 사용)"""
+        self._stats = CorpusStats.from_index(self._documents, self.metadata)
+    
+    def _link_document(self, filename, file_path, file_hash, source_filename):
+        """동일 내용 파일을 기존 청크의 출처로 추가해 연결 (재파싱/재인코딩 없음)"""
+        self.remove_document_by_filename(filename)
+        
+        processed_date = datetime.now().isoformat()
+        documents = []
+        linked_count = 0
+        for doc in self._documents:
+            sources = self.get_document_sources(doc)
+            linked_sources = [
+                dict(source, filename=filename, file_path=file_path, processed_date=processed_date)
+                for source in sources if source['filename'] == source_filename
+            ]
+            if linked_sources:
+                doc = self._with_sources(doc, sources + linked_sources)
+                linked_count += len(linked_sources)
+            documents.append(doc)
+        
+        if not linked_count:
+            return False
+        
+        self._documents = documents
+        
+        file_type = self.metadata[source_filename]['file_type']
+        self._set_file_metadata(filename, self._build_file_metadata(
+            file_path, file_type, linked_count, file_hash,
+            duplicate_chunks=linked_count, linked_from=source_filename))
+        
+        logger.info("✓ 동일 내용 연결: %s → %s (%s 청크)", filename, source_filename, linked_count)
+        return True
+    
+    @staticmethod
+    def get_document_sources(doc):
+        """청크의 출처 목록 (근접 중복으로 합쳐진 청크는 여러 파일을 가짐)"""
+        sources = doc.get('sources')
+        if sources:
+            return sources
+        return [{key: doc.get(key) for key in SOURCE_FIELDS}]
+    
+    @staticmethod
+    def _with_sources(doc, sources):
+        """출처 목록을 바꾼 문서 사본 (대표 필드는 첫 번째 출처 기준)"""
+        new_doc = dict(doc)
+        new_doc['sources'] = sources
+        for key in SOURCE_FIELDS:
+            new_doc[key] = sources[0].get(key)
+        return new_doc
+    
+    def indexed_filenames(self):
+        """인덱스에 청크(출처)가 있는 파일명 집합"""
+        return {source['filename'] for doc in self._documents for source in self.get_document_sources(doc)}
+    
+    def _get_minhash_index(self):
+        """현재 문서 위치를 키로 하는 MinHash 인덱스 (서명 없는 이전 청크는 이때 계산)"""
+        if self._minhash_index is None:
+            index = MinHashIndex(threshold=self.DEDUP_THRESHOLD)
+            documents = None
+            for position, doc in enumerate(self._documents):
+                signature = doc.get('minhash')
+                if signature is None:
+                    # 게시된 스냅샷과 공유하는 청크는 수정하지 않고 서명을 붙인 사본으로 교체
+                    signature = index.signature(doc['content'])
+                    if documents is None:
+                        documents = list(self._documents)
+                    documents[position] = dict(doc, minhash=signature)
+                index.add(position, signature)
+            if documents is not None:
+                self._documents = documents
+            self._minhash_index = index
+        return self._minhash_index
+    
+    def _deduplicate_chunks(self, chunk_docs):
+        """근접 중복 청크를 기존/신규 대표 청크의 출처로 합침
+        
+        Returns:
+            (인덱스에 새로 추가할 대표 청크 목록, 합쳐진 청크 수)
+        """
+        index = self._get_minhash_index()
+        base = len(self._documents)
+        canonical_docs = []
+        merged_sources = {}
+        duplicate_count = 0
+        
+        for doc in chunk_docs:
+            signature = index.signature(doc['content'])
+            doc['minhash'] = signature
+            source = self.get_document_sources(doc)[0]
+            
+            position = index.query(signature)
+            if position is None:
+                doc['sources'] = [source]
+                index.add(base + len(canonical_docs), signature)
+                canonical_docs.append(doc)
+                continue
+            
+            duplicate_count += 1
+            if position >= base:
+                canonical_docs[position - base]['sources'].append(source)
+            else:
+                merged_sources.setdefault(position, []).append(source)
+        
+        if merged_sources:
+            documents = list(self._documents)
+            for position, sources in merged_sources.items():
+                doc = documents[position]
+                documents[position] = self._with_sources(doc, self.get_document_sources(doc) + sources)
+            self._documents = documents
+        
+        return canonical_docs, duplicate_count
+    
+    @index_writer
+    def process_document(self, file_path, file_hash=None, save=True):
+        """문서 파일 처리 (안전화)
+        
+        file_hash를 넘기면 해시 재계산을 생략한다. 이미 같은 내용으로 처리된
+        파일이 있으면 파싱/인코딩 없이 해당 청크를 연결한다.
+        """
         try:
             filename = os.path.basename(file_path)
             _, ext = os.path.splitext(filename.lower())
             
-            print(f"\n=== 문서 처리: {filename} ===")
+            logger.info("=== 문서 처리: %s ===", filename)
             
             # 지원 형식 확인
             if ext not in self.supported_extensions:
-                print(f"✗ 지원하지 않는 파일 형식: {ext}")
+                logger.warning("✗ 지원하지 않는 파일 형식: %s", ext)
                 return False
             
             file_type = self.supported_extensions[ext]
             
-            # 텍스트 추출
-            text = self.extract_text_from_document(file_path)
+            if file_hash is None:
+                file_hash = self.compute_file_hash(file_path)
+            
+            # 동일 내용 파일이 이미 처리되어 있으면 연결
+            source_filename = self.find_processed_by_hash(file_hash, exclude=filename)
+            if source_filename and self._link_document(filename, file_path, file_hash, source_filename):
+                if save:
+                    self.save_data()
+                return True
+            
+            # 텍스트 추출 (캐시 우선)
+            with INGEST_STAGE_SECONDS.labels('extract').time():
+                text = self.get_document_text(file_path, file_hash)
             if not text:
-                print(f"✗ 텍스트 추출 실패: {filename}")
+                logger.warning("✗ 텍스트 추출 실패: %s", filename)
                 return False
             
             # 텍스트 정리
-            cleaned_text = self.clean_text(text, file_type)
-            if len(cleaned_text) < 50:  # 너무 짧은 텍스트 제외
-                print(f"✗ 텍스트가 너무 짧음: {filename} ({len(cleaned_text)}자)")
+            with INGEST_STAGE_SECONDS.labels('clean').time():
+                cleaned_text = self.clean_text(text, file_type)
+            if len(cleaned_text) < self.MIN_TEXT_LENGTH:  # 너무 짧은 텍스트 제외
+                logger.warning("✗ 텍스트가 너무 짧음: %s (%s자)", filename, len(cleaned_text))
                 return False
             
             # 청킹
-            chunks = self.chunk_text(cleaned_text)
+            with INGEST_STAGE_SECONDS.labels('chunk').time():
+                chunks = self.chunk_text(cleaned_text, self.CHUNK_SIZE, self.CHUNK_OVERLAP)
             if not chunks:
-                print(f"✗ 청크 생성 실패: {filename}")
+                logger.warning("✗ 청크 생성 실패: %s", filename)
                 return False
             
-            # 기존 문서가 있다면 제거
+            # 기존 문서가 있다면 제거 (내용이 바뀌었으면 이전 텍스트 캐시도 정리)
+            previous_hash = self.metadata.get(filename, {}).get('file_hash')
             self.remove_document_by_filename(filename)
+            if previous_hash != file_hash:
+                self.remove_cached_pages(previous_hash)
             
-            # 문서 추가
+            # 문서 추가 및 추가분 임베딩 생성 (근접 중복 청크는 대표 청크에 합침)
+            new_docs = []
             for i, chunk in enumerate(chunks):
                 doc = {
                     'content': chunk,
+                    'sentences': self.sentence_offsets(chunk),
                     'filename': filename,
                     'file_type': file_type,
                     'chunk_id': i,
                     'file_path': file_path,
                     'processed_date': datetime.now().isoformat()
                 }
-                self.documents.append(doc)
-            
-            # 임베딩 생성
-            self.update_embeddings()
+                new_docs.append(doc)
+            with INGEST_STAGE_SECONDS.labels('dedup').time():
+                new_docs, duplicate_count = self._deduplicate_chunks(new_docs)
+            with INGEST_STAGE_SECONDS.labels('encode').time():
+                self._add_documents(new_docs)
             
             # 메타데이터 업데이트
-            self.metadata[filename] = {
-                'file_path': file_path,
-                'file_type': file_type,
-                'chunks_count': len(chunks),
-                'processed_date': datetime.now().isoformat(),
-                'file_size': os.path.getsize(file_path)
-            }
+            self._set_file_metadata(filename, self._build_file_metadata(
+                file_path, file_type, len(chunks), file_hash, duplicate_chunks=duplicate_count))
             
             # 데이터 저장
-            self.save_data()
+            if save:
+                with INGEST_STAGE_SECONDS.labels('save').time():
+                    self.save_data()
             
-            print(f"✓ 처리 완료: {filename} ({file_type}, {len(chunks)} 청크)")
+            logger.info("✓ 처리 완료: %s (%s, %s 청크, 중복 병합 %s)", filename, file_type, len(chunks), duplicate_count)
             return True
             
         except Exception as e:
-            print(f"✗ 문서 처리 오류 {file_path}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("✗ 문서 처리 오류 %s: %s", file_path, e)
             return False
     
+    def _embeddings_aligned(self):
+        """임베딩 행과 문서가 1:1로 대응하는지 확인"""
+        return self._embeddings is not None and len(self._embeddings) == len(self._documents)
+    
+    def _add_documents(self, new_docs, new_embeddings=None):
+        """문서 추가 후 추가된 문서만 임베딩 (전체 재인코딩 방지)"""
+        if not new_docs:
+            return
+        
+        had_documents = bool(self._documents)
+        aligned = self._embeddings_aligned()
+        self._documents.extend(new_docs)
+        self._stats.add_chunks(new_docs)
+        
+        # 기존 임베딩이 어긋나 있으면 전체 재생성
+        if had_documents and not aligned:
+            self.update_embeddings()
+            return
+        
+        try:
+            if new_embeddings is None:
+                if not self.encoder:
+                    self.update_embeddings()
+                    return
+                ENCODE_TEXTS.labels('document').inc(len(new_docs))
+                with ENCODE_SECONDS.labels('document').time():
+                    new_embeddings = self.encoder.encode([doc['content'] for doc in new_docs])
+            new_embeddings = np.asarray(new_embeddings)
+            
+            if not had_documents:
+                self._embeddings = EmbeddingMatrix.quantize(new_embeddings, self.embedding_dtype)
+            elif self._embeddings.shape[1] != new_embeddings.shape[1]:
+                # 저장된 임베딩과 현재 인코더의 차원이 다른 경우 (예: 다른 모델로 만든 인덱스를 불러왔거나,
+                # 새로 만든 SimpleEmbedding이 첫 인코딩 텍스트로 어휘를 만들어 저장된 인덱스와 어휘가 다름)
+                self.update_embeddings()
+                return
+            else:
+                self._embeddings = self._embeddings.append(new_embeddings)
+            logger.debug("✓ 임베딩 추가: %s 문서 (전체 %s)", len(new_docs), len(self._documents))
+        except Exception as e:
+            logger.warning("⚠️ 증분 임베딩 오류, 전체 재생성: %s", e)
+            self.update_embeddings()
+    
+    @index_writer
     def update_embeddings(self):
-        """문서들의 임베딩 업데이트 (안전화)"""
-        if not self.documents:
-            self.embeddings = None
+        """문서들의 임베딩 업데이트 (안전화, 직접 호출하면 새 스냅샷 게시)"""
+        if not self._documents:
+            self._embeddings = None
             return
         
         try:
-            contents = [doc['content'] for doc in self.documents if doc.get('content')]
+            contents = [doc['content'] for doc in self._documents if doc.get('content')]
             if contents and self.encoder:
-                self.embeddings = self.encoder.encode(contents)
-                print(f"✓ 임베딩 업데이트: {len(contents)} 문서")
+                ENCODE_TEXTS.labels('document').inc(len(contents))
+                with ENCODE_SECONDS.labels('document').time():
+                    embeddings = self.encoder.encode(contents)
+                self._embeddings = EmbeddingMatrix.quantize(embeddings, self.embedding_dtype)
+                logger.info("✓ 임베딩 업데이트: %s 문서", len(contents))
             else:
-                print("⚠️ 임베딩 생성 스킵 (내용 없음 또는 인코더 없음)")
-                self.embeddings = None
+                logger.warning("⚠️ 임베딩 생성 스킵 (내용 없음 또는 인코더 없음)")
+                self._embeddings = None
         except Exception as e:
-            print(f"⚠️ 임베딩 생성 오류: {e}")
-            self.embeddings = None
+            logger.warning("⚠️ 임베딩 생성 오류: %s", e)
+            self._embeddings = None
     
-    def search_similar_documents(self, query, top_k=5, min_similarity=0.01):
-        """다중 검색 방법을 사용한 문서 검색 (안전화)"""
-        if not self.documents:
-            return []
+    FILTER_KEYS = ('filename', 'file_type', 'date_from', 'date_to')
+    
+    @classmethod
+    def normalize_filters(cls, filters):
+        """검색 필터 검증/정규화
+        
+        filters: {"filename": 문자열 또는 배열, "file_type": 문자열 또는 배열 (PDF, Word 등),
+                  "date_from": "2024-01-01", "date_to": "2024-12-31"} (처리 날짜 기준, 양 끝 포함)
+        시간대가 붙은 날짜는 처리 날짜(processed_date)와 같은 로컬 시각으로 바꿔 비교한다.
+        
+        Returns:
+            정규화된 dict (조건이 없으면 None)
+        
+        Raises:
+            ValueError: 형식이 잘못된 경우 (사용자에게 보여줄 메시지)
+        """
+        if not filters:
+            return None
+        if not isinstance(filters, dict):
+            raise ValueError("filters는 객체여야 합니다.")
+        
+        unknown = set(filters) - set(cls.FILTER_KEYS)
+        if unknown:
+            raise ValueError(f"알 수 없는 필터: {', '.join(sorted(unknown))} (사용 가능: {', '.join(cls.FILTER_KEYS)})")
+        
+        normalized = {}
+        for key in ('filename', 'file_type'):
+            value = filters.get(key)
+            if value in (None, '', []):
+                continue
+            values = [value] if isinstance(value, str) else value
+            if not isinstance(values, list) or not all(isinstance(item, str) and item for item in values):
+                raise ValueError(f"{key} 필터는 문자열 또는 문자열 배열이어야 합니다.")
+            if key == 'file_type':
+                values = [item.lower() for item in values]
+            normalized[key] = tuple(sorted(set(values)))
+        
+        for key in ('date_from', 'date_to'):
+            value = filters.get(key)
+            if not value:
+                continue
+            try:
+                parsed = datetime.fromisoformat(str(value))
+            except ValueError:
+                raise ValueError(f"{key} 필터의 날짜 형식이 올바르지 않습니다 (예: 2024-01-31).")
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone().replace(tzinfo=None)
+            if key == 'date_from':
+                normalized['date_from'] = parsed
+            else:
+                # 날짜만 주면 그날 끝까지 포함
+                normalized['date_before'] = parsed + (timedelta(days=1) if len(str(value)) == 10 else timedelta(microseconds=1))
+        
+        if 'date_from' in normalized and 'date_before' in normalized and normalized['date_from'] >= normalized['date_before']:
+            raise ValueError("date_from이 date_to보다 늦습니다.")
+        
+        return normalized or None
+    
+    def iter_search_stages(self, query, top_k=5, min_similarity=0.01, deadline=None, trace=None, filters=None,
+                           rerank=None):
+        """검색 단계를 비용이 낮은 순서로 실행하며 단계마다 누적 결과를 내보냄
+        
+        deadline(time.monotonic 기준)이 주어지면 남은 시간이 단계의 예상 소요 시간보다
+        짧을 때 그 단계를 건너뛴다. 가장 저렴한 첫 단계는 항상 실행한다.
+        trace dict를 넘기면 단계별 소요 시간(stage_ms), 건너뛴 단계(skipped),
+        품질 저하 여부(degraded), 결과 수(results)를 기록한다.
+        filters(normalize_filters 결과)가 있으면 조건에 맞는 청크만 점수를 계산하고
+        trace의 filtered_chunks에 대상 청크 수를 기록한다.
+        재순위기가 있으면(rerank=False로 끌 수 있음) 각 검색 단계가 후보 rerank_candidates개를
+        모으고, 마지막에 'rerank' 단계로 그 후보만 다시 순위를 매긴다 (trace의 rerank에 기록).
+        
+        Yields:
+            (단계 이름, 해당 단계 결과, 지금까지 통합/정렬된 상위 top_k 결과)
+        """
+        if trace is None:
+            trace = {}
+        trace.setdefault('stage_ms', {})
+        trace.setdefault('skipped', [])
+        trace.setdefault('degraded', False)
+        trace.setdefault('results', 0)
+        
+        # 검색 도중 인덱스가 교체되어도 같은 스냅샷만 사용
+        snapshot = self._snapshot
+        if not snapshot.documents:
+            return
+        
+        positions = snapshot.filter_positions(filters)
+        if positions is not None:
+            trace['filtered_chunks'] = len(positions)
+            if not len(positions):
+                return
         
-        print(f"\n=== 검색: '{query}' ===")
+        logger.debug("=== 검색: '%s' ===", query)
+        
+        reranker = self.reranker if rerank is not False else None
+        candidate_k = max(top_k, self.rerank_candidates) if reranker else top_k
         
         all_results = []
+        candidates = []
+        for n, stage in enumerate(self.SEARCH_STAGES):
+            if stage == 'vector' and snapshot.embeddings is None:
+                continue
+            
+            if deadline is not None and n > 0 and not self._stage_fits(stage, deadline):
+                logger.debug("⏱️ 시간 예산 부족으로 '%s' 단계 생략", stage)
+                trace['skipped'].append(stage)
+                trace['degraded'] = True
+                continue
+            
+            stage_start = time.monotonic()
+            if stage == 'substring':
+                # 부분 문자열 검색
+                stage_results = self.substring_search(query, candidate_k, snapshot, positions)
+            elif stage == 'keyword':
+                # 키워드 기반 검색 (가장 안정적)
+                stage_results = self.keyword_search(query, candidate_k, snapshot, positions)
+            else:
+                # 벡터 임베딩 검색 (있는 경우에만)
+                try:
+                    stage_results = self.vector_search(query, candidate_k, min_similarity, snapshot, positions)
+                except Exception as e:
+                    logger.warning("벡터 검색 오류 (무시): %s", e)
+                    continue
+            
+            elapsed_ms = (time.monotonic() - stage_start) * 1000
+            if positions is None:
+                # 필터 검색은 대상이 적어 빠르므로 전체 검색 소요 시간 추정에 넣지 않음
+                self._record_stage_cost(stage, elapsed_ms)
+            trace['stage_ms'][stage] = round(elapsed_ms, 2)
+            SEARCH_STAGE_SECONDS.labels(stage).observe(elapsed_ms / 1000)
+            
+            all_results.extend(stage_results)
+            
+            # 결과 통합 및 중복 제거
+            with SEARCH_STAGE_SECONDS.labels('merge').time():
+                candidates = self.merge_and_rank_results(all_results, query)[:candidate_k]
+            merged_results = candidates[:top_k]
+            trace['results'] = len(merged_results)
+            yield stage, stage_results, merged_results
+        
+        if reranker and len(candidates) > 1:
+            reranked = self._rerank(reranker, query, candidates, deadline, trace)
+            merged_results = reranked[:top_k]
+            trace['results'] = len(merged_results)
+            yield 'rerank', reranked, merged_results
+    
+    def _rerank(self, reranker, query, candidates, deadline=None, trace=None):
+        """1단계 후보를 재순위 (rerank_budget_ms와 요청 마감 시각 중 빠른 쪽까지)"""
+        stage_start = time.monotonic()
+        rerank_deadline = stage_start + self.rerank_budget_ms / 1000 if self.rerank_budget_ms > 0 else None
+        if deadline is not None:
+            rerank_deadline = deadline if rerank_deadline is None else min(rerank_deadline, deadline)
+        
+        try:
+            reranked, info = reranker.rerank(query, self.extract_keywords(query), candidates, rerank_deadline)
+        except Exception as e:
+            logger.warning("재순위 오류 (1단계 순서 사용): %s", e)
+            reranked, info = candidates, {'error': type(e).__name__}
+        
+        elapsed_ms = (time.monotonic() - stage_start) * 1000
+        SEARCH_STAGE_SECONDS.labels('rerank').observe(elapsed_ms / 1000)
+        if trace is not None:
+            trace.setdefault('stage_ms', {})['rerank'] = round(elapsed_ms, 2)
+            trace['rerank'] = info
+        return reranked
+    
+    def _stage_fits(self, stage, deadline):
+        """남은 시간 안에 검색 단계를 마칠 수 있을지 (이동 평균 소요 시간 기준)"""
+        remaining_ms = (deadline - time.monotonic()) * 1000
+        estimate_ms = self._stage_cost_ms.get(stage, 0.0)
+        if remaining_ms > 0 and remaining_ms >= estimate_ms:
+            return True
+        
+        # 건너뛴 단계는 추정치를 조금씩 낮춰 일시적으로 느렸던 단계도 다시 시도되게 함
+        if stage in self._stage_cost_ms:
+            self._stage_cost_ms[stage] = estimate_ms * (1 - self.STAGE_COST_SMOOTHING)
+        return False
+    
+    def _record_stage_cost(self, stage, elapsed_ms):
+        """검색 단계 소요 시간 이동 평균 갱신"""
+        previous = self._stage_cost_ms.get(stage)
+        if previous is None:
+            self._stage_cost_ms[stage] = elapsed_ms
+        else:
+            alpha = self.STAGE_COST_SMOOTHING
+            self._stage_cost_ms[stage] = previous * (1 - alpha) + elapsed_ms * alpha
+    
+    def get_stage_costs(self):
+        """검색 단계별 예상 소요 시간 (ms)"""
+        return {stage: round(cost, 2) for stage, cost in self._stage_cost_ms.items()}
+    
+    def search_similar_documents(self, query, top_k=5, min_similarity=0.01, deadline=None, trace=None, filters=None,
+                                 rerank=None):
+        """다중 검색 방법을 사용한 문서 검색 (안전화)
         
-        # 1. 키워드 기반 검색 (가장 안정적)
-        keyword_results = self.keyword_search(query, top_k)
-        all_results.extend(keyword_results)
+        deadline/trace/filters/rerank는 iter_search_stages 참고.
+        """
+        if not self._snapshot.documents:
+            return []
+        
+        final_results = []
+        stages = self.iter_search_stages(query, top_k, min_similarity, deadline, trace, filters, rerank)
+        for _, _, merged_results in stages:
+            final_results = merged_results
+        
+        logger.debug("검색 완료: %s개 결과", len(final_results))
+        return final_results
+    
+    def search_similar_documents_batch(self, queries, top_k=5, min_similarity=0.01, filters=None, rerank=None):
+        """여러 질문을 한 번에 검색
+        
+        질문 임베딩은 한 번의 배치 인코딩으로, 벡터 점수는 질문 x 청크 행렬곱
+        한 번으로 계산한다. 키워드/부분 문자열 검색, 결과 통합, 재순위는 질문별로 수행.
+        filters/rerank는 모든 질문에 같이 적용된다 (iter_search_stages 참고).
         
-        # 2. 벡터 임베딩 검색 (있는 경우에만)
-        if self.embeddings is not None:
+        Returns:
+            질문 순서대로 검색 결과 목록
+        """
+        snapshot = self._snapshot
+        queries = list(queries)
+        if not snapshot.documents:
+            return [[] for _ in queries]
+        
+        positions = snapshot.filter_positions(filters)
+        if positions is not None and not len(positions):
+            return [[] for _ in queries]
+        
+        reranker = self.reranker if rerank is not False else None
+        candidate_k = max(top_k, self.rerank_candidates) if reranker else top_k
+        
+        logger.debug("=== 배치 검색: %s개 질문 ===", len(queries))
+        
+        vector_results = [[] for _ in queries]
+        if snapshot.embeddings is not None and queries:
             try:
-                vector_results = self.vector_search(query, top_k, min_similarity)
-                all_results.extend(vector_results)
+                query_embeddings = self.query_encoder.encode(queries)
+                similarity_matrix = snapshot.embeddings.similarities(query_embeddings, positions)
+                vector_results = [
+                    self._vector_results(similarities, candidate_k, min_similarity, snapshot, positions)
+                    for similarities in similarity_matrix
+                ]
             except Exception as e:
-                print(f"벡터 검색 오류 (무시): {e}")
-        
-        # 3. 부분 문자열 검색
-        substring_results = self.substring_search(query, top_k)
-        all_results.extend(substring_results)
+                logger.warning("배치 벡터 검색 오류 (무시): %s", e)
         
-        # 4. 결과 통합 및 중복 제거
-        final_results = self.merge_and_rank_results(all_results, query)
+        batch_results = []
+        for query, query_vector_results in zip(queries, vector_results):
+            all_results = self.substring_search(query, candidate_k, snapshot, positions)
+            all_results.extend(self.keyword_search(query, candidate_k, snapshot, positions))
+            all_results.extend(query_vector_results)
+            candidates = self.merge_and_rank_results(all_results, query)[:candidate_k]
+            if reranker and len(candidates) > 1:
+                candidates = self._rerank(reranker, query, candidates)
+            batch_results.append(candidates[:top_k])
         
-        print(f"검색 완료: {len(final_results)}개 결과")
-        return final_results[:top_k]
+        logger.debug("배치 검색 완료: %s개 질문", len(queries))
+        return batch_results
+    
+    @staticmethod
+    def _candidate_documents(snapshot, positions):
+        """점수를 계산할 청크 (positions가 None이면 전체)"""
+        if positions is None:
+            return snapshot.documents
+        documents = snapshot.documents
+        return [documents[position] for position in positions]
     
-    def keyword_search(self, query, top_k=5):
-        """키워드 기반 검색 (핵심 기능)"""
+    def keyword_search(self, query, top_k=5, snapshot=None, positions=None):
+        """키워드 기반 검색 (핵심 기능, positions가 주어지면 해당 청크만)"""
+        snapshot = snapshot or self._snapshot
         keywords = self.extract_keywords(query)
         results = []
         
-        for doc in self.documents:
+        for doc in self._candidate_documents(snapshot, positions):
             score = 0
             content_lower = doc['content'].lower()
             
@@ -589,35 +2055,53 @@ class DocumentProcessor:
         results.sort(key=lambda x: x['similarity'], reverse=True)
         return results[:top_k]
     
-    def vector_search(self, query, top_k=5, min_similarity=0.01):
-        """벡터 임베딩 검색"""
+    def vector_search(self, query, top_k=5, min_similarity=0.01, snapshot=None, positions=None):
+        """벡터 임베딩 검색 (positions가 주어지면 해당 행만 계산)"""
+        snapshot = snapshot or self._snapshot
+        if snapshot.embeddings is None:
+            return []
+        
         try:
-            query_embedding = self.encoder.encode([query])
-            similarities = cosine_similarity(query_embedding, self.embeddings)[0]
-            top_indices = np.argsort(similarities)[::-1][:top_k]
-            
-            results = []
-            for idx in top_indices:
-                similarity = similarities[idx]
-                if similarity >= min_similarity:
-                    results.append({
-                        'document': self.documents[idx],
-                        'similarity': float(similarity),
-                        'content': self.documents[idx]['content'],
-                        'method': 'vector'
-                    })
-            
-            return results
+            query_embedding = self.query_encoder.encode([query])
+            similarities = snapshot.embeddings.similarities(query_embedding, positions)[0]
+            return self._vector_results(similarities, top_k, min_similarity, snapshot, positions)
         except Exception as e:
-            print(f"벡터 검색 오류: {e}")
+            logger.warning("벡터 검색 오류: %s", e)
+            return []
+    
+    def _vector_results(self, similarities, top_k, min_similarity, snapshot, positions=None):
+        """유사도 벡터에서 상위 top_k 결과 구성 (전체 정렬 대신 argpartition)
+        
+        positions가 주어지면 similarities[i]는 청크 positions[i]의 유사도다.
+        """
+        k = min(top_k, len(similarities))
+        if k <= 0:
             return []
+        
+        top_indices = np.argpartition(-similarities, k - 1)[:k]
+        top_indices = top_indices[np.argsort(-similarities[top_indices])]
+        
+        results = []
+        for idx in top_indices:
+            similarity = similarities[idx]
+            if similarity >= min_similarity:
+                doc = snapshot.documents[idx if positions is None else positions[idx]]
+                results.append({
+                    'document': doc,
+                    'similarity': float(similarity),
+                    'content': doc['content'],
+                    'method': 'vector'
+                })
+        
+        return results
     
-    def substring_search(self, query, top_k=5):
-        """부분 문자열 검색"""
+    def substring_search(self, query, top_k=5, snapshot=None, positions=None):
+        """부분 문자열 검색 (positions가 주어지면 해당 청크만)"""
+        snapshot = snapshot or self._snapshot
         results = []
         query_lower = query.lower()
         
-        for doc in self.documents:
+        for doc in self._candidate_documents(snapshot, positions):
             content_lower = doc['content'].lower()
             
             if query_lower in content_lower:
@@ -687,26 +2171,62 @@ class DocumentProcessor:
     
     # 나머지 메서드들 (원본과 동일하지만 예외 처리 강화)
     def remove_document_by_filename(self, filename):
-        """특정 파일의 모든 문서 제거"""
-        self.documents = [doc for doc in self.documents if doc['filename'] != filename]
+        """특정 파일의 모든 문서 제거
+        
+        다른 파일과 합쳐진 청크는 해당 출처만 빼고 유지하며, 출처가 남지 않은
+        청크만 대응하는 임베딩 행과 함께 제거한다.
+        """
+        keep = []
+        documents = []
+        removed = []
+        changed = False
+        for i, doc in enumerate(self._documents):
+            sources = self.get_document_sources(doc)
+            remaining = [source for source in sources if source['filename'] != filename]
+            if not remaining:
+                removed.append(doc)
+                changed = True
+                continue
+            if len(remaining) != len(sources):
+                new_doc = self._with_sources(doc, remaining)
+                if new_doc.get('file_type') != doc.get('file_type'):
+                    # 대표 출처가 바뀌면 형식별 청크 수도 옮김
+                    self._stats.remove_chunks([doc])
+                    self._stats.add_chunks([new_doc])
+                doc = new_doc
+                changed = True
+            keep.append(i)
+            documents.append(doc)
+        
+        if changed:
+            if len(keep) != len(self._documents):
+                if self._embeddings_aligned():
+                    self._embeddings = self._embeddings[keep] if keep else None
+                self._minhash_index = None
+            self._documents = documents
+            self._stats.remove_chunks(removed)
         if filename in self.metadata:
-            del self.metadata[filename]
+            self._stats.remove_file(self.metadata.pop(filename))
     
     def save_data(self):
         """데이터 저장"""
+        if not self.persist:
+            return
+        
         try:
-            if self.embeddings is not None:
+            if self._embeddings is not None:
                 with open(self.embeddings_file, 'wb') as f:
                     pickle.dump({
-                        'embeddings': self.embeddings,
-                        'documents': self.documents
+                        'embeddings': self._embeddings.codes,
+                        'embedding_scales': self._embeddings.scales,
+                        'documents': self._documents
                     }, f)
             
             with open(self.metadata_file, 'w', encoding='utf-8') as f:
                 json.dump(self.metadata, f, ensure_ascii=False, indent=2)
                 
         except Exception as e:
-            print(f"데이터 저장 오류: {e}")
+            logger.error("데이터 저장 오류: %s", e)
     
     def load_data(self):
         """데이터 로드"""
@@ -714,36 +2234,44 @@ class DocumentProcessor:
             if os.path.exists(self.embeddings_file):
                 with open(self.embeddings_file, 'rb') as f:
                     data = pickle.load(f)
-                    self.embeddings = data.get('embeddings')
-                    self.documents = data.get('documents', [])
+                    embeddings = data.get('embeddings')
+                    self._documents = data.get('documents', [])
+                    self._minhash_index = None
+                
+                # 저장 형식이 설정과 다르면(이전 float64 인덱스 포함) 로드할 때 변환 (다음 저장 때 새 형식으로 기록)
+                self._embeddings = None
+                if embeddings is not None:
+                    stored_dtype = np.asarray(embeddings).dtype.name
+                    self._embeddings = EmbeddingMatrix.from_stored(
+                        embeddings, data.get('embedding_scales'), self.embedding_dtype)
+                    if stored_dtype != self.embedding_dtype:
+                        logger.info("✓ 임베딩 형식 변환: %s → %s", stored_dtype, self.embedding_dtype)
+                
+                # 문장 위치가 없는 이전 인덱스는 로드할 때 한 번 계산 (다음 저장 때 함께 기록)
+                missing = [doc for doc in self._documents if 'sentences' not in doc]
+                for doc in missing:
+                    doc['sentences'] = self.sentence_offsets(doc.get('content', ''))
+                if missing:
+                    logger.info("✓ 문장 위치 계산: %s 청크", len(missing))
             
             if os.path.exists(self.metadata_file):
                 with open(self.metadata_file, 'r', encoding='utf-8') as f:
                     self.metadata = json.load(f)
                     
         except Exception as e:
-            print(f"데이터 로드 오류: {e}")
-            self.documents = []
-            self.embeddings = None
+            logger.error("데이터 로드 오류: %s", e)
+            self._documents = []
+            self._embeddings = None
             self.metadata = {}
+        
+        self._reset_stats()
     
     def get_uploaded_files(self):
-        """업로드된 문서 파일 목록"""
+        """업로드된 문서 파일 목록 (폴더 목록 캐시 사용)"""
         try:
-            files = []
-            for filename in os.listdir(self.upload_folder):
-                _, ext = os.path.splitext(filename.lower())
-                if ext in self.supported_extensions:
-                    filepath = os.path.join(self.upload_folder, filename)
-                    files.append({
-                        'filename': filename,
-                        'file_type': self.supported_extensions[ext],
-                        'size': os.path.getsize(filepath),
-                        'modified': datetime.fromtimestamp(os.path.getmtime(filepath)).isoformat()
-                    })
-            return files
+            return self.upload_manifest.files()
         except Exception as e:
-            print(f"파일 목록 조회 오류: {e}")
+            logger.error("파일 목록 조회 오류: %s", e)
             return []
     
     def get_processed_files_info(self):
@@ -756,93 +2284,322 @@ class DocumentProcessor:
                 'processed_date': info['processed_date'],
                 'file_size': info.get('file_size', 0)
             }
-            for filename, info in self.metadata.items()
+            for filename, info in self._snapshot.metadata.items()
         ]
     
     def has_processed_documents(self):
         """처리된 문서가 있는지 확인"""
-        return len(self.documents) > 0
+        return len(self._snapshot.documents) > 0
     
+    @index_writer
     def delete_file(self, filename):
         """파일 삭제"""
         try:
             filepath = os.path.join(self.upload_folder, filename)
             if os.path.exists(filepath):
+                previous_mtime = self.upload_manifest.folder_mtime()
                 os.remove(filepath)
+                self.upload_manifest.discard(filename, previous_mtime)
             
+            file_hash = self.metadata.get(filename, {}).get('file_hash')
             self.remove_document_by_filename(filename)
-            self.update_embeddings()
+            self.remove_cached_pages(file_hash)
+            if not self._embeddings_aligned():
+                self.update_embeddings()
             self.save_data()
             
             return True
         except Exception as e:
-            print(f"파일 삭제 오류: {e}")
+            logger.error("파일 삭제 오류: %s", e)
             return False
     
-    def reprocess_all_documents(self):
-        """모든 문서 파일 재처리"""
+    @index_writer
+    def reprocess_all_documents(self, force=False):
+        """모든 문서 파일 재처리
+        
+        내용 해시와 처리 파라미터가 그대로인 파일은 건너뛴다. force=True면 전부 다시 처리한다.
+        """
         try:
-            self.documents = []
-            self.embeddings = None
-            self.metadata = {}
-            
-            success_count = 0
             document_files = []
-            
-            for filename in os.listdir(self.upload_folder):
+            for filename in sorted(os.listdir(self.upload_folder)):
                 _, ext = os.path.splitext(filename.lower())
                 if ext in self.supported_extensions:
                     document_files.append(filename)
             
+            if force:
+                self._documents = []
+                self._embeddings = None
+                self.metadata = {}
+                self._minhash_index = None
+                self._stats = CorpusStats()
+            
+            # 폴더에서 사라진 파일 정리
+            present = set(document_files)
+            stale_files = (set(self.metadata) | self.indexed_filenames()) - present
+            for filename in stale_files:
+                file_hash = self.metadata.get(filename, {}).get('file_hash')
+                self.remove_document_by_filename(filename)
+                self.remove_cached_pages(file_hash)
+            
+            indexed_files = self.indexed_filenames()
+            success_count = 0
+            skipped_count = 0
+            
             for filename in document_files:
                 filepath = os.path.join(self.upload_folder, filename)
-                if self.process_document(filepath):
+                if self.is_up_to_date(filename, filepath, indexed_files):
+                    skipped_count += 1
+                    success_count += 1
+                    continue
+                if self.process_document(filepath, save=False):
                     success_count += 1
             
+            if not self._embeddings_aligned():
+                self.update_embeddings()
+            self.save_data()
+            
+            logger.info("재처리 완료: %s/%s (변경 없음 %s개 건너뜀)", success_count, len(document_files), skipped_count)
             return success_count == len(document_files)
             
         except Exception as e:
-            print(f"재처리 오류: {e}")
+            logger.error("재처리 오류: %s", e)
+            return False
+    
+    def start_rebuild(self, force=False, runner=None):
+        """스테이징 인덱스 재구축을 백그라운드 스레드로 시작
+        
+        재구축이 끝날 때까지 현재 인덱스로 계속 검색한다.
+        runner를 넘기면 백그라운드 스레드에서 runner(재구축 함수)로 실행한다 (프로파일링용).
+        
+        Returns:
+            시작했으면 True, 이미 진행 중이면 False
+        """
+        with self._rebuild_lock:
+            if self.rebuild_status.get('state') == 'running':
+                return False
+            
+            self.rebuild_status = {
+                'state': 'running',
+                'force': force,
+                'started_at': datetime.now().isoformat(),
+                'finished_at': None,
+                'error': None,
+                'chunks_before': len(self._snapshot.documents),
+                'chunks_after': None,
+                'rollback_available': self._previous_state is not None
+            }
+        
+        target = functools.partial(self._run_rebuild, force)
+        if runner is not None:
+            target = functools.partial(runner, target)
+        thread = threading.Thread(target=target, name='index-rebuild', daemon=True)
+        thread.start()
+        return True
+    
+    def _run_rebuild(self, force):
+        """백그라운드 재구축 실행 및 상태 기록"""
+        status = dict(self.rebuild_status)
+        try:
+            self.rebuild_index(force=force)
+            status['state'] = 'succeeded'
+            status['chunks_after'] = len(self._snapshot.documents)
+        except Exception as e:
+            logger.error("❌ 인덱스 재구축 실패 (기존 인덱스 유지): %s", e)
+            status['state'] = 'failed'
+            status['error'] = str(e)
+        
+        status['finished_at'] = datetime.now().isoformat()
+        status['rollback_available'] = self._previous_state is not None
+        self.rebuild_status = status
+    
+    def rebuild_index(self, force=False):
+        """스테이징 인덱스를 구축/검증한 뒤 현재 인덱스와 원자적으로 교체 (동기 실행)
+        
+        Raises:
+            ValueError: 스테이징 인덱스 검증 실패 (현재 인덱스는 그대로 유지)
+        """
+        logger.info("=== 스테이징 인덱스 재구축 시작 (force=%s) ===", force)
+        staging = DocumentProcessor(self.upload_folder, encoder=self.encoder, persist=False,
+                                    embedding_dtype=self.embedding_dtype)
+        
+        # 변경 없는 파일은 건너뛰도록 현재 작업본에서 시작
+        if not force:
+            with self._write_lock:
+                staging._documents = list(self._documents)
+                staging._embeddings = self._embeddings
+                staging.metadata = {filename: dict(info) for filename, info in self.metadata.items()}
+                staging._stats = self._stats.copy()
+        
+        if not staging.reprocess_all_documents(force=force):
+            logger.warning("⚠️ 스테이징 재처리 중 일부 파일 실패")
+        
+        valid, reason = self._validate_staging(staging)
+        if not valid:
+            raise ValueError(f"스테이징 인덱스 검증 실패: {reason}")
+        
+        self._swap_in(staging)
+        logger.info("=== 스테이징 인덱스 교체 완료: %s 청크 ===", len(self._documents))
+    
+    def _validate_staging(self, staging):
+        """교체 전 스테이징 인덱스 검사 (청크 수, 임베딩 형태)
+        
+        Returns:
+            (통과 여부, 실패 사유)
+        """
+        documents = staging._documents
+        embeddings = staging._embeddings
+        
+        if staging.metadata and not documents:
+            return False, "처리된 파일은 있지만 청크가 없습니다"
+        
+        if documents:
+            if embeddings is None:
+                return False, "임베딩이 없습니다"
+            if embeddings.ndim != 2 or len(embeddings) != len(documents):
+                return False, f"임베딩 형태 {embeddings.shape}가 청크 수 {len(documents)}와 맞지 않습니다"
+            if not embeddings.is_finite():
+                return False, "임베딩에 NaN/Inf 값이 있습니다"
+        
+        missing = set(staging.metadata) - staging.indexed_filenames()
+        if missing:
+            return False, f"청크가 없는 파일: {', '.join(sorted(missing))}"
+        
+        current_count = len(self._snapshot.documents)
+        if current_count and len(documents) < current_count * self.REBUILD_MIN_CHUNK_RATIO:
+            return False, f"청크 수 급감 ({current_count} → {len(documents)})"
+        
+        return True, None
+    
+    @index_writer
+    def _swap_in(self, staging):
+        """검증된 스테이징 인덱스로 교체하고 이전 인덱스는 롤백용으로 보관"""
+        self._previous_state = (self._documents, self._embeddings, self.metadata, self._stats)
+        self._documents = staging._documents
+        self._embeddings = staging._embeddings
+        self.metadata = staging.metadata
+        self._stats = staging._stats
+        self._minhash_index = None
+        
+        # 재구축 도중 업로드/삭제된 파일 반영 (나머지는 변경 없음으로 건너뜀)
+        self.reprocess_all_documents()
+    
+    @index_writer
+    def rollback_index(self):
+        """직전 재구축 이전 인덱스로 즉시 되돌림 (다시 호출하면 재구축 결과로 복귀)
+        
+        Returns:
+            되돌릴 인덱스가 있으면 True
+        """
+        if self._previous_state is None:
             return False
+        
+        current_state = (self._documents, self._embeddings, self.metadata, self._stats)
+        self._documents, self._embeddings, self.metadata, self._stats = self._previous_state
+        self._previous_state = current_state
+        self._minhash_index = None
+        self.save_data()
+        
+        self.rebuild_status = dict(self.rebuild_status, rolled_back_at=datetime.now().isoformat())
+        logger.info("✓ 인덱스 롤백: %s 청크", len(self._documents))
+        return True
     
+    @index_writer
     def initialize_existing_documents(self):
-        """서버 시작시 기존 문서 파일들 처리"""
+        """서버 시작시 기존 문서 파일들 처리 (새 파일 또는 내용이 바뀐 파일만)"""
         try:
-            for filename in os.listdir(self.upload_folder):
+            indexed_files = self.indexed_filenames()
+            metadata_changed = False
+            
+            for filename in sorted(os.listdir(self.upload_folder)):
                 _, ext = os.path.splitext(filename.lower())
-                if ext in self.supported_extensions:
-                    if filename not in self.metadata:
-                        filepath = os.path.join(self.upload_folder, filename)
-                        print(f"기존 파일 처리: {filename}")
-                        self.process_document(filepath)
+                if ext not in self.supported_extensions:
+                    continue
+                
+                filepath = os.path.join(self.upload_folder, filename)
+                info = self.metadata.get(filename)
+                
+                if info and not info.get('file_hash'):
+                    # 해시가 없는 이전 메타데이터는 해시만 보완하고 기존 청크 유지
+                    stat = os.stat(filepath)
+                    self._set_file_metadata(filename, dict(
+                        info,
+                        file_hash=self.compute_file_hash(filepath),
+                        file_size=stat.st_size,
+                        file_mtime=stat.st_mtime,
+                        processing_params=dict(self.processing_params)))
+                    metadata_changed = True
+                    continue
+                
+                if info and self.is_up_to_date(filename, filepath, indexed_files):
+                    continue
+                
+                logger.info("기존 파일 처리: %s", filename)
+                if self.process_document(filepath, save=False):
+                    metadata_changed = True
+            
+            # 파일마다 저장하지 않고 끝에서 한 번 저장
+            if metadata_changed:
+                self.save_data()
                         
         except Exception as e:
-            print(f"기존 파일 초기화 오류: {e}")
+            logger.error("기존 파일 초기화 오류: %s", e)
 
 
 class QuestionAnalyzer:
     """질문 분석 및 답변 생성 클래스 (안전화)"""
     
-    def __init__(self, document_processor):
+    ANSWER_MIN_SIMILARITY = 0.3  # 답변에 사용할 검색 결과의 최소 유사도 (재순위 여부와 관계없이 1단계 similarity 기준)
+    SNIPPET_MAX_CHARS = 400  # 답변 본문 발췌 최대 길이
+    SNIPPET_MAX_SENTENCES = 3
+    RELATED_SNIPPET_MAX_CHARS = 160  # 관련 추가 정보 발췌 최대 길이
+    RELATED_SNIPPET_MAX_SENTENCES = 1
+    SNIPPET_STOPWORDS = frozenset([  # 발췌 점수/강조에서 뺄 영어 기능어 (한국어 조사는 extract_keywords가 제외)
+        'the', 'an', 'of', 'to', 'in', 'on', 'at', 'for', 'and', 'or', 'is', 'are', 'was', 'be',
+        'it', 'this', 'that', 'with', 'by', 'as', 'what', 'does', 'do', 'how', 'when', 'where',
+        'who', 'which', 'about', 'say', 'says', 'can', 'me', 'tell'
+    ])
+    
+    def __init__(self, document_processor, intents=None):
+        """
+        Args:
+            intents: 의도 표 (intent_router.load_intents 결과, None이면 기본 인사/감사 의도)
+        """
         self.document_processor = document_processor
+        self.intent_router = IntentRouter(intents)
+        self._intent_responses = {
+            'greeting': self.generate_greeting_response,
+            'thanks': self.generate_thanks_response
+        }
+    
+    def match_intent(self, question, trace=None):
+        """의도 표와 일치하면 검색 없이 보낼 답변 (없으면 None)"""
+        intent = self.intent_router.match(question)
+        if intent is None:
+            return None
         
-        self.greeting_patterns = [
-            '안녕', 'hi', 'hello', '안녕하세요', '처음', '시작'
-        ]
+        if 'answer' in intent:
+            answer = intent['answer']
+        else:
+            response = self._intent_responses.get(intent.get('response'))
+            if response is None:
+                logger.warning("⚠️ 알 수 없는 의도 응답: %s", intent.get('response'))
+                return None
+            answer = response()
         
-        self.thanks_patterns = [
-            '감사', '고마워', '고맙', 'thank', '도움'
-        ]
+        INTENT_ROUTED.labels(intent['name']).inc()
+        if trace is not None:
+            trace['intent'] = intent['name']
+        return answer
     
     def is_greeting(self, question):
         """인사말인지 확인"""
-        question_lower = question.lower()
-        return any(pattern in question_lower for pattern in self.greeting_patterns)
+        intent = self.intent_router.match(question)
+        return intent is not None and intent['name'] == 'greeting'
     
     def is_thanks(self, question):
         """감사 인사인지 확인"""
-        question_lower = question.lower()
-        return any(pattern in question_lower for pattern in self.thanks_patterns)
+        intent = self.intent_router.match(question)
+        return intent is not None and intent['name'] == 'thanks'
     
     def generate_greeting_response(self):
         """인사말 응답 생성"""
@@ -873,53 +2630,104 @@ class QuestionAnalyzer:
 **💡 팁**: 
 • 더 구체적인 질문을 하시면 더 정확한 답변을 받을 수 있어요"""
     
-    def analyze_question(self, question):
-        """질문 분석 및 답변 생성 (안전화)"""
+    def analyze_question(self, question, deadline=None, trace=None, filters=None):
+        """질문 분석 및 답변 생성 (안전화)
+        
+        deadline/trace/filters는 문서 검색에 그대로 전달 (DocumentProcessor.iter_search_stages 참고)
+        """
         try:
             if not question or len(question.strip()) < 2:
                 return "질문을 입력해주세요."
             
             question = question.strip()
-            print(f"\n=== 질문 분석: {question} ===")
-            
-            # 인사말 처리
-            if self.is_greeting(question):
-                return self.generate_greeting_response()
+            logger.debug("=== 질문 분석: %s ===", question)
             
-            # 감사 인사 처리
-            if self.is_thanks(question):
-                return self.generate_thanks_response()
+            # 인사/감사/자주 묻는 질문은 검색 없이 답변
+            intent_answer = self.match_intent(question, trace)
+            if intent_answer is not None:
+                return intent_answer
             
             # 문서 검색
-            search_results = self.document_processor.search_similar_documents(question, top_k=5, min_similarity=0.05)
+            search_results = self.document_processor.search_similar_documents(
+                question, top_k=5, min_similarity=0.05, deadline=deadline, trace=trace, filters=filters)
             
             if not search_results:
-                return self.generate_no_result_response_enhanced(question)
+                return self.generate_no_result_response_enhanced(question, filters)
             
             # 답변 생성
-            return self.generate_answer(question, search_results)
+            return self.generate_answer(question, search_results, filters)
             
         except Exception as e:
-            print(f"질문 분석 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("질문 분석 오류: %s", e)
             return "처리 중 오류가 발생했습니다. 다시 시도해주세요."
     
-    def generate_no_result_response_enhanced(self, question):
-        """결과가 없을 때 향상된 응답"""
+    def analyze_questions(self, questions, filters=None):
+        """여러 질문을 한 번에 분석 (문서 검색은 배치로 수행, filters는 모든 질문에 적용)
+        
+        Returns:
+            질문 순서대로 답변 목록
+        """
+        answers = [None] * len(questions)
+        pending = []
+        
+        for i, question in enumerate(questions):
+            if not question or len(question.strip()) < 2:
+                answers[i] = "질문을 입력해주세요."
+                continue
+            
+            question = question.strip()
+            answers[i] = self.match_intent(question)
+            if answers[i] is None:
+                pending.append((i, question))
+        
+        if not pending:
+            return answers
+        
+        try:
+            batch_results = self.document_processor.search_similar_documents_batch(
+                [question for _, question in pending], top_k=5, min_similarity=0.05, filters=filters)
+        except Exception as e:
+            logger.exception("배치 질문 분석 오류: %s", e)
+            batch_results = None
+        
+        for n, (i, question) in enumerate(pending):
+            if batch_results is None:
+                answers[i] = "처리 중 오류가 발생했습니다. 다시 시도해주세요."
+                continue
+            
+            search_results = batch_results[n]
+            if not search_results:
+                answers[i] = self.generate_no_result_response_enhanced(question, filters)
+            else:
+                answers[i] = self.generate_answer(question, search_results, filters)
+        
+        return answers
+    
+    def generate_no_result_response_enhanced(self, question, filters=None):
+        """결과가 없을 때 향상된 응답 (용어 인덱스와 코퍼스 통계만 사용, 전체 문서 순회 없음)
+        
+        filters가 있으면 키워드 결과도 필터에 맞는 청크만 보여준다.
+        """
+        snapshot = self.document_processor.snapshot
         keywords = question.split()
         keyword_results = []
         
-        for keyword in keywords:
-            if len(keyword) > 1:
-                for i, doc in enumerate(self.document_processor.documents):
-                    if keyword.lower() in doc['content'].lower():
-                        keyword_results.append({
-                            'keyword': keyword,
-                            'file_type': doc.get('file_type', 'Unknown'),
-                            'content': doc['content'][:200] + "..."
-                        })
-                        break
+        with SEARCH_STAGE_SECONDS.labels('fallback').time():
+            positions = snapshot.filter_positions(filters) if snapshot.documents else None
+            term_index = snapshot.term_index if snapshot.documents else None
+            for keyword in keywords:
+                terms = TermIndex.terms(keyword) if term_index and len(keyword) > 1 else []
+                if not terms:
+                    continue
+                # 문장부호 등으로 나뉜 경우 가장 긴 용어로 조회
+                position = term_index.first_position(max(terms, key=len), positions)
+                if position is not None:
+                    doc = snapshot.documents[position]
+                    keyword_results.append({
+                        'keyword': keyword,
+                        'file_type': doc.get('file_type', 'Unknown'),
+                        'content': doc['content'][:200] + "..."
+                    })
         
         response = f'''**📋 "{question}"에 대한 검색 결과**
 
@@ -930,65 +2738,213 @@ class QuestionAnalyzer:
             for result in keyword_results[:3]:
                 response += f"\n• **'{result['keyword']}'** 관련 ({result['file_type']}):\n{result['content']}\n"
         
-        file_types = {}
-        for doc in self.document_processor.documents:
-            file_type = doc.get('file_type', 'Unknown')
-            file_types[file_type] = file_types.get(file_type, 0) + 1
-        
-        file_stats = ", ".join([f"{ft}: {count}개" for ft, count in file_types.items()])
+        stats = snapshot.stats
+        file_stats = ", ".join([f"{ft}: {count}개" for ft, count in stats.chunk_types.items()])
+        filter_suggestion = "\n• 검색 필터(파일명, 형식, 날짜) 범위를 넓혀보세요" if positions is not None else ""
+        filter_status = f"\n• 필터에 해당하는 청크: {len(positions)}개" if positions is not None else ""
         
         response += f'''
 
 **💡 검색 개선 제안:**
 • 다른 키워드로 질문해보세요
-• 더 구체적이거나 더 일반적인 질문을 시도해보세요
+• 더 구체적이거나 더 일반적인 질문을 시도해보세요{filter_suggestion}
 
 **📊 현재 상태:**
-• 처리된 파일 수: {len(self.document_processor.get_processed_files_info())}개
+• 처리된 파일 수: {stats.total_files}개
 • 문서 타입별: {file_stats}
-• 총 문서 청크: {len(self.document_processor.documents)}개
+• 총 문서 청크: {stats.total_chunks}개{filter_status}
 
 궁금한 점이 있으시면 다시 질문해주세요!'''
         
         return response
     
-    def generate_answer(self, question, search_results):
-        """검색 결과를 바탕으로 답변 생성"""
+    def stream_answer(self, question, deadline=None, trace=None, filters=None):
+        """질문 분석 결과를 단계별 이벤트로 생성 (SSE 스트리밍용)
+        
+        검색 단계가 끝날 때마다 현재 최고 청크('stage')를 내보내고, 통합이 끝나면
+        관련 정보('related'), 출처('sources'), 신뢰도('confidence')를 차례로 보낸 뒤
+        analyze_question과 같은 최종 답변('answer')으로 마무리한다.
+        deadline/trace/filters는 analyze_question과 같다.
+        
+        Yields:
+            (이벤트 이름, 데이터 dict)
+        """
         try:
-            best_results = [r for r in search_results if r['similarity'] > 0.3]
+            if not question or len(question.strip()) < 2:
+                yield 'answer', {'message': "질문을 입력해주세요."}
+                return
             
+            question = question.strip()
+            logger.debug("=== 질문 분석 (스트리밍): %s ===", question)
+            
+            intent_answer = self.match_intent(question, trace)
+            if intent_answer is not None:
+                yield 'answer', {'message': intent_answer}
+                return
+            
+            search_results = []
+            pattern = self._keyword_pattern(question)
+            stages = self.document_processor.iter_search_stages(
+                question, top_k=5, min_similarity=0.05, deadline=deadline, trace=trace, filters=filters)
+            for stage, stage_results, merged_results in stages:
+                search_results = merged_results
+                best = None
+                if merged_results and merged_results[0]['similarity'] > self.ANSWER_MIN_SIMILARITY:
+                    best = self._summarize_result(merged_results[0], pattern)
+                yield 'stage', {'stage': stage, 'found': len(stage_results), 'best': best}
+            
+            best_results = [r for r in search_results if r['similarity'] > self.ANSWER_MIN_SIMILARITY]
             if not best_results:
-                return self.generate_no_result_response_enhanced(question)
+                yield 'answer', {'message': self.generate_no_result_response_enhanced(question, filters)}
+                return
             
-            answer = f"**📋 '{question}'에 대한 답변**\n\n"
+            with SEARCH_STAGE_SECONDS.labels('answer').time():
+                sections = self._answer_sections(question, best_results)
+            if sections['related']:
+                yield 'related', {'message': sections['related']}
+            yield 'sources', {'message': sections['sources'], 'sources': sections['source_list']}
+            yield 'confidence', {'message': sections['confidence'], 'similarity': sections['avg_similarity']}
+            yield 'answer', {'message': self._join_sections(sections)}
             
-            main_content = best_results[0]['content']
-            answer += f"{main_content}\n\n"
-            
-            if len(best_results) > 1:
-                answer += "**📚 관련 추가 정보:**\n\n"
-                for i, result in enumerate(best_results[1:3], 1):
-                    content = result['content']
-                    file_type = result['document'].get('file_type', 'Unknown')
-                    if len(content) > 200:
-                        content = content[:200] + "..."
-                    answer += f"{i}. ({file_type}) {content}\n\n"
-            
-            sources_info = []
-            for result in best_results:
-                filename = result['document']['filename']
+        except Exception as e:
+            logger.exception("스트리밍 답변 오류: %s", e)
+            yield 'error', {'message': "처리 중 오류가 발생했습니다. 다시 시도해주세요."}
+    
+    def _keyword_pattern(self, question):
+        """질문 키워드를 찾는 정규식 (긴 키워드 우선, 대소문자 무시, 키워드가 없으면 None)"""
+        keywords = {keyword for keyword in self.document_processor.extract_keywords(question)
+                    if keyword.lower() not in self.SNIPPET_STOPWORDS}
+        keywords = sorted(keywords, key=len, reverse=True)
+        if not keywords:
+            return None
+        return re.compile('|'.join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+    
+    def build_snippet(self, document, pattern, max_chars=None, max_sentences=None):
+        """질문 키워드가 가장 많이 나오는 연속 문장 구간을 발췌하고 키워드를 굵게 표시
+        
+        문장 위치는 문서 처리 때 계산한 document['sentences']를 쓰므로 요청마다 다시
+        나누지 않는다. 키워드가 없으면(벡터 검색 결과 등) 청크 앞부분을 쓴다.
+        고른 구간은 max_chars/max_sentences 안에서 이웃 문장(뒤 문장 먼저)으로 채운다.
+        """
+        max_chars = max_chars or self.SNIPPET_MAX_CHARS
+        max_sentences = max_sentences or self.SNIPPET_MAX_SENTENCES
+        content = document['content']
+        sentences = document.get('sentences') or [(0, len(content))]
+        starts = [start for start, _ in sentences]
+        
+        # 키워드 일치 위치를 한 번 훑어 문장별 점수로 누적
+        scores = [0] * len(sentences)
+        matches = list(pattern.finditer(content)) if pattern else []
+        for match in matches:
+            index = bisect.bisect_right(starts, match.start()) - 1
+            if index >= 0 and match.start() < sentences[index][1]:
+                scores[index] += len(match.group())
+        
+        # 길이 제한 안에서 점수 합이 가장 큰 연속 문장 구간 (같으면 짧은 구간, 그다음 앞쪽)
+        best_first, best_last, best_score = 0, 0, -1
+        for first in range(len(sentences)):
+            score = 0
+            for last in range(first, min(first + max_sentences, len(sentences))):
+                if last > first and sentences[last][1] - sentences[first][0] > max_chars:
+                    break
+                score += scores[last]
+                if score > best_score or (score == best_score and last - first < best_last - best_first):
+                    best_first, best_last, best_score = first, last, score
+        
+        # 키워드가 없는 이웃 문장도 길이 제한 안에서 붙여 문맥을 채움
+        while best_last - best_first + 1 < max_sentences:
+            if best_last + 1 < len(sentences) and sentences[best_last + 1][1] - sentences[best_first][0] <= max_chars:
+                best_last += 1
+            elif best_first > 0 and sentences[best_last][1] - sentences[best_first - 1][0] <= max_chars:
+                best_first -= 1
+            else:
+                break
+        
+        start, end = sentences[best_first][0], sentences[best_last][1]
+        if end - start > max_chars:
+            # 문장 하나가 너무 길면 첫 키워드 주변만 자름
+            hits = [match.start() for match in matches if start <= match.start() < end]
+            center = hits[0] if hits else start
+            start = max(start, min(center - max_chars // 3, end - max_chars))
+            end = start + max_chars
+        
+        snippet = content[start:end].strip()
+        if pattern:
+            snippet = pattern.sub(lambda match: f"**{match.group()}**", snippet)
+        return ("..." if start > 0 else "") + snippet + ("..." if end < len(content) else "")
+    
+    def _summarize_result(self, result, pattern=None):
+        """스트리밍으로 보낼 검색 결과 요약 (JSON 직렬화 가능한 필드만, 본문은 질문 중심 발췌)
+        
+        similarity는 1단계 점수, rerank_score는 재순위 점수(재순위된 결과에만 있음)다.
+        """
+        document = result['document']
+        summary = {
+            'content': self.build_snippet(document, pattern),
+            'filename': document.get('filename'),
+            'file_type': document.get('file_type', 'Unknown'),
+            'similarity': round(float(result['similarity']), 4)
+        }
+        if 'rerank_score' in result:
+            summary['rerank_score'] = result['rerank_score']
+        return summary
+    
+    def _answer_sections(self, question, best_results):
+        """답변 구성 요소 (본문, 관련 정보, 출처, 신뢰도)
+        
+        본문과 관련 정보는 청크 전체 대신 질문 키워드 중심의 발췌(build_snippet)를 쓴다.
+        순서는 (재순위된 경우) 재순위 순서를 따르고, 신뢰도는 1단계 similarity 평균이다.
+        """
+        pattern = self._keyword_pattern(question)
+        main = f"**📋 '{question}'에 대한 답변**\n\n"
+        main += f"{self.build_snippet(best_results[0]['document'], pattern)}\n\n"
+        
+        related = ""
+        if len(best_results) > 1:
+            related += "**📚 관련 추가 정보:**\n\n"
+            for i, result in enumerate(best_results[1:3], 1):
+                content = self.build_snippet(result['document'], pattern, self.RELATED_SNIPPET_MAX_CHARS,
+                                             self.RELATED_SNIPPET_MAX_SENTENCES)
                 file_type = result['document'].get('file_type', 'Unknown')
-                sources_info.append(f"{filename} ({file_type})")
-            
-            unique_sources = list(dict.fromkeys(sources_info))
-            answer += f"**📖 출처**: {', '.join(unique_sources)}\n\n"
+                related += f"{i}. ({file_type}) {content}\n\n"
+        
+        sources_info = []
+        for result in best_results:
+            for source in self.document_processor.get_document_sources(result['document']):
+                sources_info.append(f"{source['filename']} ({source.get('file_type') or 'Unknown'})")
+        
+        unique_sources = list(dict.fromkeys(sources_info))
+        sources = f"**📖 출처**: {', '.join(unique_sources)}\n\n"
+        
+        avg_similarity = sum(r['similarity'] for r in best_results) / len(best_results)
+        confidence_label = "높음" if avg_similarity > 0.7 else "보통" if avg_similarity > 0.5 else "낮음"
+        confidence = f"**🎯 답변 신뢰도**: {confidence_label} ({avg_similarity:.2f})"
+        
+        return {
+            'main': main,
+            'related': related,
+            'sources': sources,
+            'confidence': confidence,
+            'source_list': unique_sources,
+            'avg_similarity': round(float(avg_similarity), 4)
+        }
+    
+    @staticmethod
+    def _join_sections(sections):
+        """답변 구성 요소를 하나의 마크다운 답변으로 결합"""
+        return sections['main'] + sections['related'] + sections['sources'] + sections['confidence']
+    
+    def generate_answer(self, question, search_results, filters=None):
+        """검색 결과를 바탕으로 답변 생성 (filters는 결과가 없을 때 안내에 사용)"""
+        try:
+            best_results = [r for r in search_results if r['similarity'] > self.ANSWER_MIN_SIMILARITY]
             
-            avg_similarity = sum(r['similarity'] for r in best_results) / len(best_results)
-            confidence = "높음" if avg_similarity > 0.7 else "보통" if avg_similarity > 0.5 else "낮음"
-            answer += f"**🎯 답변 신뢰도**: {confidence} ({avg_similarity:.2f})"
+            if not best_results:
+                return self.generate_no_result_response_enhanced(question, filters)
             
-            return answer
+            with SEARCH_STAGE_SECONDS.labels('answer').time():
+                return self._join_sections(self._answer_sections(question, best_results))
             
         except Exception as e:
-            print(f"답변 생성 오류: {e}")
-            return "답변을 생성하는 중 오류가 발생했습니다."
\ No newline at end of file
+            logger.error("답변 생성 오류: %s", e)
+            return "답변을 생성하는 중 오류가 발생했습니다."
@@ -0,0 +1,172 @@
+# intent_router.py - 인사/감사/자주 묻는 질문 의도 판별 (Aho-Corasick 한 번 훑기)
+import json
+from collections import deque
+
+# 기본 의도 표
+#   patterns: 끝이 '*'이면 단어 뒤에 다른 글자가 붙어도 일치 ('감사합*' -> '감사합니다'),
+#             아니면 단어 전체가 일치해야 함. 모든 패턴은 단어 시작에서만 일치한다.
+#   max_other_words: 일치한 구절 밖의 단어가 이보다 많으면 실제 질문으로 보고 검색 (None이면 제한 없음)
+#   response: QuestionAnalyzer의 내장 응답 이름, answer: 고정 답변 문자열 (둘 중 하나)
+DEFAULT_INTENTS = [
+    {
+        'name': 'greeting',
+        'patterns': ['안녕*', '반가워*', '반갑*', '처음 뵙*', '좋은 아침*', 'hi', 'hello', 'hey', '하이'],
+        'max_other_words': 2,
+        'response': 'greeting'
+    },
+    {
+        'name': 'thanks',
+        'patterns': ['감사합*', '감사해*', '감사드*', '고마워*', '고맙*', 'thank*', 'thx', '땡큐',
+                     '도움이 됐*', '도움이 되었*', '도움 됐*'],
+        'max_other_words': 3,
+        'response': 'thanks'
+    },
+]
+
+
+def load_intents(path=None):
+    """기본 의도 표에 JSON 파일의 의도를 합침 (같은 이름은 교체, 새 이름은 뒤에 추가)"""
+    intents = [dict(intent) for intent in DEFAULT_INTENTS]
+    if not path:
+        return intents
+
+    with open(path, 'r', encoding='utf-8') as f:
+        custom = json.load(f)
+    positions = {intent['name']: n for n, intent in enumerate(intents)}
+    for intent in custom:
+        if not intent.get('name') or not intent.get('patterns'):
+            raise ValueError(f"의도에는 name과 patterns가 필요합니다: {intent}")
+        if intent['name'] in positions:
+            intents[positions[intent['name']]] = intent
+        else:
+            positions[intent['name']] = len(intents)
+            intents.append(intent)
+    return intents
+
+
+class AhoCorasick:
+    """여러 패턴을 한 번에 찾는 Aho-Corasick 오토마톤
+
+    find_all은 텍스트를 한 번 훑으며 (시작 위치, 끝 위치, 패턴 값)을 모두 돌려준다.
+    """
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns: (패턴 문자열, 값) 목록
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+
+        for pattern, value in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append((len(pattern), value))
+
+        # 너비 우선으로 실패 링크 계산 (실패 상태의 출력도 합쳐 둠)
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find_all(self, text):
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._outputs[state]:
+                yield end - length, end, value
+
+
+class IntentRouter:
+    """의도 표를 하나의 오토마톤으로 컴파일해 질문의 의도를 판별
+
+    패턴 앞뒤의 단어 경계를 확인하므로 '시작 날짜'나 '감사 보고서'처럼 패턴이 단어 일부로
+    들어간 질문은 일치하지 않는다. 여러 의도가 일치하면 일치한 글자 수가 가장 많은 의도,
+    같으면 표에서 앞선 의도를 고른다.
+    """
+
+    def __init__(self, intents=None):
+        self.intents = list(intents if intents is not None else DEFAULT_INTENTS)
+        patterns = []
+        for index, intent in enumerate(self.intents):
+            for pattern in intent['patterns']:
+                prefix = pattern.endswith('*')
+                text = self.normalize(pattern.rstrip('*'))
+                patterns.append((text, (index, prefix)))
+        self._automaton = AhoCorasick(patterns)
+
+    @staticmethod
+    def normalize(text):
+        """소문자화하고 연속 공백을 하나로"""
+        return ' '.join(text.lower().split())
+
+    @staticmethod
+    def _is_word_char(char):
+        return char.isalnum()
+
+    def match(self, question):
+        """질문과 일치하는 의도 (없으면 None)"""
+        text = self.normalize(question)
+        is_word = self._is_word_char
+
+        spans = {}  # 의도 번호 -> 일치한 (시작, 끝) 목록
+        for start, end, (index, prefix) in self._automaton.find_all(text):
+            if start > 0 and is_word(text[start - 1]):
+                continue
+            if not prefix and end < len(text) and is_word(text[end]):
+                continue
+            # 접두어 패턴은 단어 끝까지를 일치 구간으로 봄
+            while prefix and end < len(text) and is_word(text[end]):
+                end += 1
+            spans.setdefault(index, []).append((start, end))
+
+        best, best_covered = None, 0
+        for index, matched in spans.items():
+            intent = self.intents[index]
+            covered = [False] * len(text)
+            for start, end in matched:
+                covered[start:end] = [True] * (end - start)
+
+            max_other_words = intent.get('max_other_words')
+            if max_other_words is not None and self._count_other_words(text, covered) > max_other_words:
+                continue
+
+            covered_chars = sum(covered)
+            if best is None or covered_chars > best_covered or (covered_chars == best_covered and index < best):
+                best, best_covered = index, covered_chars
+
+        return self.intents[best] if best is not None else None
+
+    def _count_other_words(self, text, covered):
+        """일치 구간에 걸치지 않은 단어 수"""
+        count, in_word, word_covered = 0, False, False
+        for position, char in enumerate(text):
+            if self._is_word_char(char):
+                if not in_word:
+                    in_word, word_covered = True, False
+                word_covered = word_covered or covered[position]
+            elif in_word:
+                in_word = False
+                count += not word_covered
+        if in_word:
+            count += not word_covered
+        return count
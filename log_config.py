@@ -0,0 +1,120 @@
+# log_config.py - 로깅 설정 (큐 기반 비동기 출력, 요청 단위 DEBUG 샘플링, 구조화 요약 레코드)
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime
+
+# 현재 요청의 DEBUG 로그 출력 여부 (None이면 요청 밖 - 샘플링하지 않음)
+_debug_sampled = contextvars.ContextVar('debug_sampled', default=None)
+_listener = None
+
+
+class RequestSamplingFilter(logging.Filter):
+    """DEBUG 레코드는 샘플링된 요청에서만 통과 (INFO 이상과 요청 밖의 레코드는 항상 통과)"""
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        sampled = _debug_sampled.get()
+        return sampled is None or sampled
+
+
+class StructuredFormatter(logging.Formatter):
+    """한 줄 텍스트(key=value 필드 추가) 또는 JSON 형식"""
+
+    def __init__(self, json_format=False):
+        super().__init__('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+        self.json_format = json_format
+
+    def format(self, record):
+        fields = getattr(record, 'fields', None)
+
+        if self.json_format:
+            payload = {
+                'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+                'level': record.levelname,
+                'logger': record.name,
+                'message': record.getMessage()
+            }
+            if fields:
+                payload.update(fields)
+            if record.exc_info:
+                payload['exc_info'] = self.formatException(record.exc_info)
+            return json.dumps(payload, ensure_ascii=False, default=str)
+
+        text = super().format(record)
+        if fields:
+            text += ' ' + ' '.join(
+                f"{key}={json.dumps(value, ensure_ascii=False, default=str)}" for key, value in fields.items())
+        return text
+
+
+def setup_logging(level='INFO', json_format=False, stream=None):
+    """루트 로거에 큐 핸들러 연결 (출력은 별도 스레드의 QueueListener가 담당)
+
+    여러 번 호출해도 한 번만 설정한다.
+
+    Returns:
+        QueueListener
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    output_handler = logging.StreamHandler(stream or sys.stdout)
+    output_handler.setFormatter(StructuredFormatter(json_format))
+
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestSamplingFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def begin_request_sampling(sample_rate):
+    """현재 요청의 DEBUG 로그 출력 여부를 정함
+
+    Returns:
+        (샘플링 여부, end_request_sampling에 넘길 토큰)
+    """
+    sampled = sample_rate >= 1 or random.random() < sample_rate
+    return sampled, _debug_sampled.set(sampled)
+
+
+def resume_request_sampling(sampled):
+    """요청이 끝난 뒤 실행되는 코드(스트리밍 응답 생성기 등)에 요청의 샘플링 결정을 다시 적용
+
+    Returns:
+        end_request_sampling에 넘길 토큰
+    """
+    return _debug_sampled.set(sampled)
+
+
+def end_request_sampling(token):
+    """요청 종료 시 샘플링 상태 복원 (다른 컨텍스트에서 만든 토큰이면 무시)"""
+    try:
+        _debug_sampled.reset(token)
+    except ValueError:
+        _debug_sampled.set(None)
+
+
+def is_debug_sampled():
+    """현재 요청의 DEBUG 로그가 출력되는지 (요청 밖이면 True)"""
+    return _debug_sampled.get() is not False
+
+
+def log_event(logger, event, message=None, level=logging.INFO, **fields):
+    """구조화 레코드 기록 (필드는 텍스트 형식에서 key=value, JSON 형식에서 최상위 키)"""
+    logger.log(level, message or event, extra={'fields': dict(event=event, **fields)})
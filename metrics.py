@@ -0,0 +1,365 @@
+# metrics.py - Prometheus 텍스트 형식 메트릭 (카운터/게이지/히스토그램, 멀티 워커 집계)
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Timer:
+    """with 블록 소요 시간을 히스토그램에 기록"""
+
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dump(self):
+        return self.value
+
+    def reset(self):
+        self.value = 0.0
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = float(value)
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+    def dump(self):
+        return {'counts': list(self.counts), 'sum': self.sum}
+
+    def reset(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+
+class Metric:
+    """레이블별 값을 가지는 메트릭 (labels(...)로 하위 값을 얻어 기록)"""
+
+    def __init__(self, kind, name, documentation, labelnames=(), buckets=None, aggregate='sum'):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) if buckets else None
+        self.aggregate = aggregate  # 게이지의 워커 간 집계 방식 (sum | max)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        if self.kind == 'histogram':
+            return _HistogramChild(self.buckets)
+        if self.kind == 'gauge':
+            return _GaugeChild()
+        return _CounterChild()
+
+    def labels(self, *values):
+        """레이블 값(labelnames 순서)에 해당하는 하위 값"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 레이블 {self.labelnames}에 맞지 않는 값 {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    # 레이블 없는 메트릭용 단축 메서드
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def dump(self):
+        with self._lock:
+            items = list(self._children.items())
+        return [[list(key), child.dump()] for key, child in items]
+
+    def reset(self):
+        with self._lock:
+            for child in self._children.values():
+                child.reset()
+
+
+class MetricsRegistry:
+    """프로세스 내 메트릭 저장소
+
+    enable_multiprocess(directory)를 호출하면 각 워커가 주기적으로
+    <directory>/metrics-<pid>.json에 값을 기록하고, /metrics 응답은 모든 파일을
+    합산한다. 카운터/히스토그램은 종료된 워커 값까지 합산하고, 게이지는
+    살아 있는 워커 값만 aggregate 방식(sum/max)으로 합친다.
+    배포 시작 시 디렉터리를 비우는 것은 운영 측 책임이다.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.directory = None
+        self.flush_interval = 5.0
+        self._flusher = None
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Metric('counter', name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), aggregate='sum'):
+        return self._register(Metric('gauge', name, documentation, labelnames, aggregate=aggregate))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Metric('histogram', name, documentation, labelnames, buckets=buckets))
+
+    def add_collector(self, collector):
+        """수집 직전에 호출되어 게이지 값을 갱신하는 함수 등록"""
+        self._collectors.append(collector)
+
+    def _run_collectors(self):
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception:
+                pass  # 수집 실패가 /metrics 응답을 막지 않도록
+
+    # --- 멀티 워커 ---
+
+    def enable_multiprocess(self, directory, flush_interval=5.0):
+        """워커별 파일 기록 활성화"""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        atexit.register(self.flush)
+
+    def check_process(self):
+        """fork된 워커에서 처음 호출되면 부모에게 물려받은 값을 비우고 주기 기록 스레드 시작
+
+        요청마다 호출해도 되도록 pid 비교만 한다.
+        """
+        if self.directory is None:
+            return
+        pid = os.getpid()
+        if pid != self._pid:
+            with self._lock:
+                if pid != self._pid:
+                    for metric in self._metrics.values():
+                        metric.reset()
+                    self._pid = pid
+                    self._flusher = None
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _dump(self):
+        self._run_collectors()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                'kind': metric.kind,
+                'documentation': metric.documentation,
+                'labelnames': list(metric.labelnames),
+                'buckets': list(metric.buckets) if metric.buckets else None,
+                'aggregate': metric.aggregate,
+                'samples': metric.dump()
+            }
+            for metric in metrics
+        }
+
+    def flush(self):
+        """현재 워커 값을 파일로 기록 (임시 파일 후 교체)"""
+        if self.directory is None:
+            return
+        try:
+            pid = os.getpid()
+            path = os.path.join(self.directory, f"metrics-{pid}.json")
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'pid': pid, 'written_at': time.time(), 'metrics': self._dump()}, f)
+            os.replace(temp_path, path)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _load_dumps(self):
+        """모든 워커의 값 (현재 워커는 메모리의 최신 값 사용)
+
+        Returns:
+            [(살아 있는 워커인지, 메트릭 dump)]
+        """
+        own = self._dump()
+        dumps = [(True, own)]
+        if self.directory is None:
+            return dumps
+
+        pid = os.getpid()
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data.get('pid') == pid:
+                continue
+            dumps.append((self._pid_alive(data.get('pid', 0)), data.get('metrics', {})))
+        return dumps
+
+    def collect(self):
+        """워커 값을 합친 메트릭 목록
+
+        Returns:
+            {이름: {'kind', 'documentation', 'labelnames', 'buckets', 'samples': {레이블 tuple: 값}}}
+        """
+        merged = {}
+        for alive, dump in self._load_dumps():
+            for name, info in dump.items():
+                kind = info['kind']
+                if kind == 'gauge' and not alive:
+                    continue
+
+                target = merged.setdefault(name, dict(info, samples={}))
+                samples = target['samples']
+                for labels, value in info['samples']:
+                    key = tuple(labels)
+                    current = samples.get(key)
+                    if current is None:
+                        samples[key] = value if kind != 'histogram' else {
+                            'counts': list(value['counts']), 'sum': value['sum']}
+                    elif kind == 'histogram':
+                        if len(current['counts']) == len(value['counts']):
+                            current['counts'] = [a + b for a, b in zip(current['counts'], value['counts'])]
+                            current['sum'] += value['sum']
+                    elif kind == 'gauge' and info.get('aggregate') == 'max':
+                        samples[key] = max(current, value)
+                    else:
+                        samples[key] = current + value
+        return merged
+
+    # --- 출력 ---
+
+    @staticmethod
+    def _format_labels(labelnames, values, extra=None):
+        pairs = list(zip(labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        escaped = (f'{key}="{_escape_label_value(value)}"' for key, value in pairs)
+        return '{' + ','.join(escaped) + '}'
+
+    @staticmethod
+    def _format_value(value):
+        if value == float('inf'):
+            return '+Inf'
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+
+    def render(self):
+        """Prometheus 텍스트 노출 형식 (0.0.4)"""
+        lines = []
+        for name, info in sorted(self.collect().items()):
+            kind = info['kind']
+            labelnames = info['labelnames']
+            lines.append(f"# HELP {name} {info['documentation']}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for labels, value in sorted(info['samples'].items()):
+                if kind != 'histogram':
+                    lines.append(f"{name}{self._format_labels(labelnames, labels)} {self._format_value(value)}")
+                    continue
+
+                cumulative = 0
+                bounds = list(info['buckets']) + [float('inf')]
+                for bound, count in zip(bounds, value['counts']):
+                    cumulative += count
+                    le = ('le', self._format_value(bound))
+                    lines.append(f"{name}_bucket{self._format_labels(labelnames, labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{self._format_labels(labelnames, labels)} {self._format_value(value['sum'])}")
+                lines.append(f"{name}_count{self._format_labels(labelnames, labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+# 애플리케이션 전체에서 공유하는 기본 저장소
+REGISTRY = MetricsRegistry()
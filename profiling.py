@@ -0,0 +1,120 @@
+# profiling.py - 요청 단위 cProfile 프로파일링 (관리자 요청 시 또는 N번째 요청마다)
+import cProfile
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class RequestProfiler:
+    """요청 하나를 cProfile로 실행하고 누적 시간 상위 함수 요약과 pstats 파일을 남김
+
+    cProfile은 실행한 스레드만 측정하므로 다른 스레드(질문 인코딩 배치 등)에서
+    쓴 시간은 대기 시간으로만 나타난다. 프로파일러는 프로세스당 하나만 켤 수 있어
+    이미 다른 요청을 측정 중이면 프로파일링 없이 실행한다.
+    """
+
+    def __init__(self, output_dir, every_n=0, top_n=25, max_files=200, keep_reports=20):
+        self.output_dir = output_dir
+        self.every_n = max(0, int(every_n))
+        self.top_n = max(1, int(top_n))
+        self.max_files = max(1, int(max_files))
+
+        self._lock = threading.Lock()  # 동시에 하나만 측정
+        self._counter_lock = threading.Lock()
+        self._counter = 0
+        self.recent = deque(maxlen=keep_reports)
+        self.stats = {'profiled': 0, 'skipped_busy': 0}
+
+    def sample_due(self):
+        """N번째 요청마다 프로파일링하는 모드에서 이번 요청이 대상인지"""
+        if self.every_n <= 0:
+            return False
+        with self._counter_lock:
+            self._counter += 1
+            return self._counter % self.every_n == 0
+
+    def run(self, label, func, *args, **kwargs):
+        """func를 프로파일링하며 실행
+
+        Returns:
+            (func 결과, 리포트 dict 또는 None - 다른 측정이 진행 중이어서 생략한 경우)
+        """
+        if not self._lock.acquire(blocking=False):
+            self.stats['skipped_busy'] += 1
+            return func(*args, **kwargs), None
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                profile.disable()
+        finally:
+            self._lock.release()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats['profiled'] += 1
+        report = {
+            'label': label,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'elapsed_ms': round(elapsed_ms, 2),
+            'file': self.save(profile, label),
+            'functions': self.top_functions(profile, self.top_n)
+        }
+        self.recent.appendleft(report)
+        return result, report
+
+    @staticmethod
+    def top_functions(profile, top_n=25):
+        """누적 시간(cumulative) 상위 함수 목록"""
+        entries = []
+        for (filename, line, name), (_, calls, total, cumulative, _) in pstats.Stats(profile).stats.items():
+            entries.append({
+                'function': f"{os.path.basename(filename)}:{line}({name})" if line else name,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3)
+            })
+        entries.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+        return entries[:top_n]
+
+    def save(self, profile, label):
+        """pstats 파일 저장 후 오래된 파일 정리
+
+        Returns:
+            저장한 파일명 (실패 시 None)
+        """
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            filename = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{label}-{os.getpid()}.prof"
+            path = os.path.join(self.output_dir, filename)
+            profile.dump_stats(path + '.tmp')
+            os.replace(path + '.tmp', path)
+            self._prune()
+            return filename
+        except OSError:
+            return None
+
+    def _prune(self):
+        files = self.list_files()
+        for filename in files[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.output_dir, filename))
+            except OSError:
+                pass
+
+    def list_files(self):
+        """저장된 pstats 파일명 (최신순)"""
+        try:
+            names = [name for name in os.listdir(self.output_dir) if name.endswith('.prof')]
+        except OSError:
+            return []
+        return sorted(names, reverse=True)
+
+    def get_stats(self):
+        return dict(self.stats, every_n=self.every_n, files=len(self.list_files()))
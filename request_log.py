@@ -0,0 +1,59 @@
+# request_log.py - 채팅 요청 기록 (부하 테스트 재생용 JSON Lines)
+import json
+import os
+import random
+import threading
+import time
+
+
+class RequestRecorder:
+    """요청을 한 줄에 하나씩 JSON으로 추가 기록
+
+    한 줄을 O_APPEND로 한 번에 쓰므로 여러 워커가 같은 파일에 기록해도 줄이
+    섞이지 않는다. 파일이 max_bytes를 넘으면 더 기록하지 않는다.
+    """
+
+    def __init__(self, path, sample_rate=1.0, max_bytes=0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._fd = None
+        self._pid = None
+        self.stats = {'recorded': 0, 'skipped_full': 0, 'errors': 0}
+
+    def _open(self):
+        """기록 파일 열기 (fork된 워커는 새로 연다)"""
+        if self._fd is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+        return self._fd
+
+    def record(self, method, path, body=None, args=None):
+        """요청 하나 기록 (도착 시각 ts는 epoch 초)"""
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+
+        entry = {'ts': round(time.time(), 6), 'method': method, 'path': path}
+        if body is not None:
+            entry['body'] = body
+        if args:
+            entry['args'] = args
+        line = (json.dumps(entry, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+        with self._lock:
+            try:
+                fd = self._open()
+                if self.max_bytes and os.fstat(fd).st_size + len(line) > self.max_bytes:
+                    self.stats['skipped_full'] += 1
+                    return
+                os.write(fd, line)
+                self.stats['recorded'] += 1
+            except OSError:
+                self.stats['errors'] += 1
+
+    def get_stats(self):
+        return dict(self.stats, path=self.path, sample_rate=self.sample_rate)
@@ -0,0 +1,143 @@
+# reranker.py - 2단계 검색의 재순위 (후보 N개만 더 정밀하게 점수 계산, 시간 예산 안에서)
+import bisect
+import logging
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+
+class Reranker(ABC):
+    """재순위 공통 흐름 (하위 클래스는 score_batch만 구현)
+
+    후보를 batch_size개씩 점수 계산하다가 마감 시각이 지나면 멈춘다. 점수를 받은
+    후보는 재순위 점수 순으로, 받지 못한 후보는 1단계 순서 그대로 그 뒤에 붙인다.
+    결과의 similarity는 계속 1단계 점수를 뜻하고(답변 최소 유사도와 신뢰도에 사용),
+    재순위는 순서만 바꾸며 점수는 rerank_score로 따로 더한다.
+    """
+
+    name = 'base'
+    batch_size = 8
+
+    @abstractmethod
+    def score_batch(self, query, keywords, candidates):
+        """후보 목록의 점수 목록 (클수록 관련)"""
+
+    def rerank(self, query, keywords, candidates, deadline=None):
+        """
+        Args:
+            keywords: 질문 키워드 (DocumentProcessor.extract_keywords 결과)
+            candidates: 1단계 통합 결과 (점수 내림차순)
+            deadline: time.monotonic 기준 마감 시각 (None이면 제한 없음)
+
+        Returns:
+            (재순위된 결과 목록, {'candidates', 'scored', 'timed_out'})
+        """
+        scored = []
+        timed_out = False
+        for start in range(0, len(candidates), self.batch_size):
+            if deadline is not None and time.monotonic() >= deadline:
+                timed_out = True
+                break
+            batch = candidates[start:start + self.batch_size]
+            for result, score in zip(batch, self.score_batch(query, keywords, batch)):
+                scored.append(dict(result, rerank_score=round(float(score), 4)))
+
+        scored.sort(key=lambda result: result['rerank_score'], reverse=True)
+        info = {'reranker': self.name, 'candidates': len(candidates), 'scored': len(scored), 'timed_out': timed_out}
+        return scored + list(candidates[len(scored):]), info
+
+
+class FeatureReranker(Reranker):
+    """질문-청크 특징의 가중합으로 재순위 (추가 모델 없음)
+
+    특징: 1단계 점수, 질문 키워드 포함 비율, 한 문장 안에 모인 키워드 비율(문서 처리 때
+    계산한 문장 위치 사용), 질문 전체 구절 포함 여부, 찾아낸 검색 방법 수.
+    """
+
+    name = 'features'
+    batch_size = 16
+    WEIGHTS = {
+        'first_stage': 0.35,
+        'coverage': 0.3,
+        'sentence_coverage': 0.2,
+        'phrase': 0.1,
+        'agreement': 0.05
+    }
+    METHOD_COUNT = 3  # substring, keyword, vector
+
+    def score_batch(self, query, keywords, candidates):
+        keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        phrase = ' '.join(re.findall(r'\w+', query.lower()))
+        pattern = re.compile('|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))) \
+            if keywords else None
+        return [self._score(result, keywords, phrase, pattern) for result in candidates]
+
+    def _score(self, result, keywords, phrase, pattern):
+        content = result['content'].lower()
+        features = {
+            'first_stage': min(float(result['similarity']), 1.0),
+            'coverage': 0.0,
+            'sentence_coverage': 0.0,
+            'phrase': 1.0 if phrase and len(phrase) > 1 and phrase in ' '.join(re.findall(r'\w+', content)) else 0.0,
+            'agreement': len(set(result.get('methods') or [result.get('method')])) / self.METHOD_COUNT
+        }
+
+        if pattern is not None:
+            sentences = result['document'].get('sentences') or [(0, len(content))]
+            starts = [start for start, _ in sentences]
+            found, by_sentence = set(), {}
+            for match in pattern.finditer(content):
+                keyword = match.group()
+                found.add(keyword)
+                n = bisect.bisect_right(starts, match.start()) - 1
+                if n >= 0 and match.start() < sentences[n][1]:
+                    by_sentence.setdefault(n, set()).add(keyword)
+            features['coverage'] = len(found) / len(keywords)
+            if by_sentence:
+                features['sentence_coverage'] = max(len(words) for words in by_sentence.values()) / len(keywords)
+
+        return sum(self.WEIGHTS[name] * value for name, value in features.items())
+
+
+class CrossEncoderReranker(Reranker):
+    """로컬 폴더의 cross-encoder 모델로 질문-청크 쌍 점수 계산 (sentence-transformers 필요)"""
+
+    name = 'cross-encoder'
+
+    def __init__(self, model_name, batch_size=8, max_length=512):
+        from sentence_transformers import CrossEncoder
+        self.model = CrossEncoder(model_name, max_length=max_length)
+        self.batch_size = batch_size
+
+    def score_batch(self, query, keywords, candidates):
+        return self.model.predict([(query, result['content']) for result in candidates])
+
+
+def create_reranker(mode, model_name=None):
+    """설정 이름으로 재순위기 생성
+
+    Args:
+        mode: 'features' | 'cross-encoder' | 'off'
+        model_name: cross-encoder 모델 폴더 경로 (시작할 때 모델을 내려받지 않도록 로컬 경로만 허용)
+
+    Returns:
+        Reranker 또는 None (off). cross-encoder를 불러오지 못하면 features로 대체
+    """
+    mode = (mode or 'off').lower()
+    if mode in ('off', 'none', '0', 'false'):
+        return None
+    if mode == 'cross-encoder':
+        if not model_name or not os.path.isdir(model_name):
+            logger.warning("⚠️ cross-encoder 모델 폴더가 없음 (%s), 특징 기반 재순위 사용", model_name or '경로 미설정')
+            return FeatureReranker()
+        try:
+            return CrossEncoderReranker(model_name)
+        except Exception as e:
+            logger.warning("⚠️ cross-encoder 로딩 실패, 특징 기반 재순위 사용: %s", e)
+            return FeatureReranker()
+    if mode != 'features':
+        logger.warning("⚠️ 알 수 없는 재순위 방식 '%s', 특징 기반 재순위 사용", mode)
+    return FeatureReranker()
@@ -0,0 +1,83 @@
+# tests/conftest.py - 공통 픽스처 (저장소 루트 모듈을 불러오고, 파일 없이 인덱스 구성)
+import os
+import sys
+
+import pytest
+
+# 저장소 루트의 document_processor 등을 불러오기 위해
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_processor import DocumentProcessor, SimpleEmbedding
+
+
+def make_chunk(filename, content, chunk_id=0, file_type='Word', processed_date='2024-06-01T12:00:00'):
+    """process_document가 만드는 것과 같은 모양의 청크"""
+    return {
+        'content': content,
+        'filename': filename,
+        'file_type': file_type,
+        'chunk_id': chunk_id,
+        'file_path': filename,
+        'processed_date': processed_date,
+        'sentences': DocumentProcessor.sentence_offsets(content)
+    }
+
+
+def make_docx(path, paragraphs):
+    """문단 목록으로 Word 파일을 만들고 경로 반환 (process_document 입력용)"""
+    import docx
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def make_processor(tmp_path):
+    """청크 목록으로 디스크에 저장하지 않는 DocumentProcessor 구성
+
+    파일 메타데이터의 processed_date는 그 파일 첫 청크의 값을 쓴다.
+    """
+    def make(chunks, **kwargs):
+        kwargs.setdefault('encoder', SimpleEmbedding())
+        kwargs.setdefault('query_batch_window_ms', 0)
+        document_processor = DocumentProcessor(str(tmp_path), persist=False, **kwargs)
+        metadata = {}
+        for chunk in chunks:
+            metadata.setdefault(chunk['filename'], {
+                'file_type': chunk['file_type'],
+                'processed_date': chunk['processed_date'],
+                'chunk_count': 0
+            })['chunk_count'] += 1
+        document_processor._documents = list(chunks)
+        document_processor.metadata = metadata
+        document_processor._reset_stats()
+        document_processor.update_embeddings()  # 새 스냅샷 게시
+        return document_processor
+    return make
+
+
+@pytest.fixture(scope='session')
+def app_dir(tmp_path_factory):
+    """앱을 실행할 폴더 (UPLOAD_FOLDER 등 상대 경로가 여기 기준)"""
+    return tmp_path_factory.mktemp('app')
+
+
+@pytest.fixture(scope='session')
+def app_module(app_dir):
+    """임시 폴더에서 불러온 app 모듈 (가져올 때 빈 uploaded_documents로 초기화)"""
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    cwd = os.getcwd()
+    os.chdir(app_dir)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def client(app_module, app_dir, monkeypatch):
+    monkeypatch.chdir(app_dir)
+    return app_module.app.test_client()
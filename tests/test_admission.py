@@ -0,0 +1,79 @@
+# tests/test_admission.py - 채팅 API 동시 처리 제한(503)과 클라이언트별 속도 제한(429), Retry-After
+import threading
+import time
+
+from admission import AdmissionController, RateLimiter
+
+
+def test_queue_full_and_timeout_are_rejected():
+    admission = AdmissionController(max_inflight=1, max_queue=0, queue_timeout=0.05)
+    assert admission.acquire() == (True, None)
+    assert admission.acquire() == (False, 'queue_full')
+
+    admission = AdmissionController(max_inflight=1, max_queue=1, queue_timeout=0.05)
+    admission.acquire()
+    assert admission.acquire() == (False, 'timeout')
+
+    stats = admission.get_stats()
+    assert stats['inflight'] == 1 and stats['waiting'] == 0 and stats['rejected_timeout'] == 1
+
+
+def test_release_admits_waiting_request():
+    admission = AdmissionController(max_inflight=1, max_queue=1, queue_timeout=5)
+    admission.acquire()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(admission.acquire()))
+    waiter.start()
+    while admission.get_stats()['waiting'] == 0:
+        time.sleep(0.001)
+
+    admission.release()
+    waiter.join(5)
+
+    assert results == [(True, None)]
+    assert admission.get_stats()['queued'] == 1
+
+
+def test_rate_limiter_allows_burst_then_reports_wait():
+    limiter = RateLimiter(rate=0.5, burst=2)
+
+    assert limiter.allow('a')[0] and limiter.allow('a')[0]
+    allowed, retry_after = limiter.allow('a')
+
+    assert not allowed
+    assert 1.9 < retry_after <= 2.0
+    assert limiter.allow('b')[0]  # 클라이언트별로 따로 계산
+
+
+def test_chat_returns_503_with_retry_after_when_saturated(client, app_module, monkeypatch):
+    admission = AdmissionController(max_inflight=1, max_queue=0)
+    admission.acquire()
+    monkeypatch.setattr(app_module, 'chat_admission', admission)
+
+    response = client.post('/api/chat', json={'message': '출장비 규정'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app_module.CHAT_RETRY_AFTER)
+    data = response.get_json()
+    assert data['success'] is False and data['reason'] == 'queue_full'
+
+
+def test_chat_returns_429_with_retry_after_when_rate_limited(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'chat_rate_limiter', RateLimiter(rate=0.25, burst=1))
+
+    assert client.post('/api/chat', json={'message': '출장비 규정'}).status_code == 200
+    response = client.post('/api/chat', json={'message': '출장비 규정'})
+
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '4'
+    assert response.get_json()['reason'] == 'rate_limited'
+
+
+def test_admission_slot_is_released_after_each_request(client, app_module, monkeypatch):
+    admission = AdmissionController(max_inflight=1, max_queue=0)
+    monkeypatch.setattr(app_module, 'chat_admission', admission)
+
+    for _ in range(3):
+        assert client.post('/api/chat', json={'message': '출장비 규정'}).status_code == 200
+
+    assert admission.get_stats()['inflight'] == 0
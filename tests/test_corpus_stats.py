@@ -0,0 +1,67 @@
+# tests/test_corpus_stats.py - 증분 코퍼스 통계가 전체 재계산 결과와 항상 같은지
+import shutil
+
+from conftest import make_chunk, make_docx
+from document_processor import CorpusStats, DocumentProcessor, SimpleEmbedding
+
+TRAVEL = ('출장비 지급 기준은 별도 규정을 따르며 국내 출장은 실비로 정산하고 '
+          '해외 출장은 일비와 숙박비를 정액으로 지급한다.')
+LEAVE = ('연차 휴가는 입사일 기준으로 부여하며 미사용 연차는 다음 해로 이월하지 않고 '
+         '수당으로 정산한다.')
+
+
+def assert_matches_full_scan(document_processor):
+    expected = CorpusStats.from_index(document_processor.documents, document_processor.snapshot.metadata)
+    actual = document_processor.corpus_stats.as_dict()
+    expected = dict(expected.as_dict(), version=actual['version'])
+    assert actual == expected
+    assert actual['version'] == document_processor.index_version
+
+
+def test_counts_follow_adds_links_merges_and_deletes(tmp_path):
+    document_processor = DocumentProcessor(str(tmp_path), encoder=SimpleEmbedding(),
+                                           query_batch_window_ms=0, persist=False)
+    travel = make_docx(tmp_path / 'travel.docx', [TRAVEL])
+    document_processor.process_document(travel)
+    assert_matches_full_scan(document_processor)
+
+    shutil.copyfile(travel, tmp_path / 'copy.docx')  # 동일 내용 연결
+    document_processor.process_document(str(tmp_path / 'copy.docx'))
+    document_processor.process_document(make_docx(tmp_path / 'near.docx', [TRAVEL + ' 끝.']))  # 근접 중복 병합
+    document_processor.process_document(make_docx(tmp_path / 'leave.docx', [LEAVE]))
+    assert_matches_full_scan(document_processor)
+    assert document_processor.corpus_stats.total_files == 4
+    assert document_processor.corpus_stats.total_chunks == 2
+
+    for filename in ('travel.docx', 'leave.docx'):
+        document_processor.delete_file(filename)
+        assert_matches_full_scan(document_processor)
+
+    document_processor.reprocess_all_documents(force=True)
+    assert_matches_full_scan(document_processor)
+
+
+def test_representative_type_change_moves_chunk_count(make_processor):
+    document_processor = make_processor([make_chunk('a.pdf', '출장비 지급 기준', file_type='PDF')])
+    with document_processor.bulk_update():
+        doc = document_processor._documents[0]
+        source = dict(document_processor.get_document_sources(doc)[0], filename='b.docx', file_type='Word')
+        document_processor._documents[0] = document_processor._with_sources(
+            doc, document_processor.get_document_sources(doc) + [source])
+        document_processor.metadata['b.docx'] = {'file_type': 'Word'}
+        document_processor._stats.add_file({'file_type': 'Word'})
+
+        document_processor.remove_document_by_filename('a.pdf')
+
+    assert document_processor.corpus_stats.chunk_types == {'Word': 1}
+    assert_matches_full_scan(document_processor)
+
+
+def test_published_stats_are_not_changed_by_later_writes(make_processor):
+    document_processor = make_processor([make_chunk('a.docx', '출장비 지급 기준')])
+    published = document_processor.corpus_stats
+
+    document_processor.delete_file('a.docx')
+
+    assert published.total_chunks == 1 and published.total_files == 1
+    assert document_processor.corpus_stats.total_chunks == 0
@@ -0,0 +1,56 @@
+# tests/test_deadline.py - 질문당 지연 예산과 검색 단계 생략
+import time
+
+import pytest
+
+from conftest import make_chunk
+
+
+@pytest.fixture
+def deadline_for(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'CHAT_LATENCY_BUDGET_MS', 3000.0)
+
+    def deadline_for(requested):
+        with app_module.app.test_request_context():
+            return app_module.get_chat_deadline(requested)
+    return deadline_for
+
+
+@pytest.mark.parametrize('requested, budget_ms', [
+    (None, 3000.0),
+    ('', 3000.0),
+    (500, 500.0),
+    ('250.5', 250.5),
+    (10000, 3000.0),  # 서버 예산보다 길게 늘릴 수 없음
+    (0, 3000.0),  # 요청으로는 마감 시각을 끌 수 없음
+    (-1, 3000.0),
+    ('nan', 3000.0),
+    ('inf', 3000.0),
+    ('abc', 3000.0),
+    ([1], 3000.0),
+])
+def test_requested_budget_is_clamped_to_server_budget(deadline_for, requested, budget_ms):
+    deadline, applied = deadline_for(requested)
+
+    assert applied == budget_ms
+    assert deadline == pytest.approx(time.monotonic() + budget_ms / 1000, abs=0.5)
+
+
+def test_only_server_config_disables_deadline(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'CHAT_LATENCY_BUDGET_MS', 0.0)
+    with app_module.app.test_request_context():
+        assert app_module.get_chat_deadline(None) == (None, None)
+        assert app_module.get_chat_deadline(0) == (None, None)
+        assert app_module.get_chat_deadline(200)[1] == 200.0
+
+
+def test_expired_deadline_runs_only_first_stage(make_processor):
+    document_processor = make_processor([make_chunk('a.docx', '출장비 정산은 월말에 한다.')])
+    trace = {}
+
+    results = document_processor.search_similar_documents('출장비', deadline=time.monotonic() - 1, trace=trace,
+                                                          rerank=False)
+
+    assert results
+    assert trace['degraded']
+    assert set(trace['skipped']) == set(document_processor.SEARCH_STAGES[1:])
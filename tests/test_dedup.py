@@ -0,0 +1,53 @@
+# tests/test_dedup.py - 근접 중복 청크 병합과 삭제 시 출처 분리, 임베딩 차원 불일치 재생성
+from conftest import make_chunk, make_docx
+from document_processor import DocumentProcessor, SimpleEmbedding
+
+SHARED = ('출장비 지급 기준은 별도 규정을 따르며 국내 출장은 실비로 정산하고 '
+          '해외 출장은 일비와 숙박비를 정액으로 지급한다. 영수증은 귀국 후 일주일 안에 제출한다.')
+
+
+def test_near_duplicate_chunk_is_merged_into_existing_sources(tmp_path):
+    document_processor = DocumentProcessor(str(tmp_path), encoder=SimpleEmbedding(),
+                                           query_batch_window_ms=0, persist=False)
+    first = make_docx(tmp_path / 'a.docx', [SHARED])
+    second = make_docx(tmp_path / 'b.docx', [SHARED + ' 끝.'])
+
+    assert document_processor.process_document(first)
+    assert document_processor.process_document(second)
+
+    assert len(document_processor.documents) == 1
+    sources = document_processor.get_document_sources(document_processor.documents[0])
+    assert [source['filename'] for source in sources] == ['a.docx', 'b.docx']
+    assert document_processor.metadata['b.docx']['duplicate_chunks'] == 1
+    assert len(document_processor.snapshot.embeddings) == 1
+
+
+def test_removing_one_source_keeps_merged_chunk_for_the_other(tmp_path):
+    document_processor = DocumentProcessor(str(tmp_path), encoder=SimpleEmbedding(),
+                                           query_batch_window_ms=0, persist=False)
+    document_processor.process_document(make_docx(tmp_path / 'a.docx', [SHARED]))
+    document_processor.process_document(make_docx(tmp_path / 'b.docx', [SHARED + ' 끝.']))
+
+    document_processor.delete_file('a.docx')
+
+    assert len(document_processor.documents) == 1
+    doc = document_processor.documents[0]
+    assert doc['filename'] == 'b.docx'
+    assert [source['filename'] for source in document_processor.get_document_sources(doc)] == ['b.docx']
+
+    document_processor.delete_file('b.docx')
+
+    assert document_processor.documents == ()
+    assert document_processor.snapshot.embeddings is None
+
+
+def test_dimension_mismatch_reencodes_whole_index(make_processor):
+    document_processor = make_processor([make_chunk('a.docx', '출장비 지급 기준')])
+    assert document_processor._embeddings.shape == (1, 3)
+
+    # 새 SimpleEmbedding은 첫 인코딩 텍스트로 어휘를 만들어 저장된 인덱스와 차원이 다름
+    document_processor.encoder = SimpleEmbedding()
+    document_processor._add_documents([make_chunk('b.docx', '회의실 예약은 전날까지 한다 휴가 신청', chunk_id=0)])
+
+    assert document_processor._embeddings.shape == (2, 6)
+    assert document_processor.encoder.vocab_size == 6
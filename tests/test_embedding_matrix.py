@@ -0,0 +1,156 @@
+# tests/test_embedding_matrix.py - 임베딩 보관 형식(float32/float16/int8)과 저장/로드
+import pickle
+
+import numpy as np
+import pytest
+
+from conftest import make_chunk
+from document_processor import DocumentProcessor, EmbeddingMatrix, SimpleEmbedding
+
+
+def _unit_rows(rows, dimensions=64, seed=0):
+    embeddings = np.random.default_rng(seed).normal(size=(rows, dimensions))
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def _cosine(queries, embeddings):
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries @ (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).T
+
+
+@pytest.mark.parametrize('dtype, max_error', [('float32', 1e-5), ('float16', 1e-3), ('int8', 2e-2)])
+def test_similarities_match_float64_cosine(dtype, max_error):
+    embeddings = _unit_rows(300)
+    queries = np.random.default_rng(1).normal(size=(3, 64))
+
+    matrix = EmbeddingMatrix.quantize(embeddings, dtype)
+
+    assert matrix.dtype == dtype
+    assert np.abs(matrix.similarities(queries) - _cosine(queries, embeddings)).max() < max_error
+
+
+def test_compact_dtypes_shrink_storage():
+    embeddings = _unit_rows(1000, dimensions=384)
+    sizes = {dtype: EmbeddingMatrix.quantize(embeddings, dtype).nbytes for dtype in EmbeddingMatrix.DTYPES}
+
+    assert sizes['float16'] < sizes['float32'] * 0.51
+    assert sizes['int8'] < sizes['float32'] * 0.26
+
+
+def test_similarities_over_selected_rows_and_zero_rows():
+    embeddings = np.vstack([_unit_rows(4), np.zeros((1, 64))])
+    matrix = EmbeddingMatrix.quantize(embeddings, 'int8')
+    query = embeddings[2:3]
+
+    scores = matrix.similarities(query, np.array([2, 4]))
+
+    assert scores.shape == (1, 2)
+    assert scores[0, 0] == pytest.approx(1.0, abs=1e-2)
+    assert scores[0, 1] == 0.0
+    assert matrix.similarities(np.zeros((1, 64))).max() == 0.0
+
+
+def test_similarities_span_several_blocks(monkeypatch):
+    monkeypatch.setattr(EmbeddingMatrix, 'BLOCK_ROWS', 7)
+    embeddings = _unit_rows(50)
+    queries = embeddings[[3, 41]]
+
+    scores = EmbeddingMatrix.quantize(embeddings, 'float32').similarities(queries)
+
+    assert np.allclose(scores, _cosine(queries, embeddings), atol=1e-5)
+
+
+def test_int8_append_widens_scales_and_keeps_existing_rows():
+    embeddings = _unit_rows(20)
+    larger = _unit_rows(5, seed=3) * 3.0  # 기존 스케일 범위를 넘는 값
+
+    matrix = EmbeddingMatrix.quantize(embeddings, 'int8').append(larger)
+    expected = np.vstack([embeddings, larger])
+
+    assert len(matrix) == 25
+    assert np.all(matrix.scales >= np.abs(expected).max(axis=0) / EmbeddingMatrix.INT8_MAX - 1e-7)
+    assert np.abs(matrix.dequantize() - expected).max() < 0.05
+
+
+def test_row_selection_and_readonly_view():
+    matrix = EmbeddingMatrix.quantize(_unit_rows(6), 'int8')
+
+    selected = matrix[[0, 5]]
+    view = matrix.readonly()
+
+    assert len(selected) == 2 and selected.scales is matrix.scales
+    assert np.array_equal(selected.norms, matrix.norms[[0, 5]])
+    assert not view.codes.flags.writeable
+    assert matrix.codes.flags.writeable
+
+
+@pytest.mark.parametrize('dtype', EmbeddingMatrix.DTYPES)
+@pytest.mark.parametrize('bad_value', [np.nan, np.inf])
+def test_non_finite_values_are_rejected(dtype, bad_value):
+    embeddings = _unit_rows(4)
+    embeddings[1, 7] = bad_value
+
+    with pytest.raises(ValueError):
+        EmbeddingMatrix.quantize(embeddings, dtype)
+    with pytest.raises(ValueError):
+        EmbeddingMatrix.quantize(_unit_rows(4), dtype).append(embeddings)
+
+
+def test_unknown_dtype_is_rejected():
+    with pytest.raises(ValueError):
+        EmbeddingMatrix.quantize(_unit_rows(2), 'int4')
+
+
+class _NanEncoder(SimpleEmbedding):
+    def encode(self, texts):
+        vectors = super().encode(texts)
+        vectors[:, 0] = np.nan
+        return vectors
+
+
+def test_staging_validation_rejects_nan_encoder_in_int8(make_processor):
+    current = make_processor([make_chunk('a.docx', '출장비 정산 규정')], embedding_dtype='int8')
+    staging = make_processor([make_chunk('a.docx', '출장비 정산 규정')], embedding_dtype='int8',
+                             encoder=_NanEncoder())
+
+    valid, reason = current._validate_staging(staging)
+
+    assert not valid
+    assert '임베딩' in reason
+
+
+def _persisted_processor(folder, dtype):
+    return DocumentProcessor(str(folder), encoder=SimpleEmbedding(), persist=True, query_batch_window_ms=0,
+                             embedding_dtype=dtype)
+
+
+@pytest.mark.parametrize('dtype', EmbeddingMatrix.DTYPES)
+def test_save_and_load_round_trip(tmp_path, dtype):
+    document_processor = _persisted_processor(tmp_path, dtype)
+    document_processor._documents = [make_chunk('a.docx', '출장비 정산 규정', 0), make_chunk('a.docx', '회의실 예약', 1)]
+    document_processor.update_embeddings()
+    document_processor.save_data()
+    saved = document_processor.embeddings
+
+    with open(tmp_path / 'embeddings.pkl', 'rb') as f:
+        data = pickle.load(f)
+    assert data['embeddings'].dtype == np.dtype(dtype)
+    assert (data['embedding_scales'] is not None) == (dtype == 'int8')
+
+    loaded = _persisted_processor(tmp_path, dtype).embeddings
+    assert loaded.dtype == dtype
+    assert np.array_equal(loaded.codes, saved.codes)
+    assert np.allclose(loaded.norms, saved.norms)
+
+
+def test_legacy_float64_pickle_is_converted_on_load(tmp_path):
+    embeddings = _unit_rows(2)
+    with open(tmp_path / 'embeddings.pkl', 'wb') as f:
+        pickle.dump({'embeddings': embeddings,
+                     'documents': [make_chunk('a.docx', '첫 청크', 0), make_chunk('a.docx', '둘째 청크', 1)]}, f)
+
+    loaded = _persisted_processor(tmp_path, 'int8').embeddings
+
+    assert loaded.dtype == 'int8'
+    assert len(loaded) == 2
+    assert np.abs(loaded.dequantize() - embeddings).max() < 0.02
@@ -0,0 +1,60 @@
+# tests/test_file_hashing.py - 내용 해시로 변경 없는 파일 건너뛰기와 동일 내용 파일 연결
+import shutil
+
+import pytest
+
+from conftest import make_docx
+from document_processor import DocumentProcessor, SimpleEmbedding
+
+TEXT = ('출장비 지급 기준은 별도 규정을 따르며 국내 출장은 실비로 정산하고 '
+        '해외 출장은 일비와 숙박비를 정액으로 지급한다.')
+
+
+@pytest.fixture
+def document_processor(tmp_path):
+    return DocumentProcessor(str(tmp_path), encoder=SimpleEmbedding(), query_batch_window_ms=0, persist=False)
+
+
+def test_reprocess_skips_files_with_unchanged_hash(document_processor, tmp_path, monkeypatch):
+    make_docx(tmp_path / 'a.docx', [TEXT])
+    assert document_processor.reprocess_all_documents()
+    processed = []
+    monkeypatch.setattr(document_processor, 'process_document',
+                        lambda file_path, **kwargs: processed.append(file_path) or True)
+
+    assert document_processor.reprocess_all_documents()
+    assert processed == []
+
+    make_docx(tmp_path / 'a.docx', [TEXT + ' 영수증은 일주일 안에 제출한다.'])
+    assert document_processor.reprocess_all_documents()
+    assert processed == [str(tmp_path / 'a.docx')]
+
+
+def test_processing_params_change_forces_reprocess(document_processor, tmp_path):
+    path = make_docx(tmp_path / 'a.docx', [TEXT])
+    document_processor.process_document(path)
+    assert document_processor.is_up_to_date('a.docx', path)
+
+    document_processor.processing_params = dict(document_processor.processing_params, chunk_size=300)
+
+    assert not document_processor.is_up_to_date('a.docx', path)
+
+
+def test_identical_content_is_linked_without_encoding(document_processor, tmp_path, monkeypatch):
+    first = make_docx(tmp_path / 'a.docx', [TEXT])
+    document_processor.process_document(first)
+    second = str(tmp_path / 'b.docx')
+    shutil.copyfile(first, second)
+    file_hash = document_processor.compute_file_hash(second)
+    monkeypatch.setattr(document_processor, 'get_document_text',
+                        lambda *args: pytest.fail('linked files must not be re-extracted'))
+
+    assert document_processor.find_processed_by_hash(file_hash, exclude='b.docx') == 'a.docx'
+    assert document_processor.process_document(second, file_hash=file_hash)
+
+    info = document_processor.metadata['b.docx']
+    assert info['linked_from'] == 'a.docx'
+    assert info['file_hash'] == document_processor.metadata['a.docx']['file_hash']
+    assert len(document_processor.documents) == 1
+    sources = document_processor.get_document_sources(document_processor.documents[0])
+    assert [source['filename'] for source in sources] == ['a.docx', 'b.docx']
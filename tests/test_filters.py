@@ -0,0 +1,122 @@
+# tests/test_filters.py - 메타데이터 필터 검증과 필터 적용 검색/키워드 대체 답변
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from conftest import make_chunk
+from document_processor import DocumentProcessor, QuestionAnalyzer, TermIndex
+
+
+def test_term_index_prefix_lookup_and_filter_positions():
+    index = TermIndex([{'content': '출장비 규정'}, {'content': '회의록'}, {'content': '출장비는 실비 정산'}])
+
+    assert index.first_position('출장비') == 0
+    assert index.first_position('회의') == 1
+    assert index.first_position('출장비', np.array([1, 2])) == 2
+    assert index.first_position('출장비', np.array([1])) is None
+    assert index.first_position('없는용어') is None
+
+
+def test_filtered_fallback_finds_term_outside_first_chunk(make_processor):
+    document_processor = make_processor([
+        make_chunk('a.docx', '출장비 지급 기준은 별도 규정을 따른다.'),
+        make_chunk('b.docx', '국내 출장비는 실비로 정산한다.'),
+    ])
+    analyzer = QuestionAnalyzer(document_processor)
+    filters = document_processor.normalize_filters({'filename': 'b.docx'})
+
+    response = analyzer.generate_no_result_response_enhanced('출장비 xyz', filters)
+
+    assert '키워드 기반 검색 결과' in response
+    assert '국내 출장비는 실비로 정산한다' in response
+    assert '필터에 해당하는 청크: 1개' in response
+
+
+def test_filtered_fallback_drops_terms_only_outside_filter(make_processor):
+    document_processor = make_processor([
+        make_chunk('a.docx', '출장비 지급 기준은 별도 규정을 따른다.'),
+        make_chunk('b.docx', '회의실 예약은 전날까지 한다.'),
+    ])
+    analyzer = QuestionAnalyzer(document_processor)
+    filters = document_processor.normalize_filters({'filename': 'b.docx'})
+
+    assert '키워드 기반 검색 결과' not in analyzer.generate_no_result_response_enhanced('출장비 xyz', filters)
+    assert '키워드 기반 검색 결과' in analyzer.generate_no_result_response_enhanced('출장비 xyz')
+
+
+def test_normalize_filters_values():
+    filters = DocumentProcessor.normalize_filters({
+        'filename': 'b.docx', 'file_type': ['PDF', 'Word', 'pdf'], 'date_from': '2024-01-01', 'date_to': '2024-01-31'
+    })
+
+    assert filters['filename'] == ('b.docx',)
+    assert filters['file_type'] == ('pdf', 'word')
+    assert filters['date_from'] == datetime(2024, 1, 1)
+    assert filters['date_before'] == datetime(2024, 2, 1)  # 날짜만 주면 그날 끝까지 포함
+    assert DocumentProcessor.normalize_filters({}) is None
+    assert DocumentProcessor.normalize_filters({'filename': []}) is None
+
+
+@pytest.mark.parametrize('filters', [
+    'b.docx',
+    {'folder': 'a'},
+    {'filename': ['a.docx', 3]},
+    {'date_from': '2024-13-01'},
+    {'date_from': '2024-02-01', 'date_to': '2024-01-31'},
+])
+def test_normalize_filters_rejects_invalid(filters):
+    with pytest.raises(ValueError):
+        DocumentProcessor.normalize_filters(filters)
+
+
+def test_normalize_filters_same_day_range_is_valid():
+    filters = DocumentProcessor.normalize_filters({'date_from': '2024-01-31', 'date_to': '2024-01-31'})
+    assert filters['date_before'] - filters['date_from'] == timedelta(days=1)
+
+
+def test_timezone_aware_dates_become_naive_local_time(make_processor):
+    aware = datetime(2024, 6, 1, 12, 0, tzinfo=timezone(timedelta(hours=9)))
+    filters = DocumentProcessor.normalize_filters({'date_from': aware.isoformat()})
+
+    assert filters['date_from'].tzinfo is None
+    assert filters['date_from'] == aware.astimezone().replace(tzinfo=None)
+
+    # 처리 날짜(naive)와 비교해도 TypeError 없이 동작
+    document_processor = make_processor([
+        make_chunk('old.docx', '이전 문서', processed_date='2020-01-01T09:00:00'),
+        make_chunk('new.docx', '새 문서', processed_date='2030-01-01T09:00:00'),
+    ])
+    positions = document_processor.snapshot.filter_positions(
+        DocumentProcessor.normalize_filters({'date_from': '2025-01-01T00:00+09:00'}))
+    assert positions.tolist() == [1]
+
+
+def test_filter_index_resolve_intersects_conditions(make_processor):
+    document_processor = make_processor([
+        make_chunk('a.docx', '첫 청크', chunk_id=0),
+        make_chunk('a.docx', '둘째 청크', chunk_id=1),
+        make_chunk('c.pdf', 'PDF 청크', file_type='PDF', processed_date='2023-01-01T00:00:00'),
+    ])
+    snapshot = document_processor.snapshot
+    resolve = lambda filters: snapshot.filter_positions(DocumentProcessor.normalize_filters(filters))
+
+    assert resolve({}) is None
+    assert resolve({'filename': 'a.docx'}).tolist() == [0, 1]
+    assert resolve({'file_type': 'pdf'}).tolist() == [2]
+    assert resolve({'filename': ['a.docx', 'c.pdf'], 'date_to': '2023-12-31'}).tolist() == [2]
+    assert resolve({'filename': 'a.docx', 'file_type': 'PDF'}).tolist() == []
+    assert resolve({'filename': 'missing.docx'}).tolist() == []
+
+
+def test_filtered_vector_search_only_scores_filtered_rows(make_processor):
+    document_processor = make_processor([
+        make_chunk('a.docx', '출장비 정산 규정'),
+        make_chunk('b.docx', '출장비 정산 절차'),
+    ])
+    filters = DocumentProcessor.normalize_filters({'filename': 'b.docx'})
+
+    results = document_processor.search_similar_documents('출장비 정산', top_k=5, filters=filters, rerank=False)
+
+    assert results
+    assert {result['document']['filename'] for result in results} == {'b.docx'}
@@ -0,0 +1,74 @@
+# tests/test_http_caching.py - 상태/파일 목록/디버그 API의 ETag 재검증과 gzip 압축
+import gzip
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize('path', ['/api/status', '/api/debug', '/api/files'])
+def test_unchanged_state_returns_304(client, path):
+    first = client.get(path)
+    etag = first.headers['ETag']
+
+    second = client.get(path, headers={'If-None-Match': etag})
+
+    assert first.status_code == 200 and etag.startswith('W/')
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+
+
+@pytest.mark.parametrize('path', ['/api/status', '/api/debug'])
+def test_chat_traffic_does_not_change_etag(client, path):
+    etag = client.get(path).headers['ETag']
+
+    client.post('/api/chat', json={'message': '출장비 정산 규정'})
+    client.post('/api/chat', json={'message': '회의실 예약'})
+
+    assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_status_and_debug_omit_live_load(client):
+    assert 'chat_load' not in client.get('/api/status').get_json()
+    debug = client.get('/api/debug').get_json()
+    assert not {'chat_load', 'query_encoder', 'search_stage_costs_ms'} & set(debug)
+
+
+def test_load_endpoint_is_not_cached(client):
+    response = client.get('/api/load')
+    data = response.get_json()
+
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert 'ETag' not in response.headers
+    assert {'chat_load', 'query_encoder', 'search_stage_costs_ms'} <= set(data)
+    assert data['chat_load']['admission']['inflight'] == 0
+
+
+def test_login_changes_status_etag(client, app_module):
+    etag = client.get('/api/status').headers['ETag']
+
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+
+    assert client.get('/api/status', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_gzip_only_when_accepted(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'GZIP_MIN_SIZE', 10)
+
+    plain = client.get('/api/debug')
+    compressed = client.get('/api/debug', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    # 본문의 폴더 목록 조회 횟수는 요청마다 바뀌므로 키만 비교
+    assert json.loads(gzip.decompress(compressed.data)).keys() == plain.get_json().keys()
+
+
+def test_small_responses_are_not_compressed(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'GZIP_MIN_SIZE', 1024 * 1024)
+
+    response = client.get('/api/debug', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
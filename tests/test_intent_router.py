@@ -0,0 +1,79 @@
+# tests/test_intent_router.py - Aho-Corasick 오토마톤과 의도 판별의 단어 경계 규칙
+import json
+
+import pytest
+
+from intent_router import DEFAULT_INTENTS, AhoCorasick, IntentRouter, load_intents
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick([('he', 'he'), ('she', 'she'), ('his', 'his'), ('hers', 'hers'), ('', 'empty')])
+
+    found = sorted(automaton.find_all('ushers'))
+
+    assert found == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+
+def test_aho_corasick_follows_failure_links():
+    automaton = AhoCorasick([('abcd', 1), ('bc', 2), ('c', 3)])
+
+    assert sorted(automaton.find_all('xabcx')) == [(2, 4, 2), (3, 4, 3)]
+
+
+@pytest.mark.parametrize('question, intent', [
+    ('안녕하세요', 'greeting'),
+    ('Hello!', 'greeting'),
+    ('  감사합니다  ', 'thanks'),
+    ('정말 고마워요', 'thanks'),
+    ('Thanks a lot', 'thanks'),
+    ('도움이 됐어요 감사합니다', 'thanks'),
+])
+def test_default_intents_match(question, intent):
+    assert IntentRouter().match(question)['name'] == intent
+
+
+@pytest.mark.parametrize('question', [
+    '감사 보고서 제출 기한은?',  # 단어 일부('감사')는 접두어 패턴('감사합*')과 다름
+    'hiking 동호회 규정',  # 전체 단어 패턴('hi')은 단어 일부와 일치하지 않음
+    'this is a test',
+    '안녕하세요 출장비 정산 규정과 지급 기준 알려주세요',  # 다른 단어가 max_other_words보다 많음
+    '',
+])
+def test_questions_are_not_routed(question):
+    assert IntentRouter().match(question) is None
+
+
+def test_longest_coverage_wins_and_ties_prefer_earlier_intent():
+    router = IntentRouter([
+        {'name': 'short', 'patterns': ['연차'], 'answer': 'a'},
+        {'name': 'long', 'patterns': ['연차 휴가*'], 'answer': 'b'},
+        {'name': 'same', 'patterns': ['연차'], 'answer': 'c'},
+    ])
+
+    assert router.match('연차 휴가는?')['name'] == 'long'
+    assert router.match('연차')['name'] == 'short'
+
+
+def test_load_intents_merges_by_name(tmp_path):
+    path = tmp_path / 'intents.json'
+    path.write_text(json.dumps([
+        {'name': 'thanks', 'patterns': ['수고*'], 'response': 'thanks'},
+        {'name': 'wifi', 'patterns': ['와이파이*'], 'answer': '사내 와이파이는 CORP입니다.'},
+    ], ensure_ascii=False), encoding='utf-8')
+
+    intents = load_intents(str(path))
+    router = IntentRouter(intents)
+
+    assert [intent['name'] for intent in intents] == ['greeting', 'thanks', 'wifi']
+    assert router.match('수고하셨습니다')['name'] == 'thanks'
+    assert router.match('감사합니다') is None
+    assert router.match('와이파이 비밀번호')['answer'] == '사내 와이파이는 CORP입니다.'
+    assert load_intents() == DEFAULT_INTENTS
+
+
+def test_load_intents_requires_name_and_patterns(tmp_path):
+    path = tmp_path / 'intents.json'
+    path.write_text(json.dumps([{'name': 'broken'}]), encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        load_intents(str(path))
@@ -0,0 +1,35 @@
+# tests/test_profiling.py - 프로파일 파일 다운로드
+import os
+
+import pytest
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+    return client
+
+
+def test_missing_profile_returns_404(admin_client):
+    response = admin_client.get('/admin/profiles/missing.prof')
+
+    assert response.status_code == 404
+    assert response.get_json()['success'] is False
+
+
+def test_existing_profile_is_downloaded(admin_client, app_module):
+    output_dir = app_module.request_profiler.output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'test-chat.prof'), 'wb') as f:
+        f.write(b'pstats')
+
+    response = admin_client.get('/admin/profiles/test-chat.prof')
+
+    assert response.status_code == 200
+    assert 'attachment' in response.headers['Content-Disposition']
+    assert response.data == b'pstats'
+
+
+def test_profiles_require_login(client):
+    assert client.get('/admin/profiles/missing.prof').status_code == 302
@@ -0,0 +1,89 @@
+# tests/test_query_encoder.py - 동시 질문 임베딩 마이크로 배치, 결과 분배와 오류 전달
+import threading
+import time
+
+import numpy as np
+
+from document_processor import QueryEncoderService
+
+
+class RecordingEncoder:
+    """텍스트 길이를 벡터로 돌려주고 호출별 배치 크기를 기록 (gate가 열릴 때까지 첫 호출 대기)"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+        self.error = error
+
+    def encode(self, texts):
+        self.calls.append(len(texts))
+        self.entered.set()
+        self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return np.array([[len(text), 1.0] for text in texts])
+
+
+def encode_concurrently(service, encoder, texts):
+    """첫 요청이 인코딩 중인 동안 나머지 요청을 대기열에 쌓은 뒤 풀어 줌"""
+    results = {}
+    errors = {}
+
+    def run(text):
+        try:
+            results[text] = service.encode(text)
+        except Exception as e:
+            errors[text] = e
+
+    first = threading.Thread(target=run, args=(texts[0],))
+    first.start()
+    assert encoder.entered.wait(5)
+    others = [threading.Thread(target=run, args=(text,)) for text in texts[1:]]
+    for thread in others:
+        thread.start()
+    while service._inflight < len(texts):
+        time.sleep(0.001)
+    encoder.gate.set()
+    for thread in [first] + others:
+        thread.join(5)
+    return results, errors
+
+
+def test_concurrent_requests_share_one_encode_call():
+    encoder = RecordingEncoder()
+    service = QueryEncoderService(encoder, max_batch_size=32, window_ms=200)
+    texts = ['a', 'bb', 'ccc', 'dddd', 'eeeee']
+
+    results, errors = encode_concurrently(service, encoder, texts)
+
+    assert errors == {}
+    assert encoder.calls == [1, 4]
+    for text in texts:
+        np.testing.assert_array_equal(results[text], [[len(text), 1.0]])
+    stats = service.get_stats()
+    assert stats['batches'] == 2 and stats['requests'] == 5 and stats['max_batch_texts'] == 4
+
+
+def test_batch_error_is_raised_in_every_waiting_request():
+    encoder = RecordingEncoder(error=RuntimeError('encoder down'))
+    service = QueryEncoderService(encoder, window_ms=200)
+
+    results, errors = encode_concurrently(service, encoder, ['a', 'bb', 'ccc'])
+
+    assert results == {}
+    assert sorted(errors) == ['a', 'bb', 'ccc']
+    assert all(str(error) == 'encoder down' for error in errors.values())
+
+
+def test_window_zero_and_large_requests_encode_directly():
+    encoder = RecordingEncoder()
+    encoder.gate.set()
+    services = [QueryEncoderService(encoder, window_ms=0),
+                QueryEncoderService(encoder, max_batch_size=2, window_ms=200)]
+
+    services[0].encode('a')
+    services[1].encode(['a', 'b'])
+
+    assert encoder.calls == [1, 2]
+    assert all(service._worker is None for service in services)
@@ -0,0 +1,92 @@
+# tests/test_rebuild.py - 스테이징 재구축 검증, 검증 실패 시 기존 인덱스 유지, 롤백
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from conftest import make_chunk, make_docx
+from document_processor import DocumentProcessor, SimpleEmbedding
+
+TOPICS = {
+    'travel': '출장비 지급 기준은 별도 규정을 따르며 국내 출장은 실비로 정산하고 해외 출장은 일비를 지급한다.',
+    'leave': '연차 휴가는 입사일 기준으로 부여하며 미사용 연차는 다음 해로 이월하지 않고 수당으로 정산한다.',
+    'room': '회의실 예약은 사내 시스템에서 전날까지 신청하고 사용 후에는 책상과 의자를 원위치에 둔다.',
+}
+
+
+@pytest.fixture
+def document_processor(tmp_path):
+    for name, text in TOPICS.items():
+        make_docx(tmp_path / f'{name}.docx', [text])
+    document_processor = DocumentProcessor(str(tmp_path), encoder=SimpleEmbedding(),
+                                           query_batch_window_ms=0, persist=False)
+    document_processor.reprocess_all_documents()
+    return document_processor
+
+
+def filenames(documents):
+    return sorted(doc['filename'] for doc in documents)
+
+
+def test_rebuild_swaps_in_staging_index_and_rollback_restores(document_processor, tmp_path):
+    make_docx(tmp_path / 'extra.docx', ['보안 교육은 매년 상반기에 실시하며 미이수자는 다음 달부터 사내 시스템 접근 권한이 제한되고 재교육을 받아야 한다.'])
+    before = document_processor.snapshot
+
+    document_processor.rebuild_index()
+
+    assert filenames(document_processor.documents) == ['extra.docx', 'leave.docx', 'room.docx', 'travel.docx']
+    assert len(document_processor.snapshot.embeddings) == 4
+    assert filenames(before.documents) == ['leave.docx', 'room.docx', 'travel.docx']
+
+    assert document_processor.rollback_index()
+    assert filenames(document_processor.documents) == ['leave.docx', 'room.docx', 'travel.docx']
+    assert 'extra.docx' not in document_processor.metadata
+
+    assert document_processor.rollback_index()  # 다시 호출하면 재구축 결과로 복귀
+    assert len(document_processor.documents) == 4
+
+
+def test_rebuild_rejects_chunk_collapse_and_keeps_current_index(document_processor, tmp_path):
+    os.remove(tmp_path / 'leave.docx')
+    os.remove(tmp_path / 'room.docx')
+    version = document_processor.index_version
+
+    with pytest.raises(ValueError, match='청크 수 급감'):
+        document_processor.rebuild_index(force=True)
+
+    assert document_processor.index_version == version
+    assert filenames(document_processor.documents) == ['leave.docx', 'room.docx', 'travel.docx']
+    assert not document_processor.rollback_index()
+
+
+def test_validation_rejects_misaligned_or_non_finite_embeddings(make_processor):
+    current = make_processor([make_chunk('a.docx', '출장비 지급 기준')])
+    staging = make_processor([make_chunk('a.docx', '출장비 지급 기준'), make_chunk('b.docx', '휴가 신청')])
+
+    assert current._validate_staging(staging) == (True, None)
+
+    staging._embeddings = staging._embeddings[[0]]
+    valid, reason = current._validate_staging(staging)
+    assert not valid and '맞지 않습니다' in reason
+
+    staging._embeddings = staging._embeddings.append(np.zeros((1, staging._embeddings.shape[1])))
+    staging._embeddings.codes[0, 0] = np.nan
+    valid, reason = current._validate_staging(staging)
+    assert not valid and 'NaN' in reason
+
+
+def test_background_rebuild_reports_status(document_processor):
+    done = threading.Event()
+
+    def runner(target):
+        target()
+        done.set()
+
+    assert document_processor.start_rebuild(runner=runner)
+    assert done.wait(10)
+
+    status = document_processor.rebuild_status
+    assert status['state'] == 'succeeded'
+    assert status['chunks_before'] == status['chunks_after'] == 3
+    assert status['rollback_available']
@@ -0,0 +1,137 @@
+# tests/test_reranker.py - 재순위 시간 예산, 순서 규칙, 특징 점수
+import time
+
+import pytest
+
+from conftest import make_chunk
+from document_processor import QuestionAnalyzer
+from reranker import FeatureReranker, Reranker, create_reranker
+
+
+class _ScriptedReranker(Reranker):
+    """주어진 점수를 돌려주고, 배치마다 시계를 step만큼 진행"""
+
+    name = 'scripted'
+    batch_size = 2
+
+    def __init__(self, scores, clock=None, step=0.0):
+        self.scores = scores
+        self.clock = clock
+        self.step = step
+        self.batches = 0
+
+    def score_batch(self, query, keywords, candidates):
+        self.batches += 1
+        if self.clock is not None:
+            self.clock[0] += self.step
+        return [self.scores[result['content']] for result in candidates]
+
+
+def _candidates(*contents):
+    return [{'content': content, 'similarity': 1.0 - n / 10, 'document': make_chunk('a.docx', content)}
+            for n, content in enumerate(contents)]
+
+
+def test_reranker_base_requires_score_batch():
+    with pytest.raises(TypeError):
+        Reranker()
+
+
+def test_rerank_orders_by_score_and_keeps_first_stage_similarity():
+    candidates = _candidates('a', 'b', 'c')
+    reranker = _ScriptedReranker({'a': 0.1, 'b': 0.9, 'c': 0.5})
+
+    reranked, info = reranker.rerank('q', [], candidates)
+
+    assert [result['content'] for result in reranked] == ['b', 'c', 'a']
+    assert [result['similarity'] for result in reranked] == [0.9, 0.8, 1.0]
+    assert reranked[0]['rerank_score'] == 0.9
+    assert info == {'reranker': 'scripted', 'candidates': 3, 'scored': 3, 'timed_out': False}
+    assert 'rerank_score' not in candidates[0]  # 입력 결과는 바꾸지 않음
+
+
+def test_rerank_stops_at_deadline_and_appends_unscored_in_first_stage_order(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+    candidates = _candidates('a', 'b', 'c', 'd', 'e')
+    reranker = _ScriptedReranker({'a': 0.1, 'b': 0.2, 'c': 0.9, 'd': 0.8, 'e': 0.7}, clock, step=1.0)
+
+    reranked, info = reranker.rerank('q', [], candidates, deadline=100.5)
+
+    assert reranker.batches == 1
+    assert [result['content'] for result in reranked] == ['b', 'a', 'c', 'd', 'e']
+    assert 'rerank_score' not in reranked[2]
+    assert info['scored'] == 2 and info['timed_out']
+
+
+def test_rerank_with_expired_deadline_returns_first_stage_order():
+    candidates = _candidates('a', 'b')
+
+    reranked, info = _ScriptedReranker({'a': 0.0, 'b': 1.0}).rerank('q', [], candidates, deadline=0.0)
+
+    assert [result['content'] for result in reranked] == ['a', 'b']
+    assert info['scored'] == 0 and info['timed_out']
+
+
+def test_feature_reranker_prefers_keywords_in_one_sentence():
+    scattered = '출장비 항목이 있다. 다른 내용. 정산은 나중에 한다.'
+    together = '다른 내용. 출장비 정산은 월말에 한다.'
+    candidates = [dict(result, similarity=0.5, method='keyword') for result in _candidates(scattered, together)]
+
+    reranked, _ = FeatureReranker().rerank('출장비 정산', ['출장비', '정산'], candidates)
+
+    assert reranked[0]['content'] == together
+
+
+def test_feature_reranker_rewards_method_agreement():
+    single, agreed = _candidates('출장비 규정', '출장비 규정 ')
+    single = dict(single, similarity=0.5, method='keyword')
+    agreed = dict(agreed, similarity=0.5, method='keyword', methods=['keyword', 'vector'])
+
+    reranked, _ = FeatureReranker().rerank('출장비', ['출장비'], [single, agreed])
+
+    assert reranked[0] is not single and reranked[0]['methods'] == ['keyword', 'vector']
+
+
+@pytest.mark.parametrize('mode', ['off', 'none', None, 'OFF'])
+def test_create_reranker_off(mode):
+    assert create_reranker(mode) is None
+
+
+def test_create_reranker_falls_back_to_features():
+    assert isinstance(create_reranker('features'), FeatureReranker)
+    assert isinstance(create_reranker('unknown'), FeatureReranker)
+
+
+@pytest.mark.parametrize('model_name', [None, '', 'cross-encoder/ms-marco-MiniLM-L-6-v2'])
+def test_cross_encoder_needs_local_model_folder(model_name):
+    # 허브 이름이나 빈 경로로는 모델을 불러오지 않고(내려받기 없음) 특징 기반으로 대체
+    assert isinstance(create_reranker('cross-encoder', model_name), FeatureReranker)
+
+
+def test_search_reranks_order_but_keeps_first_stage_similarity(make_processor):
+    document_processor = make_processor([
+        make_chunk('a.docx', '출장비 항목. 다른 내용. 정산 절차는 별도.', 0),
+        make_chunk('a.docx', '출장비 정산은 월말에 한다.', 1),
+    ], reranker=FeatureReranker())
+
+    first_stage = document_processor.search_similar_documents('출장비 정산', rerank=False)
+    reranked = document_processor.search_similar_documents('출장비 정산')
+
+    by_content = {result['content']: result['similarity'] for result in first_stage}
+    assert all(result['similarity'] == by_content[result['content']] for result in reranked)
+    assert all('rerank_score' in result for result in reranked)
+    assert all('rerank_score' not in result for result in first_stage)
+
+
+def test_stream_summary_exposes_rerank_score(make_processor):
+    analyzer = QuestionAnalyzer(make_processor([make_chunk('a.docx', '출장비 정산은 월말에 한다.')]))
+    result = {'document': make_chunk('a.docx', '출장비 정산은 월말에 한다.'), 'similarity': 0.41234,
+              'rerank_score': 0.77}
+
+    summary = analyzer._summarize_result(result)
+
+    assert summary['similarity'] == 0.4123
+    assert summary['rerank_score'] == 0.77
+    del result['rerank_score']
+    assert 'rerank_score' not in analyzer._summarize_result(result)
@@ -0,0 +1,94 @@
+# tests/test_snapshot.py - 불변 스냅샷 교체, 게시된 항목 비수정, 대량 수집 시 한 번만 게시
+import os
+import threading
+
+from conftest import make_chunk, make_docx
+from document_processor import DocumentProcessor, SimpleEmbedding
+
+TEXT = ('출장비 지급 기준은 별도 규정을 따르며 국내 출장은 실비로 정산하고 '
+        '해외 출장은 일비와 숙박비를 정액으로 지급한다.')
+
+
+def new_processor(folder):
+    return DocumentProcessor(str(folder), encoder=SimpleEmbedding(), query_batch_window_ms=0, persist=False)
+
+
+def test_writes_publish_new_snapshot_and_leave_old_one_intact(make_processor):
+    document_processor = make_processor([make_chunk('a.docx', '출장비 지급 기준')])
+    before = document_processor.snapshot
+
+    document_processor.delete_file('a.docx')
+
+    assert document_processor.snapshot is not before
+    assert document_processor.index_version == before.version + 1
+    assert [doc['filename'] for doc in before.documents] == ['a.docx']
+    assert len(before.embeddings) == 1
+    assert document_processor.documents == ()
+
+
+def test_minhash_signatures_are_not_written_into_published_chunks(make_processor):
+    document_processor = make_processor([make_chunk('a.docx', TEXT)])
+    published = document_processor.snapshot.documents[0]
+
+    document_processor._get_minhash_index()
+
+    assert 'minhash' not in published
+    assert 'minhash' in document_processor._documents[0]
+
+
+def test_mtime_refresh_replaces_metadata_entry_instead_of_mutating_it(tmp_path):
+    document_processor = new_processor(tmp_path)
+    path = make_docx(tmp_path / 'a.docx', [TEXT])
+    document_processor.process_document(path)
+    published = document_processor.snapshot.metadata['a.docx']
+    old_mtime = published['file_mtime']
+
+    os.utime(path, (old_mtime + 10, old_mtime + 10))  # 내용은 그대로, 수정 시각만 바뀜
+
+    assert document_processor.is_up_to_date('a.docx', path)
+    assert published['file_mtime'] == old_mtime
+    assert document_processor.metadata['a.docx']['file_mtime'] == old_mtime + 10
+
+
+def test_bulk_update_publishes_once(tmp_path):
+    document_processor = new_processor(tmp_path)
+    paths = [make_docx(tmp_path / f'{name}.docx', [f'{name} 문서. ' + TEXT.replace('출장', name)])
+             for name in ('회계', '인사', '총무')]
+    version = document_processor.index_version
+
+    with document_processor.bulk_update():
+        for path in paths:
+            assert document_processor.process_document(path, save=False)
+        assert document_processor.index_version == version  # 블록 안에서는 이전 스냅샷 유지
+
+    assert document_processor.index_version == version + 1
+    assert len(document_processor.snapshot.metadata) == 3
+
+
+def test_concurrent_reads_always_see_consistent_snapshot(make_processor):
+    document_processor = make_processor([make_chunk('a.docx', '출장비 지급 기준')])
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            snapshot = document_processor.snapshot
+            if snapshot.embeddings is not None and len(snapshot.embeddings) != len(snapshot.documents):
+                errors.append((len(snapshot.embeddings), len(snapshot.documents)))
+            if snapshot.stats.total_chunks != len(snapshot.documents):
+                errors.append((snapshot.stats.total_chunks, len(snapshot.documents)))
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for i in range(30):
+            with document_processor.bulk_update():
+                document_processor._add_documents([make_chunk(f'f{i}.docx', f'출장비 규정 {i}')])
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    assert errors == []
+    assert len(document_processor.documents) == 31
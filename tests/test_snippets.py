@@ -0,0 +1,92 @@
+# tests/test_snippets.py - 문장 위치 계산과 질문 중심 발췌
+import re
+
+import pytest
+
+from conftest import make_chunk
+from document_processor import DocumentProcessor, QuestionAnalyzer
+
+
+@pytest.mark.parametrize('text, sentences', [
+    ('첫 문장입니다. 둘째 문장!  셋째?', ['첫 문장입니다.', '둘째 문장!', '셋째?']),
+    ('버전 1.5 기준\n다음 줄', ['버전 1.5 기준', '다음 줄']),  # 공백 없는 마침표는 문장 끝이 아님
+    ('  \n  ', []),
+    ('끝 문장 부호 없음', ['끝 문장 부호 없음']),
+])
+def test_sentence_offsets(text, sentences):
+    offsets = DocumentProcessor.sentence_offsets(text)
+    assert [text[start:end] for start, end in offsets] == sentences
+
+
+@pytest.fixture
+def analyzer(make_processor):
+    return QuestionAnalyzer(make_processor([make_chunk('a.docx', '색인용 청크')]))
+
+
+REGULATION = ('회사는 임직원 복지를 위해 여러 제도를 운영한다. 출장비 정산 규정은 다음과 같다. '
+              '숙박비는 1박 10만원 한도에서 실비로 지급한다. 교통비는 영수증을 첨부해 청구한다. '
+              '기타 사항은 인사팀에 문의한다.')
+
+
+def test_main_snippet_fills_neighbouring_sentences(analyzer):
+    document = make_chunk('a.docx', REGULATION)
+
+    snippet = analyzer.build_snippet(document, analyzer._keyword_pattern('출장비 정산 규정'))
+
+    assert snippet.startswith('...**출장비** **정산** **규정**은 다음과 같다.')
+    assert '숙박비는 1박 10만원 한도에서 실비로 지급한다.' in snippet
+    assert '교통비는 영수증을 첨부해 청구한다.' in snippet
+    assert '기타 사항' not in snippet  # 최대 3문장
+    assert snippet.endswith('...')
+
+
+def test_snippet_prefers_preceding_sentence_at_chunk_end(analyzer):
+    document = make_chunk('a.docx', '첫째 문장. 둘째 문장. 마지막 문장에 연차 규정.')
+
+    snippet = analyzer.build_snippet(document, re.compile('연차'), max_chars=400, max_sentences=2)
+
+    assert snippet == '...둘째 문장. 마지막 문장에 **연차** 규정.'
+
+
+def test_snippet_respects_max_chars(analyzer):
+    document = make_chunk('a.docx', REGULATION)
+
+    snippet = analyzer.build_snippet(document, re.compile('출장비'), max_chars=60, max_sentences=3)
+
+    assert len(snippet.replace('**', '').strip('.')) <= 60
+    assert '**출장비**' in snippet
+
+
+def test_related_snippet_keeps_single_best_sentence(analyzer):
+    document = make_chunk('a.docx', REGULATION)
+
+    snippet = analyzer.build_snippet(document, re.compile('교통비|영수증'), analyzer.RELATED_SNIPPET_MAX_CHARS,
+                                     analyzer.RELATED_SNIPPET_MAX_SENTENCES)
+
+    assert snippet == '...**교통비**는 **영수증**을 첨부해 청구한다....'
+
+
+def test_long_sentence_is_trimmed_around_first_keyword(analyzer):
+    content = '가' * 500 + ' 출장비 ' + '나' * 500
+    document = make_chunk('a.docx', content)
+
+    snippet = analyzer.build_snippet(document, re.compile('출장비'), max_chars=120, max_sentences=3)
+
+    assert '**출장비**' in snippet
+    assert snippet.startswith('...') and snippet.endswith('...')
+    assert len(snippet.replace('**', '')) <= 120 + 6
+
+
+def test_snippet_without_keywords_uses_chunk_start(analyzer):
+    document = make_chunk('a.docx', REGULATION)
+
+    snippet = analyzer.build_snippet(document, None)
+
+    assert snippet.startswith('회사는 임직원 복지를')
+
+
+def test_keyword_pattern_skips_english_stopwords(analyzer):
+    pattern = analyzer._keyword_pattern('what is the travel policy')
+
+    assert pattern.search('THE') is None
+    assert pattern.search('Travel') is not None
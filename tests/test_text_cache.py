@@ -0,0 +1,75 @@
+# tests/test_text_cache.py - 추출 텍스트 캐시 적중과 추출기 버전 변경 시 무효화
+import os
+
+import pytest
+
+from conftest import make_docx
+from document_processor import DocumentProcessor, SimpleEmbedding
+
+TEXT = ('출장비 지급 기준은 별도 규정을 따르며 국내 출장은 실비로 정산하고 '
+        '해외 출장은 일비와 숙박비를 정액으로 지급한다.')
+
+
+@pytest.fixture
+def document_processor(tmp_path):
+    return DocumentProcessor(str(tmp_path), encoder=SimpleEmbedding(), query_batch_window_ms=0, persist=False)
+
+
+def count_extractions(document_processor, monkeypatch):
+    calls = []
+    extract = document_processor.extract_pages_from_document
+
+    def counting(file_path):
+        calls.append(file_path)
+        return extract(file_path)
+    monkeypatch.setattr(document_processor, 'extract_pages_from_document', counting)
+    return calls
+
+
+def test_reprocessing_same_content_uses_cached_text(document_processor, tmp_path, monkeypatch):
+    path = make_docx(tmp_path / 'a.docx', [TEXT])
+    file_hash = document_processor.compute_file_hash(path)
+    calls = count_extractions(document_processor, monkeypatch)
+
+    assert document_processor.get_document_text(path, file_hash) == document_processor.get_document_text(path, file_hash)
+
+    assert calls == [path]
+    assert os.path.exists(document_processor._text_cache_path(file_hash))
+
+
+def test_extractor_version_change_invalidates_cache(document_processor, tmp_path, monkeypatch):
+    path = make_docx(tmp_path / 'a.docx', [TEXT])
+    file_hash = document_processor.compute_file_hash(path)
+    document_processor.get_document_text(path, file_hash)
+    calls = count_extractions(document_processor, monkeypatch)
+
+    monkeypatch.setattr(DocumentProcessor, 'EXTRACTOR_VERSION', DocumentProcessor.EXTRACTOR_VERSION + 1)
+    assert document_processor.load_cached_pages(file_hash) is None
+    document_processor.get_document_text(path, file_hash)
+
+    assert calls == [path]
+
+
+def test_corrupt_cache_falls_back_to_extraction(document_processor, tmp_path, monkeypatch):
+    path = make_docx(tmp_path / 'a.docx', [TEXT])
+    file_hash = document_processor.compute_file_hash(path)
+    document_processor.get_document_text(path, file_hash)
+    with open(document_processor._text_cache_path(file_hash), 'wb') as f:
+        f.write(b'not gzip')
+    calls = count_extractions(document_processor, monkeypatch)
+
+    assert TEXT in document_processor.get_document_text(path, file_hash)
+    assert calls == [path]
+
+
+def test_cache_removed_only_when_no_file_shares_the_hash(document_processor, tmp_path):
+    path = make_docx(tmp_path / 'a.docx', [TEXT])
+    document_processor.process_document(path)
+    file_hash = document_processor.metadata['a.docx']['file_hash']
+    cache_path = document_processor._text_cache_path(file_hash)
+
+    document_processor.remove_cached_pages(file_hash)
+    assert os.path.exists(cache_path)
+
+    document_processor.delete_file('a.docx')
+    assert not os.path.exists(cache_path)
@@ -0,0 +1,89 @@
+# tests/test_upload_manifest.py - 업로드 폴더 목록 캐시의 mtime 재검증과 세대 번호
+import os
+import time
+
+import pytest
+
+from document_processor import UploadManifest
+
+EXTENSIONS = {'.docx': 'Word', '.pdf': 'PDF'}
+
+
+def settle(folder):
+    """폴더 mtime을 과거로 돌려 캐시가 mtime을 신뢰하게 함"""
+    past = time.time() - 60
+    os.utime(folder, (past, past))
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    (tmp_path / 'a.docx').write_bytes(b'a')
+    (tmp_path / 'notes.txt').write_bytes(b'x')
+    settle(tmp_path)
+    return UploadManifest(str(tmp_path), EXTENSIONS)
+
+
+def test_unchanged_folder_is_served_from_cache(manifest):
+    assert manifest.filenames() == ['a.docx']
+    generation = manifest.current_generation()
+
+    assert manifest.filenames() == ['a.docx']
+
+    stats = manifest.get_stats()
+    assert stats['rescans'] == 1 and stats['hits'] == 2 and stats['cached']
+    assert manifest.current_generation() == generation
+
+
+def test_external_change_is_detected_by_folder_mtime(manifest, tmp_path):
+    manifest.filenames()
+    generation = manifest.generation
+
+    (tmp_path / 'b.pdf').write_bytes(b'b')
+
+    assert manifest.filenames() == ['a.docx', 'b.pdf']
+    assert manifest.generation == generation + 1
+    assert manifest.get_stats()['rescans'] == 2
+
+
+def test_recent_mtime_is_not_trusted(tmp_path):
+    (tmp_path / 'a.docx').write_bytes(b'a')
+    manifest = UploadManifest(str(tmp_path), EXTENSIONS)
+
+    manifest.filenames()
+    manifest.filenames()
+
+    stats = manifest.get_stats()
+    assert stats['rescans'] == 2 and not stats['cached']
+    assert manifest.generation == 1  # 내용이 같으면 다시 읽어도 세대는 그대로
+
+
+def test_record_and_discard_update_entries_without_rescan(manifest, tmp_path):
+    manifest.filenames()
+    previous_mtime = manifest.folder_mtime()
+    (tmp_path / 'b.pdf').write_bytes(b'b')
+    settle(tmp_path)
+
+    manifest.record(str(tmp_path / 'b.pdf'), previous_mtime)
+    assert manifest.filenames() == ['a.docx', 'b.pdf']
+
+    previous_mtime = manifest.folder_mtime()
+    os.remove(tmp_path / 'a.docx')
+    settle(tmp_path)
+    manifest.discard('a.docx', previous_mtime)
+    assert manifest.filenames() == ['b.pdf']
+
+    stats = manifest.get_stats()
+    assert stats['rescans'] == 1 and stats['generation'] == 3
+
+
+def test_stale_previous_mtime_forces_rescan(manifest, tmp_path):
+    manifest.filenames()
+    (tmp_path / 'b.pdf').write_bytes(b'b')  # 캐시가 모르는 외부 변경
+    settle(tmp_path)
+    previous_mtime = manifest.folder_mtime()
+    (tmp_path / 'c.pdf').write_bytes(b'c')
+
+    manifest.record(str(tmp_path / 'c.pdf'), previous_mtime)
+
+    assert manifest.filenames() == ['a.docx', 'b.pdf', 'c.pdf']
+    assert manifest.get_stats()['rescans'] == 2